@@ -2,9 +2,31 @@
 # Scope: primitives, I/O, control flow, functions + robust exception handling
 # Features: Bulletproof input validation, memory operations, error logging
 
+import csv
+import decimal
+import json
+import math
+import operator
+import os
+import re
+import sys
+import time
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict, deque
+from fractions import Fraction
+from functools import lru_cache
+from itertools import accumulate, chain, islice, repeat
+
 # Constants and global state
 ERROR_LOG = []  # Track session errors for statistics
 MEMORY = 0.0    # Calculator memory storage
+REGISTERS = {}  # Named memory registers: name -> value
+HISTORY_SIZE = 100
+HISTORY = deque(maxlen=HISTORY_SIZE)  # (label, value) ring buffer; ans[-1] is newest
+SESSION_FILE = "calculator_session.ndjson"
+SESSION = {"file": None, "lines": 0}  # append-only log of results and registers
+SESSION_COMPACT_FACTOR = 2  # rewrite the log once it is this many times the live size
 
 # -------------------------------
 # Operations (pure math functions)
@@ -80,7 +102,7 @@ def memory_store(value):
         if value in (float('inf'), float('-inf')):
             raise ValueError("Cannot store infinity in memory")
         MEMORY = value
-        return f"Stored {value:.6g} in memory"
+        return f"Stored {format_number(value)} in memory"
     except Exception as e:
         return f"Memory store error: {e}"
 
@@ -97,11 +119,170 @@ def memory_clear():
     return "Memory cleared"
 
 
+# -------------------------------
+# Registers and Result History (append-only session log)
+# -------------------------------
+# Each change is one NDJSON line appended to SESSION["file"]:
+#   {"result": value, "label": "..."}   {"register": name, "value": value}
+#   {"register": name, "clear": true}
+# Loading replays the log; HISTORY's maxlen keeps only the newest results.
+# Values keep their backend type: Decimal/Fraction are written as strings;
+# ints (and Fraction parts) too long for str() are written as hex instead.
+
+RESERVED_NAMES = ("ans", "M", "mem")
+
+
+HEX_INT_BITS = 4096  # well below the 4300-digit int/str conversion limit
+
+
+def _encode_value(value):
+    if isinstance(value, decimal.Decimal):
+        return {"decimal": str(value)}
+    if isinstance(value, Fraction):
+        if max(value.numerator.bit_length(), value.denominator.bit_length()) > HEX_INT_BITS:
+            return {"fraction": [hex(value.numerator), hex(value.denominator)]}
+        return {"fraction": str(value)}
+    if isinstance(value, int) and value.bit_length() > HEX_INT_BITS:
+        return {"int": hex(value)}
+    return value
+
+
+def _decode_value(value):
+    if isinstance(value, dict):
+        if "decimal" in value:
+            return decimal.Decimal(value["decimal"])
+        if "int" in value:
+            return int(value["int"], 16)
+        if isinstance(value["fraction"], list):
+            numerator, denominator = value["fraction"]
+            return Fraction(int(numerator, 16), int(denominator, 16))
+        return Fraction(value["fraction"])
+    return value
+
+
+def _append_session(record):
+    """Append one record to the session log; a write failure only disables persistence."""
+    if SESSION["file"] is None:
+        return
+    try:
+        with open(SESSION["file"], "a", encoding="utf-8") as f:
+            f.write(json.dumps(record, separators=(",", ":")) + "\n")
+        SESSION["lines"] += 1
+    except OSError as e:
+        log_error("SessionError", f"Cannot append to {SESSION['file']}: {e}")
+        SESSION["file"] = None
+        return
+    if SESSION["lines"] > SESSION_COMPACT_FACTOR * (len(HISTORY) + len(REGISTERS) + HISTORY_SIZE):
+        compact_session()
+
+
+def compact_session():
+    """Rewrite the log with only the live registers and history (atomic replace)."""
+    filename = SESSION["file"]
+    if filename is None:
+        return False, "No session file open"
+    records = [{"register": name, "value": _encode_value(value)}
+               for name, value in REGISTERS.items()]
+    records += [{"result": _encode_value(value), "label": label} for label, value in HISTORY]
+    temp_file = filename + ".tmp"
+    try:
+        with open(temp_file, "w", encoding="utf-8") as f:
+            f.writelines(json.dumps(r, separators=(",", ":")) + "\n" for r in records)
+        os.replace(temp_file, filename)
+        SESSION["lines"] = len(records)
+        return True, f"Compacted session log to {len(records)} records"
+    except OSError as e:
+        log_error("SessionError", f"Compaction failed: {e}")
+        return False, f"Compaction failed: {e}"
+
+
+def open_session(filename=SESSION_FILE):
+    """Load registers and history from an existing log and append future changes to it."""
+    REGISTERS.clear()
+    HISTORY.clear()
+    SESSION["file"] = filename
+    SESSION["lines"] = 0
+    if not os.path.exists(filename):
+        return True, "Started a new session log"
+    skipped = 0
+    try:
+        with open(filename, encoding="utf-8") as f:
+            for line in f:
+                SESSION["lines"] += 1
+                try:
+                    record = json.loads(line)
+                    if "result" in record:
+                        HISTORY.append((record.get("label", ""), _decode_value(record["result"])))
+                    elif record.get("clear"):
+                        REGISTERS.pop(record["register"], None)
+                    else:
+                        REGISTERS[record["register"]] = _decode_value(record["value"])
+                except (ValueError, KeyError, TypeError, ZeroDivisionError,
+                        decimal.InvalidOperation):
+                    skipped += 1  # e.g. a line torn by a crash mid-append
+    except OSError as e:
+        log_error("SessionError", f"Cannot read {filename}: {e}")
+        SESSION["file"] = None
+        return False, f"Cannot read session log: {e}"
+    if skipped:
+        log_error("SessionError", f"Skipped {skipped} unreadable line(s) in {filename}")
+    return True, f"Loaded {len(HISTORY)} results and {len(REGISTERS)} registers"
+
+
+def record_result(label, value):
+    """Push a successful result onto the history ring buffer (and the session log)."""
+    HISTORY.append((label, value))
+    _append_session({"result": _encode_value(value), "label": label})
+
+
+def history_value(k=1):
+    """ans[-k]: the k-th most recent result."""
+    if not 1 <= k <= len(HISTORY):
+        raise ValueError(f"No result ans[-{k}] in history ({len(HISTORY)} stored)")
+    return HISTORY[-k][1]
+
+
+def register_store(name, value):
+    """Store value in a named register."""
+    try:
+        if not name.isidentifier() or name.startswith("_") or name in RESERVED_NAMES:
+            raise ValueError(f"Invalid register name '{name}'")
+        if value != value or value in (float('inf'), float('-inf')):
+            raise ValueError("Cannot store a non-finite value")
+        REGISTERS[name] = value
+        _append_session({"register": name, "value": _encode_value(value)})
+        return f"Stored {format_number(value)} in register {name}"
+    except Exception as e:
+        return f"Register store error: {e}"
+
+
+def register_recall(name):
+    """Value of a named register; ValueError if it does not exist."""
+    if name not in REGISTERS:
+        raise ValueError(f"Unknown register '{name}'")
+    return REGISTERS[name]
+
+
+def register_clear(name):
+    """Remove a named register."""
+    if REGISTERS.pop(name, None) is None:
+        return f"Register {name} is not set"
+    _append_session({"register": name, "clear": True})
+    return f"Register {name} cleared"
+
+
 def _reset_session():
     """Reset session state for unit testing."""
     global ERROR_LOG, MEMORY
     ERROR_LOG.clear()
     MEMORY = 0.0
+    REGISTERS.clear()
+    HISTORY.clear()
+    SESSION["file"] = None
+    SESSION["lines"] = 0
+    set_backend("float")
+    configure_result_cache(False)
+    clear_result_cache()
 
 
 def _is_finite(x):
@@ -109,6 +290,1193 @@ def _is_finite(x):
     return not (isinstance(x, float) and (x != x or x in (float('inf'), float('-inf'))))
 
 
+# -------------------------------
+# Result Cache (LRU, opt-in)
+# -------------------------------
+# Keys are (operation, backend, decimal precision, operand keys...). Floats
+# are keyed by float.hex(): plain dict keys treat -0.0 == 0.0 as one entry
+# and never find NaN again (NaN != NaN), and 1 == 1.0 == Fraction(1) would
+# also collide across types, so every operand key carries its type.
+
+RESULT_CACHE = OrderedDict()
+RESULT_CACHE_STATS = {"enabled": False, "maxsize": 1024, "hits": 0, "misses": 0}
+
+
+def _cache_operand(x):
+    """Hashable key that keeps -0.0, NaN and the operand type distinct."""
+    if isinstance(x, float):
+        return ("float", x.hex())  # '-0x0.0p+0' vs '0x0.0p+0'; every NaN is 'nan'
+    if isinstance(x, decimal.Decimal):
+        return ("Decimal", str(x))  # keeps Decimal('-0') and trailing zeros
+    return (type(x).__name__, x)
+
+
+def _cached_result(key, compute):
+    try:
+        value = RESULT_CACHE[key]
+    except KeyError:
+        RESULT_CACHE_STATS["misses"] += 1
+        value = compute()
+        RESULT_CACHE[key] = value
+        if len(RESULT_CACHE) > RESULT_CACHE_STATS["maxsize"]:
+            RESULT_CACHE.popitem(last=False)
+        return value
+    RESULT_CACHE_STATS["hits"] += 1
+    RESULT_CACHE.move_to_end(key)
+    return value
+
+
+def configure_result_cache(enabled=True, maxsize=None):
+    """Turn the result cache on/off and optionally resize it; returns a message."""
+    if maxsize is not None:
+        if isinstance(maxsize, bool) or not isinstance(maxsize, int) or maxsize < 1:
+            raise ValueError("Cache size must be a positive integer")
+        RESULT_CACHE_STATS["maxsize"] = maxsize
+        while len(RESULT_CACHE) > maxsize:
+            RESULT_CACHE.popitem(last=False)
+    RESULT_CACHE_STATS["enabled"] = bool(enabled)
+    if not enabled:
+        RESULT_CACHE.clear()
+    state = "enabled" if enabled else "disabled"
+    return f"Result cache {state} (max {RESULT_CACHE_STATS['maxsize']} entries)"
+
+
+def clear_result_cache():
+    """Drop cached results and reset hit/miss counters."""
+    RESULT_CACHE.clear()
+    RESULT_CACHE_STATS["hits"] = 0
+    RESULT_CACHE_STATS["misses"] = 0
+
+
+# -------------------------------
+# Numeric Backends (float, Decimal, Fraction, exact int)
+# -------------------------------
+# "float" is the original behaviour (divide()/power() and their guards).
+# "decimal" works in a configurable-precision context whose Emax trap is the
+# overflow guard, "fraction" is exact rational arithmetic, and "int" keeps
+# integral values as exact Python ints, falling back to float otherwise.
+# Exact backends bound power() by an up-front estimate of the result size.
+
+NUMERIC_BACKENDS = ("float", "decimal", "fraction", "int")
+BACKEND = {"name": "float", "precision": 28}
+DECIMAL_CONTEXT = decimal.Context(
+    prec=28, traps=[decimal.InvalidOperation, decimal.DivisionByZero, decimal.Overflow])
+EXACT_MAX_BITS = 1 << 22  # ~1.26 million decimal digits
+LOG10_2 = math.log10(2)
+
+
+def set_backend(name, precision=None):
+    """Select the numeric backend (and Decimal precision); returns (success, message)."""
+    if name not in NUMERIC_BACKENDS:
+        return False, f"Unknown backend '{name}' (choose from {', '.join(NUMERIC_BACKENDS)})"
+    if precision is not None:
+        if isinstance(precision, bool) or not isinstance(precision, int) \
+                or not 1 <= precision <= 100000:
+            return False, "Decimal precision must be an integer between 1 and 100000"
+        BACKEND["precision"] = precision
+        DECIMAL_CONTEXT.prec = precision
+    BACKEND["name"] = name
+    if name == "decimal":
+        return True, f"Backend set to decimal ({BACKEND['precision']} significant digits)"
+    return True, f"Backend set to {name}"
+
+
+def _log10_abs(n):
+    """log10(|n|) for ints of any size, without converting the whole int to float."""
+    n = abs(n)
+    shift = max(n.bit_length() - 64, 0)
+    return math.log10(n >> shift) + shift * LOG10_2
+
+
+def format_number(x):
+    """Human-readable number for any backend value."""
+    if isinstance(x, float):
+        return f"{x:.6g}"
+    if isinstance(x, int):
+        if x.bit_length() <= 160:
+            return str(x)
+        exponent = _log10_abs(x)
+        mantissa = 10 ** (exponent - math.floor(exponent))
+        return f"{'-' if x < 0 else ''}{mantissa:.6f}e+{math.floor(exponent)}"
+    if isinstance(x, Fraction):
+        if x.denominator == 1:
+            return format_number(x.numerator)
+        if max(x.numerator.bit_length(), x.denominator.bit_length()) <= 64:
+            return str(x)
+        exponent = _log10_abs(x.numerator) - _log10_abs(x.denominator)
+        if abs(exponent) < 300:
+            return f"≈{float(x):.6g}"
+        return f"≈{'-' if x < 0 else ''}1e{math.floor(exponent):+d}"
+    return str(x)
+
+
+def to_number(value, backend=None):
+    """Convert a string or number to the backend's type; ValueError if invalid or non-finite."""
+    backend = backend or BACKEND["name"]
+    if isinstance(value, str):
+        value = value.strip()
+    try:
+        if backend == "decimal":
+            number = DECIMAL_CONTEXT.create_decimal(
+                repr(value) if isinstance(value, float) else value)
+            if not number.is_finite():
+                raise ValueError
+            return number
+        if backend == "fraction":
+            if isinstance(value, float):
+                value = repr(value)
+            return Fraction(value)
+        if backend == "int":
+            if isinstance(value, int):
+                return value
+            if isinstance(value, str):
+                try:
+                    return int(value)
+                except ValueError:
+                    value = Fraction(value)  # "1e30" stays exact
+                    if value.denominator == 1:
+                        return value.numerator
+            number = float(value)
+            if number.is_integer():
+                return int(number)
+            if not math.isfinite(number):
+                raise ValueError
+            return number
+        number = float(value)
+        if not math.isfinite(number):
+            raise ValueError
+        return number
+    except (ValueError, decimal.InvalidOperation, ZeroDivisionError, OverflowError, TypeError):
+        raise ValueError(f"Invalid number: {value!r}") from None
+
+
+def _exact_power_bits(base, exponent):
+    """Estimated bit length of base ** exponent (numerator or denominator) for exact backends."""
+    if isinstance(base, Fraction):
+        parts = (base.numerator, base.denominator)
+    else:
+        parts = (base,)
+    base_bits = max(_log10_abs(part) / LOG10_2 if part else 0.0 for part in parts)
+    return abs(exponent) * base_bits
+
+
+def _exact_power(a, b):
+    if b != int(b):
+        raise ValueError("Exact power requires an integer exponent")
+    b = int(b)
+    if a == 0 and b < 0:
+        raise ZeroDivisionError("Cannot raise zero to a negative power")
+    bits = _exact_power_bits(a, b)
+    if bits > EXACT_MAX_BITS:
+        raise OverflowError(f"Result too large for exact arithmetic "
+                            f"(~{int(bits * LOG10_2):,} digits)")
+    return a ** b
+
+
+def _decimal_calculate(op, a, b):
+    with decimal.localcontext(DECIMAL_CONTEXT):
+        if op == "add":
+            return a + b
+        if op == "subtract":
+            return a - b
+        if op == "multiply":
+            return a * b
+        if op == "divide":
+            return a / b
+        if a < 0 and b != b.to_integral_value():
+            raise ValueError("Negative base requires an integer exponent")
+        if a == 0 and b < 0:
+            raise ZeroDivisionError("Cannot raise zero to a negative power")
+        return a ** b  # Overflow trap fires past Emax
+
+
+def _exact_calculate(op, a, b, backend):
+    if backend == "int" and not (isinstance(a, int) and isinstance(b, int)):
+        return None  # mixed int/float: use the float implementation
+    if op == "add":
+        return a + b
+    if op == "subtract":
+        return a - b
+    if op == "multiply":
+        return a * b
+    if op == "divide":
+        if b == 0:
+            raise ZeroDivisionError("Cannot divide by zero")
+        if backend == "fraction":
+            return a / b
+        quotient, remainder = divmod(a, b)
+        return quotient if remainder == 0 else None
+    if backend == "int" and b < 0:
+        return None
+    return _exact_power(a, b)
+
+
+def _float_calculate(op, a, b):
+    if op == "divide":
+        return divide(float(a), float(b))
+    if op == "power":
+        return power(float(a), float(b))
+    result = {"add": add, "subtract": subtract, "multiply": multiply}[op](a, b)
+    if not _is_finite(result):
+        return None, NON_FINITE_MESSAGE
+    return result, "Success"
+
+
+def _calculate_numbers(op, a, b, backend):
+    try:
+        if backend == "float":
+            return _float_calculate(op, a, b)
+        if backend == "decimal":
+            return _decimal_calculate(op, a, b), "Success"
+        result = _exact_calculate(op, a, b, backend)
+        if result is None:
+            return _float_calculate(op, a, b)
+        return result, "Success"
+    except ZeroDivisionError as e:
+        message = str(e) if str(e).startswith("Cannot") else "Cannot divide by zero"
+        return None, message
+    except decimal.Overflow:
+        return None, f"Result exceeds Decimal range (exponent > {DECIMAL_CONTEXT.Emax})"
+    except decimal.InvalidOperation:
+        return None, "Invalid Decimal operation"
+    except (ValueError, OverflowError) as e:
+        return None, str(e)
+
+
+def calculate(op, a, b, backend=None):
+    """Apply add/subtract/multiply/divide/power under a numeric backend.
+
+    Operands are converted with to_number(); returns (result, message) like
+    divide() and power(). Goes through the result cache when it is enabled.
+    """
+    backend = backend or BACKEND["name"]
+    try:
+        if op not in ("add", "subtract", "multiply", "divide", "power"):
+            raise ValueError(f"Unknown operation '{op}'")
+        if backend not in NUMERIC_BACKENDS:
+            raise ValueError(f"Unknown backend '{backend}'")
+        a = to_number(a, backend)
+        b = to_number(b, backend)
+    except ValueError as e:
+        return None, str(e)
+
+    if not RESULT_CACHE_STATS["enabled"]:
+        return _calculate_numbers(op, a, b, backend)
+    precision = BACKEND["precision"] if backend == "decimal" else None
+    key = (op, backend, precision, _cache_operand(a), _cache_operand(b))
+    return _cached_result(key, lambda: _calculate_numbers(op, a, b, backend))
+
+
+# -------------------------------
+# Power Modes (modular, exact, log-domain)
+# -------------------------------
+# "standard" is power()/calculate(). "modular" is three-argument pow(), which
+# never builds a^b. "exact" is integer/rational exponentiation by squaring
+# (Python's int ** is binary exponentiation) bounded by _exact_power_bits().
+# "log" returns b*log10|a| as a Decimal mantissa/exponent for magnitudes far
+# beyond float range, with about 15 - len(exponent digits) significant digits.
+
+POWER_MODES = ("standard", "modular", "exact", "log")
+
+
+def _as_integer(value, role):
+    number = to_number(value, "fraction")
+    if number.denominator != 1:
+        raise ValueError(f"Modular power needs an integer {role}")
+    return number.numerator
+
+
+def _log10_fraction(x):
+    return _log10_abs(x.numerator) - _log10_abs(x.denominator)
+
+
+def log_power(a, b):
+    """a ** b as a Decimal computed in the log domain (sign and log10 magnitude)."""
+    a = to_number(a, "fraction")
+    b = to_number(b, "fraction")
+    if a == 0:
+        if b < 0:
+            raise ZeroDivisionError("Cannot raise zero to a negative power")
+        return decimal.Decimal(0 if b else 1)
+    if a < 0 and b.denominator != 1:
+        raise ValueError("Negative base requires an integer exponent")
+    negative = a < 0 and b.numerator % 2 == 1
+    if abs(a) == 1:
+        return decimal.Decimal(-1 if negative else 1)
+
+    try:
+        magnitude = float(b) * _log10_fraction(abs(a))
+    except OverflowError:
+        magnitude = math.inf
+    if not math.isfinite(magnitude):
+        raise OverflowError("Result magnitude exceeds log-domain range")
+    exponent = math.floor(magnitude)
+    digits = max(15 - len(str(abs(exponent))), 3)
+    mantissa = round(10 ** (magnitude - exponent), digits - 1)
+    if mantissa >= 10:
+        mantissa /= 10
+        exponent += 1
+    return decimal.Decimal(f"{'-' if negative else ''}{mantissa:.{digits - 1}f}E{exponent}")
+
+
+def power_mode(a, b, mode="standard", modulus=None, backend=None):
+    """Raise a to b in one of POWER_MODES; returns (result, message)."""
+    if mode == "standard":
+        return calculate("power", a, b, backend)
+    if not RESULT_CACHE_STATS["enabled"]:
+        return _power_mode(a, b, mode, modulus)
+    key = ("power-" + str(mode), None, None, _cache_operand(a), _cache_operand(b),
+           _cache_operand(modulus))
+    return _cached_result(key, lambda: _power_mode(a, b, mode, modulus))
+
+
+def _power_mode(a, b, mode, modulus):
+    try:
+        if mode == "modular":
+            if modulus is None:
+                raise ValueError("Modular power needs a modulus")
+            m = _as_integer(modulus, "modulus")
+            if m == 0:
+                raise ValueError("Modulus must be non-zero")
+            # negative exponents use the modular inverse (ValueError if none exists)
+            return pow(_as_integer(a, "base"), _as_integer(b, "exponent"), m), "Success"
+        if mode == "exact":
+            result = _exact_power(to_number(a, "fraction"), to_number(b, "fraction"))
+            return (result.numerator if result.denominator == 1 else result), "Success"
+        if mode == "log":
+            return log_power(a, b), "Success"
+        raise ValueError(f"Unknown power mode '{mode}'")
+    except (ZeroDivisionError, ValueError, OverflowError) as e:
+        return None, str(e)
+
+# -------------------------------
+# Expression Engine (tokenizer + Pratt parser + evaluator)
+# -------------------------------
+# AST nodes are plain tuples so parsed expressions can be cached and shared:
+#   ("num", value)  ("name", identifier)  ("ans", k)  ("neg", operand)
+#   (op, left, right) where op is one of "+", "-", "*", "/", "^".
+# "ans" is the last result and "ans[-k]" the k-th most recent one.
+
+TOKEN_RE = re.compile(r"""\s*(?:
+    (?P<num>(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?)
+  | (?P<name>[A-Za-z_]\w*)
+  | (?P<op>\*\*|[-+*/^()×÷\[\]])
+)""", re.VERBOSE)
+
+# operator -> (canonical op, left binding power, right binding power)
+# "^" binds tighter than unary minus and is right-associative: -2^2 == -4, 2^3^2 == 512
+BINARY_OPERATORS = {
+    "+": ("+", 10, 11), "-": ("-", 10, 11),
+    "*": ("*", 20, 21), "×": ("*", 20, 21),
+    "/": ("/", 20, 21), "÷": ("/", 20, 21),
+    "^": ("^", 40, 39), "**": ("^", 40, 39),
+}
+UNARY_BINDING_POWER = 30
+MEMORY_NAMES = ("M", "mem")
+NON_FINITE_MESSAGE = "Non-finite result (overflow/NaN)"
+
+
+def tokenize(text):
+    """Split an expression into (kind, value, position) tuples."""
+    tokens = []
+    pos = 0
+    end = len(text.rstrip())
+    while pos < end:
+        match = TOKEN_RE.match(text, pos)
+        if not match:
+            raise ValueError(f"Unexpected character {text[pos]!r} at position {pos + 1}")
+        kind = match.lastgroup
+        tokens.append((kind, match.group(kind), match.start(kind)))
+        pos = match.end()
+    tokens.append(("end", "", end))
+    return tokens
+
+
+def _parse_operand(tokens, i):
+    kind, value, pos = tokens[i]
+    if kind == "num":
+        number = float(value)
+        if not _is_finite(number):
+            raise ValueError(f"Number too large at position {pos + 1}")
+        return ("num", number), i + 1
+    if kind == "name":
+        if value == "ans":
+            return _parse_history_reference(tokens, i + 1)
+        return ("name", value), i + 1
+    if value == "(":
+        node, i = _parse(tokens, i + 1, 0)
+        if tokens[i][1] != ")":
+            raise ValueError(f"Missing ')' at position {tokens[i][2] + 1}")
+        return node, i + 1
+    if value in ("-", "+"):
+        node, i = _parse(tokens, i + 1, UNARY_BINDING_POWER)
+        return (("neg", node) if value == "-" else node), i
+    if kind == "end":
+        raise ValueError("Unexpected end of expression")
+    raise ValueError(f"Unexpected {value!r} at position {pos + 1}")
+
+
+def _parse_history_reference(tokens, i):
+    """Parse the optional "[-k]" after "ans"."""
+    if tokens[i][1] != "[":
+        return ("ans", 1), i
+    sign, number, close = tokens[i + 1:i + 4] if len(tokens) > i + 3 else (("end", "", 0),) * 3
+    if sign[1] != "-" or number[0] != "num" or close[1] != "]" \
+            or not number[1].isdigit() or int(number[1]) < 1:
+        raise ValueError(f"Use ans[-k] with k >= 1 at position {tokens[i][2] + 1}")
+    return ("ans", int(number[1])), i + 4
+
+
+def _parse(tokens, i, min_bp):
+    left, i = _parse_operand(tokens, i)
+    while True:
+        kind, value, pos = tokens[i]
+        if kind == "end" or value in (")", "]"):
+            return left, i
+        if value not in BINARY_OPERATORS:
+            raise ValueError(f"Expected an operator at position {pos + 1}, got {value!r}")
+        op, left_bp, right_bp = BINARY_OPERATORS[value]
+        if left_bp < min_bp:
+            return left, i
+        right, i = _parse(tokens, i + 1, right_bp)
+        left = (op, left, right)
+
+
+@lru_cache(maxsize=512)
+def parse_expression(text):
+    """Parse an expression string into an AST (cached per distinct string)."""
+    tokens = tokenize(text)
+    if tokens[0][0] == "end":
+        raise ValueError("Empty expression")
+    try:
+        node, i = _parse(tokens, 0, 0)
+    except RecursionError:
+        raise ValueError("Expression is nested too deeply") from None
+    if tokens[i][0] != "end":
+        raise ValueError(f"Unmatched {tokens[i][1]!r} at position {tokens[i][2] + 1}")
+    return node
+
+
+def expression_names(text):
+    """Names referenced by an expression, in order of first appearance."""
+    names = []
+    stack = [parse_expression(text.strip())]
+    while stack:
+        node = stack.pop()
+        if node[0] == "name":
+            if node[1] not in names:
+                names.append(node[1])
+        elif node[0] not in ("num", "ans"):
+            stack.extend(reversed(node[1:]))
+    return names
+
+
+def _memory_value():
+    """Memory as a float for expressions (it may hold a Decimal/Fraction/int)."""
+    return float(MEMORY)
+
+
+def _register_value(name):
+    return float(register_recall(name))
+
+
+def _history_float(k):
+    return float(history_value(k))
+
+
+def _lookup_name(name, variables):
+    if variables is not None and name in variables:
+        value = variables[name]
+        if not _is_finite(value):
+            raise ArithmeticError(f"Variable '{name}' is not finite")
+        return value
+    if name in MEMORY_NAMES:
+        return _memory_value()
+    if name in REGISTERS:
+        return _register_value(name)
+    raise ValueError(f"Unknown name '{name}'")
+
+
+def _apply_operator(op, a, b):
+    """Apply a binary operator with the same guards as the menu operations."""
+    if op == "/":
+        result, message = divide(a, b)
+    elif op == "^":
+        result, message = power(a, b)
+    else:
+        result = (add if op == "+" else subtract if op == "-" else multiply)(a, b)
+        message = NON_FINITE_MESSAGE
+    if result is None or not _is_finite(result):
+        raise ArithmeticError(message)
+    return result
+
+
+def _evaluate_node(node, variables):
+    kind = node[0]
+    if kind == "num":
+        return node[1]
+    if kind == "name":
+        return _lookup_name(node[1], variables)
+    if kind == "ans":
+        return _history_float(node[1])
+    if kind == "neg":
+        return -_evaluate_node(node[1], variables)
+    return _apply_operator(kind,
+                           _evaluate_node(node[1], variables),
+                           _evaluate_node(node[2], variables))
+
+
+def evaluate_expression(text, variables=None):
+    """Evaluate an expression like "2 * (M + 3) ^ 2" and return (result, message).
+
+    Names resolve from ``variables`` first, then M/mem to the memory value,
+    then named registers; ans / ans[-k] read the result history.
+    """
+    try:
+        result = _evaluate_node(parse_expression(text.strip()), variables)
+        if not _is_finite(result):
+            return None, NON_FINITE_MESSAGE
+        return result, "Success"
+    except (ValueError, ArithmeticError) as e:
+        return None, str(e)
+    except RecursionError:
+        return None, "Expression is nested too deeply"
+
+
+# -------------------------------
+# Expression Compiler (AST -> specialized Python function)
+# -------------------------------
+# +, - and * compile to native operators: a non-finite intermediate stays
+# non-finite through them, so one isfinite() check on the result plus operand
+# checks in front of divide()/power() reject exactly what the interpreter does.
+
+COMPILED_OPERATORS = {"+": "+", "-": "-", "*": "*"}
+
+
+def _checked_divide(a, b):
+    if not (math.isfinite(a) and math.isfinite(b)):
+        raise ArithmeticError(NON_FINITE_MESSAGE)
+    result, message = divide(a, b)
+    if result is None:
+        raise (ZeroDivisionError if b == 0 else ArithmeticError)(message)
+    return result
+
+
+def _checked_power(a, b):
+    if not (math.isfinite(a) and math.isfinite(b)):
+        raise ArithmeticError(NON_FINITE_MESSAGE)
+    result, message = power(a, b)
+    if result is None:
+        raise OverflowError(message)  # any power() guard, as BATCH_POWER_GUARD in columns
+    return result
+
+
+def _fold_constants(node):
+    """Pre-evaluate subtrees without names; leave failing ones for call time."""
+    kind = node[0]
+    if kind in ("num", "name", "ans"):
+        return node
+    children = tuple(map(_fold_constants, node[1:]))  # no generator frame per level
+    node = (kind,) + children
+    if all(child[0] == "num" for child in children):
+        try:
+            return ("num", _evaluate_node(node, None))
+        except (ValueError, ArithmeticError):
+            pass
+    return node
+
+
+def _emit_source(node, params):
+    kind = node[0]
+    if kind == "num":
+        return f"({node[1]!r})"
+    if kind == "name":
+        if node[1] in params:
+            return f"v{params.index(node[1])}"
+        if node[1] in MEMORY_NAMES:
+            return "_memory()"
+        if node[1] in REGISTERS:  # read at call time
+            return f"_register({node[1]!r})"
+        raise ValueError(f"Unknown name '{node[1]}'")
+    if kind == "ans":
+        return f"_ans({node[1]})"
+    if kind == "neg":
+        return f"(-{_emit_source(node[1], params)})"
+    left = _emit_source(node[1], params)
+    right = _emit_source(node[2], params)
+    if kind == "/":
+        return f"_divide({left}, {right})"
+    if kind == "^":
+        return f"_power({left}, {right})"
+    return f"({left} {COMPILED_OPERATORS[kind]} {right})"
+
+
+TREE_OPERATORS = {"+": operator.add, "-": operator.sub, "*": operator.mul,
+                  "/": _checked_divide, "^": _checked_power}
+
+
+def _tree_function(node, params):
+    """compile_expression() fallback: same guards, evaluated by walking the tree."""
+    def evaluate(node, arguments):
+        kind = node[0]
+        if kind == "num":
+            return node[1]
+        if kind == "name":  # unknown names were rejected by _emit_source()
+            if node[1] in params:
+                return arguments[params.index(node[1])]
+            if node[1] in MEMORY_NAMES:
+                return _memory_value()
+            return _register_value(node[1])
+        if kind == "ans":
+            return _history_float(node[1])
+        if kind == "neg":
+            return -evaluate(node[1], arguments)
+        return TREE_OPERATORS[kind](evaluate(node[1], arguments), evaluate(node[2], arguments))
+
+    def compiled(*arguments):
+        if len(arguments) != len(params):
+            raise TypeError(f"Expected {len(params)} argument(s), got {len(arguments)}")
+        result = evaluate(node, arguments)
+        if not math.isfinite(result):
+            raise ArithmeticError(NON_FINITE_MESSAGE)
+        return result
+    return compiled
+
+
+@lru_cache(maxsize=128)
+def compile_expression(text, params=()):
+    """Compile an expression into a function taking ``params`` positionally.
+
+    The function returns a finite float or raises ArithmeticError with the
+    same message the interpreter would report, e.g.::
+
+        f = compile_expression("3*x^2 + y", ("x", "y"))
+        f(2.0, 1.0)  # 13.0
+    """
+    params = tuple(params)
+    for name in params:
+        if not name.isidentifier() or name.startswith("_"):
+            raise ValueError(f"Invalid variable name '{name}'")
+    try:
+        node = _fold_constants(parse_expression(text.strip()))
+        body = _emit_source(node, params)
+    except RecursionError:
+        raise ValueError("Expression is nested too deeply") from None
+    arguments = ", ".join(f"v{i}" for i in range(len(params)))
+    source = (
+        "def _factory(_divide, _power, _isfinite, _memory, _register, _ans, _message):\n"
+        f"    def compiled({arguments}):\n"
+        f"        result = {body}\n"
+        "        if not _isfinite(result):\n"
+        "            raise ArithmeticError(_message)\n"
+        "        return result\n"
+        "    return compiled\n"
+    )
+    try:
+        code = compile(source, f"<expression {text!r}>", "exec")
+    except (SyntaxError, RecursionError, MemoryError):
+        # CPython's parser stops at ~200 nested parentheses; the interpreter
+        # does not, so walk the folded tree instead of failing
+        compiled = _tree_function(node, params)
+        compiled.__doc__ = f"Tree-walking expression: {text}"
+        return compiled
+    namespace = {}
+    exec(code, namespace)
+    compiled = namespace["_factory"](_checked_divide, _checked_power, math.isfinite,
+                                     _memory_value, _register_value, _history_float,
+                                     NON_FINITE_MESSAGE)
+    compiled.__doc__ = f"Compiled expression: {text}"
+    return compiled
+
+
+def evaluate_compiled(text, params, rows):
+    """Evaluate a compiled expression over an iterable of argument tuples.
+
+    Yields (result, message) per row, like evaluate_expression().
+    """
+    function = compile_expression(text, tuple(params))
+    for row in rows:
+        try:
+            yield function(*row), "Success"
+        except (ValueError, ArithmeticError) as e:
+            yield None, str(e)
+
+
+# -------------------------------
+# Batch Operations (column-at-a-time)
+# -------------------------------
+# Columns may be lists (floats or ints), array('d') or memoryviews; they are
+# coerced to doubles first. Results come back as an array('d') (NaN in failed
+# rows) plus a bytearray error mask of codes below.
+
+BATCH_OK = 0
+BATCH_ZERO_DIVISION = 1
+BATCH_NON_FINITE = 2
+BATCH_POWER_GUARD = 3
+BATCH_INVALID_OPERAND = 4
+BATCH_INVALID_NUMBER = 5
+BATCH_ERRORS = {
+    BATCH_ZERO_DIVISION: "Cannot divide by zero",
+    BATCH_NON_FINITE: NON_FINITE_MESSAGE,
+    BATCH_POWER_GUARD: "Power limits exceeded or overflow",
+    BATCH_INVALID_OPERAND: "Invalid operand",
+    BATCH_INVALID_NUMBER: "Invalid number",
+}
+BATCH_OPERATIONS = {
+    "add": operator.add,
+    "subtract": operator.sub,
+    "multiply": operator.mul,
+    "divide": operator.truediv,
+    "power": operator.pow,
+}
+BATCH_CHUNK_ROWS = 65536
+NAN = float("nan")
+# bytes.translate() table turning a non-finite mask into input-error codes
+INVALID_NUMBER_CODES = bytes(BATCH_INVALID_NUMBER if code == BATCH_NON_FINITE else BATCH_OK
+                             for code in range(256))
+
+
+def _non_finite_mask(values):
+    """Mask non-finite values; one C-level sum() proves the common all-finite case."""
+    if math.isfinite(sum(values)):
+        return bytearray(len(values))
+    # x - x is 0.0 for finite x and NaN for ±inf/NaN
+    return bytearray([BATCH_NON_FINITE if v - v else BATCH_OK for v in values])
+
+
+def _batch_power(a, b):
+    # Fast path only when no row can trip power()'s guards. min()/max() skip a
+    # NaN unless it comes first, so finiteness is checked explicitly via sum().
+    if (len(a) == 0 or (math.isfinite(sum(a)) and math.isfinite(sum(b))
+                        and max(map(abs, b)) <= 1000 and min(a) >= 0
+                        and max(map(abs, a)) <= 1e154)):
+        try:
+            values = list(map(operator.pow, a, b))
+            return values, _non_finite_mask(values)
+        except (OverflowError, ZeroDivisionError):
+            pass
+    values = []
+    mask = bytearray(len(a))
+    for i, (x, y) in enumerate(zip(a, b)):
+        result, _ = power(x, y)
+        if result is None or not _is_finite(result):
+            result = NAN
+            mask[i] = BATCH_POWER_GUARD
+        values.append(result)
+    return values, mask
+
+
+def _float_column(column):
+    """Column as doubles; ints beyond float range become ±inf (masked non-finite)."""
+    if getattr(column, "typecode", None) == "d" or getattr(column, "format", None) == "d":
+        return column
+    try:
+        return array("d", column)
+    except OverflowError:
+        values = []
+        for value in column:
+            try:
+                values.append(float(value))
+            except OverflowError:
+                values.append(math.inf if value > 0 else -math.inf)
+        return array("d", values)
+
+
+def batch_operation(op, a, b):
+    """Apply one operation element-wise to two equal-length columns.
+
+    Returns (results, error_mask): results is an array('d') with NaN where the
+    mask is non-zero; the mask holds BATCH_* codes (see BATCH_ERRORS).
+    """
+    if op not in BATCH_OPERATIONS:
+        raise ValueError(f"Unknown operation '{op}'")
+    if len(a) != len(b):
+        raise ValueError(f"Column lengths differ: {len(a)} != {len(b)}")
+    # int operands would give int results that overflow array('d') later
+    a = _float_column(a)
+    b = _float_column(b)
+
+    if op == "power":
+        values, mask = _batch_power(a, b)
+    elif op == "divide" and 0.0 in b:
+        values = [x / y if y else NAN for x, y in zip(a, b)]
+        mask = _non_finite_mask(values)
+        for i, y in enumerate(b):
+            if not y:
+                mask[i] = BATCH_ZERO_DIVISION
+    else:
+        values = list(map(BATCH_OPERATIONS[op], a, b))
+        mask = _non_finite_mask(values)
+
+    results = array("d", values)
+    if any(mask):
+        for i, code in enumerate(mask):
+            if code:
+                results[i] = NAN
+    return results, mask
+
+
+def _parse_column(fields):
+    """Parse strings to array('d'); unparsable or non-finite entries are masked."""
+    try:
+        column = array("d", map(float, fields))
+    except ValueError:
+        values = []
+        for field in fields:
+            try:
+                values.append(float(field))
+            except ValueError:
+                values.append(NAN)
+        column = array("d", values)
+    return column, _non_finite_mask(column).translate(INVALID_NUMBER_CODES)
+
+
+def _evaluate_chunk(rows, indexes, op, function):
+    columns = []
+    input_mask = bytearray(len(rows))
+    for index in indexes:
+        try:
+            fields = list(map(operator.itemgetter(index), rows))
+        except IndexError:  # short rows count as missing values
+            fields = [row[index] if index < len(row) else "" for row in rows]
+        column, mask = _parse_column(fields)
+        columns.append(column)
+        if any(mask):
+            input_mask = bytearray(map(max, input_mask, mask))
+
+    if function is None:
+        results, mask = batch_operation(op, columns[0], columns[1])
+    else:
+        results = array("d")
+        mask = bytearray(len(rows))
+        for i, arguments in enumerate(zip(*columns)):
+            try:
+                results.append(function(*arguments))
+            except ZeroDivisionError:
+                results.append(NAN)
+                mask[i] = BATCH_ZERO_DIVISION
+            except OverflowError:
+                results.append(NAN)
+                mask[i] = BATCH_POWER_GUARD
+            except ValueError:  # e.g. ans[-k] past the history, unset register
+                results.append(NAN)
+                mask[i] = BATCH_INVALID_OPERAND
+            except ArithmeticError:
+                results.append(NAN)
+                mask[i] = BATCH_NON_FINITE
+
+    if any(input_mask):
+        # BATCH_INVALID_NUMBER is the highest code, so bad input wins over
+        # whatever the operation reported for that row
+        mask = bytearray(map(max, input_mask, mask))
+    return results, mask
+
+
+def batch_csv(input_file, output_file, op="add", columns=None, expression=None,
+              chunk_rows=BATCH_CHUNK_ROWS):
+    """Stream a CSV through batch_operation() or a compiled expression.
+
+    Each output row is the input row plus ``result`` and ``error`` columns.
+    ``columns`` names (or 0-based indexes) the operand columns; by default the
+    first two, or for expressions every header name the expression uses.
+    Returns (success, {"rows": n, "errors": {message: count}}) or (False, message).
+    """
+    summary = {"rows": 0, "errors": {}}
+    try:
+        with open(input_file, newline="", encoding="utf-8") as fin, \
+                open(output_file, "w", newline="", encoding="utf-8") as fout:
+            reader = csv.reader(fin)
+            writer = csv.writer(fout)
+            header = next(reader, None)
+            if header is None:
+                return False, f"{input_file} is empty"
+
+            if expression is not None:
+                params = tuple(columns) if columns else tuple(
+                    name for name in expression_names(expression) if name in header)
+                function = compile_expression(expression, params)
+                names = params
+            else:
+                function = None
+                names = columns or (0, 1)
+            indexes = []
+            for name in names:
+                if isinstance(name, int) or str(name).isdigit():
+                    indexes.append(int(name))
+                elif name in header:
+                    indexes.append(header.index(name))
+                else:
+                    return False, f"Column '{name}' not found in header"
+
+            writer.writerow(header + ["result", "error"])
+            while True:
+                rows = list(islice(reader, chunk_rows))
+                if not rows:
+                    break
+                results, mask = _evaluate_chunk(rows, indexes, op, function)
+                texts = list(map(repr, results))
+                notes = [""] * len(rows)
+                if any(mask):
+                    for i, code in enumerate(mask):
+                        if code:
+                            texts[i] = ""
+                            notes[i] = BATCH_ERRORS[code]
+                    for code, message in BATCH_ERRORS.items():
+                        count = mask.count(code)
+                        if count:
+                            summary["errors"][message] = summary["errors"].get(message, 0) + count
+                writer.writerows(map(chain, rows, zip(texts, notes)))
+                summary["rows"] += len(rows)
+        return True, summary
+    except FileNotFoundError:
+        log_error("FileNotFoundError", f"Batch input {input_file} not found")
+        return False, f"Input file {input_file} not found"
+    except (OSError, UnicodeDecodeError, csv.Error) as e:
+        log_error(type(e).__name__, str(e))
+        return False, f"Batch I/O error: {e}"
+    except ValueError as e:
+        log_error("ExpressionError", str(e))
+        return False, str(e)
+
+
+# -------------------------------
+# Streaming Statistics (constant memory)
+# -------------------------------
+# Single values use Welford's update; chunks are summarised with fsum() and
+# merged with Chan et al.'s pairwise formula (Welford generalised to
+# batches). The grand total is a Neumaier-compensated sum of per-chunk
+# fsum()s. Quantiles come from a merging t-digest: at most ~compression
+# centroids whatever the input size. Compression finds each centroid's
+# boundary with bisect over accumulated weights, so the Python-level loop
+# runs once per centroid rather than once per value.
+
+STATS_CHUNK = 65536
+DEFAULT_QUANTILES = (0.01, 0.25, 0.5, 0.75, 0.9, 0.99)
+
+
+def new_stream_stats(compression=200):
+    """Empty running-statistics state."""
+    return {
+        "count": 0, "mean": 0.0, "m2": 0.0,
+        "sum": 0.0, "sum_error": 0.0,  # Neumaier compensation term
+        "min": math.inf, "max": -math.inf,
+        "skipped": 0,
+        "compression": compression,
+        "centroids": ([], []),  # (means, weights), sorted by mean
+        "pending": [],  # single pushed values not yet in the digest
+    }
+
+
+def _fsum(values):
+    """math.fsum() of a sequence; a scaled sum when a partial sum overflows.
+
+    Only a total that is itself out of range comes back as ±inf.
+    """
+    try:
+        return math.fsum(values)
+    except OverflowError:
+        scale = max(map(abs, values))
+        return math.fsum([value / scale for value in values]) * scale
+
+
+def _neumaier_add(stats, value):
+    total = stats["sum"] + value
+    if not math.isfinite(total):  # compensation is meaningless past DBL_MAX
+        stats["sum"], stats["sum_error"] = total, 0.0
+        return
+    if abs(stats["sum"]) >= abs(value):
+        stats["sum_error"] += (stats["sum"] - total) + value
+    else:
+        stats["sum_error"] += (value - total) + stats["sum"]
+    stats["sum"] = total
+
+
+def _digest_merge(stats, values):
+    """Merge sorted new values into the centroid list and re-compress it."""
+    means, weights = stats["centroids"]
+    all_means = means + values
+    all_weights = weights + [1.0] * len(values)
+    if means:
+        order = sorted(range(len(all_means)), key=all_means.__getitem__)
+        all_means = [all_means[i] for i in order]
+        all_weights = [all_weights[i] for i in order]
+    total = stats["count"]
+    cumulative = list(accumulate(all_weights))
+    products = list(map(operator.mul, all_means, all_weights))
+
+    # k1 scale function: centroids near q=0 and q=1 stay small (accurate tails)
+    scale = stats["compression"] / (2 * math.pi)
+    new_means, new_weights = [], []
+    start = 0
+    before = 0.0
+    n = len(all_means)
+    while start < n:
+        k = scale * math.asin(2 * before / total - 1) + 1
+        limit = (math.sin(min(k / scale, math.pi / 2)) + 1) / 2 * total
+        end = max(bisect_right(cumulative, limit, start), start + 1)
+        weight = cumulative[end - 1] - before
+        mean = _fsum(products[start:end]) / weight
+        if not math.isfinite(mean):  # mean * weight passed DBL_MAX
+            mean = _fsum([m * (w / weight) for m, w in
+                          zip(all_means[start:end], all_weights[start:end])])
+        new_means.append(mean)
+        new_weights.append(weight)
+        before = cumulative[end - 1]
+        start = end
+    stats["centroids"] = (new_means, new_weights)
+
+
+def _flush_pending(stats):
+    if stats["pending"]:
+        pending = sorted(stats["pending"])
+        stats["pending"] = []
+        _digest_merge(stats, pending)
+
+
+def stream_stats_push(stats, x):
+    """Add one finite value (Welford update)."""
+    stats["count"] += 1
+    delta = x - stats["mean"]
+    stats["mean"] += delta / stats["count"]
+    stats["m2"] += delta * (x - stats["mean"])
+    _neumaier_add(stats, x)
+    if x < stats["min"]:
+        stats["min"] = x
+    if x > stats["max"]:
+        stats["max"] = x
+    stats["pending"].append(x)
+    if len(stats["pending"]) >= STATS_CHUNK:
+        _flush_pending(stats)
+
+
+def stream_stats_extend(stats, values):
+    """Add a chunk of finite values (list, array('d') or memoryview)."""
+    n_b = len(values)
+    if not n_b:
+        return
+    chunk_sum = _fsum(values)
+    if math.isfinite(chunk_sum):
+        mean_b = chunk_sum / n_b
+    else:  # e.g. 1e308 + 1e308: the total overflows but the mean does not
+        scale = max(map(abs, values))
+        mean_b = _fsum([value / scale for value in values]) / n_b * scale
+    deviations = list(map(operator.sub, values, repeat(mean_b, n_b)))
+    m2_b = _fsum(list(map(operator.mul, deviations, deviations)))
+
+    n_a = stats["count"]
+    n = n_a + n_b
+    delta = mean_b - stats["mean"]
+    stats["mean"] += delta * (n_b / n)  # delta * n_b alone can pass DBL_MAX
+    if n_a:  # the first chunk has no cross term (and inf * 0 would give NaN)
+        stats["m2"] += m2_b + delta * delta * n_a * n_b / n
+    else:
+        stats["m2"] = m2_b
+    stats["count"] = n
+    _neumaier_add(stats, chunk_sum)
+    stats["min"] = min(stats["min"], min(values))
+    stats["max"] = max(stats["max"], max(values))
+    _digest_merge(stats, sorted(values))
+
+
+def stream_quantile(stats, q):
+    """Approximate q-quantile (0 <= q <= 1) from the digest."""
+    _flush_pending(stats)
+    if not stats["count"]:
+        raise ValueError("No data")
+    if not 0.0 <= q <= 1.0:
+        raise ValueError("Quantile must be between 0 and 1")
+    means, weights = stats["centroids"]
+    target = q * stats["count"]
+    # centre of centroid i sits at (weight before it) + weight_i / 2
+    centres = [c - w / 2 for c, w in zip(accumulate(weights), weights)]
+    i = bisect_left(centres, target)
+    if i == 0:
+        left_pos, left_value = 0.0, stats["min"]
+    else:
+        left_pos, left_value = centres[i - 1], means[i - 1]
+    if i == len(centres):
+        right_pos, right_value = float(stats["count"]), stats["max"]
+    else:
+        right_pos, right_value = centres[i], means[i]
+    if right_pos <= left_pos:
+        return right_value
+    fraction = (target - left_pos) / (right_pos - left_pos)
+    value = left_value + (right_value - left_value) * fraction
+    if not math.isfinite(value):  # the span of two values near ±DBL_MAX overflows
+        value = left_value * (1 - fraction) + right_value * fraction
+    return value
+
+
+def stream_summary(stats, quantiles=DEFAULT_QUANTILES):
+    """Snapshot of count, sum, mean, variance, stdev, min, max and quantiles."""
+    count = stats["count"]
+    variance = stats["m2"] / (count - 1) if count > 1 else 0.0
+    return {
+        "count": count,
+        "sum": stats["sum"] + stats["sum_error"],
+        "mean": stats["mean"] if count else math.nan,
+        "variance": variance,
+        "stdev": math.sqrt(variance),
+        "min": stats["min"] if count else math.nan,
+        "max": stats["max"] if count else math.nan,
+        "quantiles": {q: stream_quantile(stats, q) for q in quantiles} if count else {},
+        "skipped": stats["skipped"],
+    }
+
+
+def _parse_numbers(tokens, stats):
+    """Parse tokens to floats, counting invalid or non-finite ones as skipped."""
+    try:
+        values = array("d", map(float, tokens))
+        if math.isfinite(math.fsum(values)):
+            return values
+    except (ValueError, OverflowError):
+        pass
+    values = array("d")
+    for token in tokens:
+        try:
+            value = float(token)
+        except ValueError:
+            stats["skipped"] += 1
+            continue
+        if math.isfinite(value):
+            values.append(value)
+        else:
+            stats["skipped"] += 1
+    return values
+
+
+def stream_stats_file(f, stats=None, chunk_lines=STATS_CHUNK):
+    """Feed whitespace/comma separated numbers from a text stream in chunks."""
+    if stats is None:
+        stats = new_stream_stats()
+    while True:
+        lines = list(islice(f, chunk_lines))
+        if not lines:
+            return stats
+        tokens = " ".join(lines).replace(",", " ").split()
+        stream_stats_extend(stats, _parse_numbers(tokens, stats))
+
+
+def display_stream_summary(summary):
+    """Print a stream_summary() result."""
+    if not summary["count"]:
+        print("📭 No numbers read")
+        return
+    print("\n📈 Stream Statistics:")
+    print(f"Count:    {summary['count']:,}")
+    print(f"Sum:      {summary['sum']:.10g}")
+    print(f"Mean:     {summary['mean']:.10g}")
+    print(f"Variance: {summary['variance']:.10g} (sample)")
+    print(f"Stdev:    {summary['stdev']:.10g}")
+    print(f"Min/Max:  {summary['min']:.10g} / {summary['max']:.10g}")
+    for q, value in summary["quantiles"].items():
+        label = f"p{q * 100:g}:"
+        print(f"{label:<10}{value:.10g}  (approx.)")
+    if summary["skipped"]:
+        print(f"⚠️ Skipped {summary['skipped']:,} invalid or non-finite token(s)")
+
+
 # --------------
 # Safe Input Functions (bulletproof I/O)
 # --------------
@@ -122,7 +1490,7 @@ def safe_get_menu_choice():
     """Get menu choice with comprehensive validation."""
     while True:
         try:
-            choice = int(input("Choose an option (1-8): "))
+            choice = int(input("Choose an option (1-10): "))
         except ValueError:
             print("❌ Please enter a valid number")
             log_error("ValueError", "Invalid menu choice input")
@@ -130,17 +1498,42 @@ def safe_get_menu_choice():
             print("\n👋 Goodbye!")
             raise SystemExit(0)
         else:
-            if 1 <= choice <= 8:
+            if 1 <= choice <= 10:
                 return choice
-            print("❌ Please choose a number between 1-8")
+            print("❌ Please choose a number between 1-10")
             log_error("ValueError", "Menu choice out of range")
 
 
-def safe_get_number(prompt):
-    """Get a number with comprehensive validation."""
+def safe_get_power_mode():
+    """Ask which power mode to use; Enter keeps the standard mode."""
+    print("Power modes: 1) standard  2) modular  3) exact integer  4) log-domain")
+    while True:
+        try:
+            raw = input("Choose power mode (1-4) [1]: ").strip()
+            choice = int(raw) if raw else 1
+        except ValueError:
+            print("❌ Please enter a valid number")
+            log_error("ValueError", "Invalid power mode input")
+            continue
+        except (KeyboardInterrupt, EOFError):
+            print("\n👋 Goodbye!")
+            raise SystemExit(0)
+        if 1 <= choice <= 4:
+            return POWER_MODES[choice - 1]
+        print("❌ Please choose 1-4")
+        log_error("ValueError", "Power mode out of range")
+
+
+def safe_get_number(prompt, backend="float"):
+    """Get a number with comprehensive validation.
+
+    Non-float backends parse the raw text exactly (e.g. "0.1", "1/3" for fraction).
+    """
     while True:
         try:
             raw = input(prompt)
+            if backend != "float":
+                return to_number(raw, backend)
             value = float(raw)
 
             # Block non-finite numbers
@@ -179,9 +1572,11 @@ def display_menu():
     print("3) Multiply (×)")
     print("4) Divide (÷)")
     print("5) Power (^)")
-    print("6) Memory Operations")
-    print("7) Session Statistics")
-    print("8) Quit")
+    print("6) Evaluate Expression")
+    print("7) Memory Operations")
+    print("8) Session Statistics")
+    print("9) Numeric Backend")
+    print("10) Quit")
     print("=" * 55)
 
     return safe_get_menu_choice()
@@ -193,11 +1588,14 @@ def display_memory_menu():
     print("1) Store result in memory (MS)")
     print("2) Recall from memory (MR)")
     print("3) Clear memory (MC)")
-    print("4) Back to main menu")
+    print("4) Store result in named register")
+    print("5) Recall / clear named register")
+    print("6) Show result history (ans[-k])")
+    print("7) Back to main menu")
 
     while True:
         try:
-            choice = int(input("Choose memory operation (1-4): "))
+            choice = int(input("Choose memory operation (1-7): "))
         except ValueError:
             print("❌ Please enter a valid number")
             log_error("ValueError", "Invalid memory menu input")
@@ -205,9 +1603,9 @@ def display_memory_menu():
             print("\n👋 Goodbye!")
             raise SystemExit(0)
         else:
-            if 1 <= choice <= 4:
+            if 1 <= choice <= 7:
                 return choice
-            print("❌ Please choose 1-4")
+            print("❌ Please choose 1-7")
             log_error("ValueError", "Memory menu choice out of range")
 
 
@@ -216,21 +1614,38 @@ def format_equation(a, operation, b, result, message="Success"):
     def _nonfinite(x):
         return isinstance(x, float) and (x != x or x in (float('inf'), float('-inf')))
 
+    def _operand(x):
+        return f"{x:g}" if isinstance(x, float) else format_number(x)
+
     if result is None or _nonfinite(result):
         if result is not None and _nonfinite(result):
             message = "Non-finite result (overflow/NaN)"
         log_error("CalculationError",
                   f"{operation} operation failed: {message}")
-        return f"❌ {a:g} {operation} {b:g} = ERROR ({message})"
+        return f"❌ {_operand(a)} {operation} {_operand(b)} = ERROR ({message})"
 
-    return f"✅ {a:g} {operation} {b:g} = {result:.6g}"
+    return f"✅ {_operand(a)} {operation} {_operand(b)} = {format_number(result)}"
 
 
 def display_statistics():
     """Display session statistics and error log."""
     print("\n📊 Session Statistics:")
     print(f"Total errors logged: {len(ERROR_LOG)}")
-    print(f"Current memory value: {MEMORY:.6g}")
+    print(f"Current memory value: {format_number(MEMORY)}")
+    print(f"Named registers: {len(REGISTERS)}, results in history: {len(HISTORY)}")
+    backend = BACKEND["name"]
+    if backend == "decimal":
+        backend += f" ({BACKEND['precision']} digits)"
+    print(f"Numeric backend: {backend}")
+    lookups = RESULT_CACHE_STATS["hits"] + RESULT_CACHE_STATS["misses"]
+    if RESULT_CACHE_STATS["enabled"] or lookups:
+        rate = 100.0 * RESULT_CACHE_STATS["hits"] / lookups if lookups else 0.0
+        print(f"Result cache: {len(RESULT_CACHE)}/{RESULT_CACHE_STATS['maxsize']} entries, "
+              f"{RESULT_CACHE_STATS['hits']} hits, {RESULT_CACHE_STATS['misses']} misses "
+              f"({rate:.1f}% hit rate)")
+    cache = parse_expression.cache_info()
+    print(f"Parsed expressions cached: {cache.currsize} "
+          f"({cache.hits} hits, {cache.misses} misses)")
 
     if ERROR_LOG:
         print("\n🔍 Error Summary:")
@@ -253,6 +1668,66 @@ def display_statistics():
 # Enhanced Orchestrator with Comprehensive Exception Handling
 # --------------
 
+def handle_expression():
+    """Read and evaluate one expression; return its result or None on error."""
+    print("💡 Use + - * / ^ and parentheses; M recalls memory, ans[-k] past results,")
+    print("   and named registers by name (e.g. 2*(M+3)^2 - ans[-2] / rate)")
+    text = input("Enter expression: ").strip()
+    result, message = evaluate_expression(text)
+    if result is None:
+        print(f"❌ {text} = ERROR ({message})")
+        log_error("ExpressionError", f"{text}: {message}")
+        return None
+    print(f"✅ {text} = {result:.6g}")
+    record_result(text, result)
+    return result
+
+
+MENU_OPERATIONS = {1: ("add", "+"), 2: ("subtract", "-"), 3: ("multiply", "×"),
+                   4: ("divide", "÷"), 5: ("power", "^")}
+
+
+def handle_backend_menu():
+    """Choose the numeric backend and, for Decimal, its precision."""
+    print("\n🔢 Numeric Backends:")
+    print("1) float    - fast, ~15 significant digits")
+    print("2) decimal  - configurable precision, exact decimal input")
+    print("3) fraction - exact rationals (1/3 stays 1/3)")
+    print("4) int      - exact big integers, float for non-integers")
+    cache_state = "on" if RESULT_CACHE_STATS["enabled"] else "off"
+    print(f"5) Toggle result cache (currently {cache_state})")
+    print(f"Current: {BACKEND['name']}")
+    try:
+        choice = int(input("Choose option (1-5): "))
+        if not 1 <= choice <= 5:
+            raise ValueError("Backend choice out of range")
+        if choice == 5:
+            print(f"💾 {configure_result_cache(not RESULT_CACHE_STATS['enabled'])}")
+            return
+        name = NUMERIC_BACKENDS[choice - 1]
+        precision = None
+        if name == "decimal":
+            raw = input(f"Precision in digits [{BACKEND['precision']}]: ").strip()
+            precision = int(raw) if raw else None
+        ok, message = set_backend(name, precision)
+    except ValueError as e:
+        ok, message = False, f"Invalid choice: {e}"
+    print(f"{'✅' if ok else '❌'} {message}")
+    if not ok:
+        log_error("BackendError", message)
+
+
+def display_history(count=10):
+    """Show the most recent results with their ans[-k] names."""
+    if not HISTORY:
+        print("📭 No results in history yet")
+        return
+    print(f"\n🕘 Recent results ({len(HISTORY)}/{HISTORY_SIZE} kept):")
+    for k in range(1, min(count, len(HISTORY)) + 1):
+        label, value = HISTORY[-k]
+        print(f"  ans[-{k}] = {format_number(value)}    {label}")
+
+
 def handle_memory_operations(last_result=None):
     """Handle memory operations with error recovery."""
     while True:
@@ -270,7 +1745,7 @@ def handle_memory_operations(last_result=None):
 
             elif choice == 2:  # Recall
                 value = memory_recall()
-                print(f"📤 Memory recall: {value:.6g}")
+                print(f"📤 Memory recall: {format_number(value)}")
                 break
 
             elif choice == 3:  # Clear
@@ -278,7 +1753,34 @@ def handle_memory_operations(last_result=None):
                 print(f"🗑️ {msg}")
                 break
 
-            elif choice == 4:  # Back
+            elif choice == 4:  # Store in register
+                if last_result is None:
+                    print("❌ No result to store. Perform a calculation first.")
+                    log_error("MemoryError", "No result to store")
+                    break
+                name = input("Register name: ").strip()
+                msg = register_store(name, last_result)
+                print(f"💾 {msg}")
+                if "error" in msg:
+                    log_error("MemoryError", msg)
+                break
+
+            elif choice == 5:  # Recall / clear register
+                if not REGISTERS:
+                    print("📭 No named registers yet")
+                    break
+                for name, value in REGISTERS.items():
+                    print(f"  {name} = {format_number(value)}")
+                name = input("Register to clear (Enter to keep all): ").strip()
+                if name:
+                    print(f"🗑️ {register_clear(name)}")
+                break
+
+            elif choice == 6:  # History
+                display_history()
+                break
+
+            elif choice == 7:  # Back
                 break
 
         except Exception as e:
@@ -292,16 +1794,18 @@ def run_calculator():
     print("🎉 Welcome to Advanced Calculator v2.0!")
     print("🛡️ Now with bulletproof error handling and memory operations!")
     print("🧪 Try invalid inputs - the calculator won't crash! 🚀")
+    ok, message = open_session()
+    print(f"{'💾' if ok else '⚠️'} {message} ({SESSION_FILE})")
 
     operations_count = 0
-    last_result = None
+    last_result = HISTORY[-1][1] if HISTORY else None
 
     while True:
         try:
             choice = display_menu()
 
             # Quit
-            if choice == 8:
+            if choice == 10:
                 print("\n👋 Thank you for using Advanced Calculator v2.0!")
                 print(f"📊 Total successful operations: {operations_count}")
                 if ERROR_LOG:
@@ -310,33 +1814,69 @@ def run_calculator():
                 print("🎯 No crashes occurred - bulletproof success! 🛡️")
                 break
 
-            # Memory operations
+            # Expression evaluation
             elif choice == 6:
+                result = handle_expression()
+                if result is not None:
+                    operations_count += 1
+                    last_result = result
+                    print(f"📈 Successful operations: {operations_count}")
+                continue
+
+            # Memory operations
+            elif choice == 7:
                 handle_memory_operations(last_result)
                 continue
 
             # Session statistics
-            elif choice == 7:
+            elif choice == 8:
                 display_statistics()
                 continue
 
+            # Numeric backend
+            elif choice == 9:
+                handle_backend_menu()
+                continue
+
             # Mathematical operations (1-5)
             try:
                 # Get operands with validation
-                a = safe_get_number("Enter first number: ")
+                backend = BACKEND["name"]
+                mode = safe_get_power_mode() if choice == 5 else "standard"
+                if mode == "modular":
+                    backend = "int"
+                elif mode == "exact":
+                    backend = "fraction"
+                a = safe_get_number("Enter first number: ", backend)
 
                 # For power operation, get second operand before showing warning
                 if choice == 5:
                     print("⚠️ Power operations have safety limits to prevent overflow")
-                    b = safe_get_number("Enter exponent: ")
+                    b = safe_get_number("Enter exponent: ", backend)
                 else:
-                    b = safe_get_number("Enter second number: ")
+                    b = safe_get_number("Enter second number: ", backend)
 
                 # Dispatch operations
                 op_done = False
                 result = None
 
-                if choice == 1:  # Add
+                if mode != "standard":
+                    modulus = None
+                    if mode == "modular":
+                        modulus = safe_get_number("Enter modulus: ", "int")
+                    result, message = power_mode(a, b, mode, modulus, backend)
+                    result_msg = format_equation(a, "^", b, result, message)
+                    if modulus is not None:
+                        result_msg += f" (mod {format_number(modulus)})"
+                    op_done = result is not None
+
+                elif backend != "float":  # Decimal/Fraction/int share one dispatcher
+                    op, symbol = MENU_OPERATIONS[choice]
+                    result, message = calculate(op, a, b, backend)
+                    result_msg = format_equation(a, symbol, b, result, message)
+                    op_done = result is not None
+
+                elif choice == 1:  # Add
                     try:
                         result = add(a, b)
                         result_msg = format_equation(a, "+", b, result)
@@ -378,6 +1918,7 @@ def run_calculator():
                 if op_done:
                     operations_count += 1
                     last_result = result
+                    record_result(result_msg.removeprefix("✅ ").split(" = ")[0], result)
                     print(f"📈 Successful operations: {operations_count}")
 
                     # Offer to store result in memory
@@ -411,5 +1952,230 @@ def run_calculator():
             continue
 
 
+# --------------
+# Command-Line Interface
+# --------------
+
+def build_arg_parser():
+    """Argument parser for non-interactive use."""
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        prog="calculator_v2.py",
+        description="Advanced Calculator. Run without arguments for the interactive menu.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    batch = commands.add_parser("batch", help="evaluate a CSV file column-wise")
+    batch.add_argument("input")
+    batch.add_argument("output")
+    group = batch.add_mutually_exclusive_group()
+    group.add_argument("--op", choices=sorted(BATCH_OPERATIONS), default="add")
+    group.add_argument("--expression", help="formula over header names, e.g. 'a*b+1'")
+    batch.add_argument("--columns", nargs="+", help="operand column names or indexes")
+    batch.add_argument("--chunk-rows", type=int, default=BATCH_CHUNK_ROWS)
+
+    stats = commands.add_parser("stats", help="streaming statistics of numbers in a file or stdin")
+    stats.add_argument("input", nargs="?", default="-", help="file to read ('-' = stdin)")
+    stats.add_argument("--quantiles", nargs="+", type=float, default=list(DEFAULT_QUANTILES))
+    stats.add_argument("--compression", type=int, default=200,
+                       help="t-digest size; higher is more accurate and uses more memory")
+
+    bench = commands.add_parser("bench", help="run benchmarks")
+    # no argparse choices: Python < 3.12 rejects an empty list against them
+    bench.add_argument("names", nargs="*", metavar="name",
+                       help="expressions, batch, backends, power, cache or stats "
+                            "(default: all)")
+    return parser
+
+
+def main(argv=None):
+    """Interactive calculator without arguments; batch/stats/bench subcommands otherwise.
+
+    Exit status: 0 success, 1 some rows failed, 2 usage or I/O error.
+    """
+    if argv is None:
+        argv = sys.argv[1:]
+    if not argv:
+        run_calculator()
+        return 0
+
+    args = build_arg_parser().parse_args(argv)
+    if args.command == "bench":
+        benchmarks = {"expressions": benchmark_expressions, "batch": benchmark_batch,
+                      "backends": benchmark_backends, "power": benchmark_power,
+                      "cache": benchmark_result_cache, "stats": benchmark_stream_stats}
+        unknown = [name for name in args.names if name not in benchmarks]
+        if unknown:
+            print(f"❌ Unknown benchmark(s): {', '.join(unknown)}", file=sys.stderr)
+            return 2
+        for name in args.names or list(benchmarks):
+            benchmarks[name]()
+        return 0
+
+    if args.command == "stats":
+        if args.compression < 20 or any(not 0.0 <= q <= 1.0 for q in args.quantiles):
+            print("❌ Need --compression >= 20 and quantiles between 0 and 1", file=sys.stderr)
+            return 2
+        stats = new_stream_stats(args.compression)
+        try:
+            if args.input == "-":
+                stream_stats_file(sys.stdin, stats)
+            else:
+                with open(args.input, encoding="utf-8") as f:
+                    stream_stats_file(f, stats)
+        except (OSError, UnicodeDecodeError) as e:
+            print(f"❌ Cannot read {args.input}: {e}", file=sys.stderr)
+            return 2
+        display_stream_summary(stream_summary(stats, args.quantiles))
+        return 0 if stats["count"] else 1
+
+    start = time.perf_counter()
+    ok, summary = batch_csv(args.input, args.output, args.op, args.columns,
+                            args.expression, args.chunk_rows)
+    if not ok:
+        print(f"❌ {summary}", file=sys.stderr)
+        return 2
+    elapsed = time.perf_counter() - start
+    failed = sum(summary["errors"].values())
+    print(f"✅ {summary['rows']:,} rows in {elapsed:.2f}s → {args.output}", file=sys.stderr)
+    for message, count in summary["errors"].items():
+        print(f"  ⚠️ {message}: {count:,} row(s)", file=sys.stderr)
+    return 1 if failed else 0
+
+
+# --------------
+# Benchmarks
+# --------------
+
+def benchmark_expressions(rows=200000, text="3*x^2 - 2*x*y + y/7 - (x + 1)/(y + 2)"):
+    """Compare AST interpretation with compiled evaluation over many bindings."""
+    bindings = [(float(i % 1000) / 10.0, float(i % 37) + 0.5) for i in range(rows)]
+    parse_expression(text)  # both paths start from a cached parse
+
+    start = time.perf_counter()
+    for x, y in bindings:
+        evaluate_expression(text, {"x": x, "y": y})
+    interpreted = time.perf_counter() - start
+
+    start = time.perf_counter()
+    function = compile_expression(text, ("x", "y"))
+    for x, y in bindings:
+        function(x, y)
+    compiled = time.perf_counter() - start
+
+    print(f"⏱️ interpreted: {rows / interpreted:,.0f} evaluations/s")
+    print(f"⏱️ compiled:    {rows / compiled:,.0f} evaluations/s "
+          f"({interpreted / compiled:.1f}x faster)")
+    return {"interpreted": interpreted, "compiled": compiled}
+
+
+def benchmark_batch(rows=1000000):
+    """Compare per-call divide() with batch_operation() on array('d') columns."""
+    a = array("d", (float(i % 1000) for i in range(rows)))
+    b = array("d", (float(i % 97) for i in range(rows)))  # every 97th row divides by zero
+
+    start = time.perf_counter()
+    for x, y in zip(a, b):
+        divide(x, y)
+    scalar = time.perf_counter() - start
+
+    start = time.perf_counter()
+    batch_operation("divide", a, b)
+    batch = time.perf_counter() - start
+
+    start = time.perf_counter()
+    batch_operation("multiply", memoryview(a), memoryview(b))
+    multiply = time.perf_counter() - start
+
+    print(f"⏱️ divide() per row:  {rows / scalar:,.0f} rows/s")
+    print(f"⏱️ batch divide:      {rows / batch:,.0f} rows/s ({scalar / batch:.1f}x faster)")
+    print(f"⏱️ batch multiply:    {rows / multiply:,.0f} rows/s (memoryview columns)")
+    return {"scalar": scalar, "batch": batch, "multiply": multiply}
+
+
+def benchmark_backends(rows=20000):
+    """Throughput of calculate() per backend on a mixed add/multiply/divide/power load."""
+    operands = [(str(i % 997 + 1), str(i % 13 + 1)) for i in range(rows)]
+    operations = ("add", "multiply", "divide", "power")
+    timings = {}
+    for backend in NUMERIC_BACKENDS:
+        prepared = [(to_number(a, backend), to_number(b, backend)) for a, b in operands]
+        start = time.perf_counter()
+        for i, (a, b) in enumerate(prepared):
+            calculate(operations[i & 3], a, b, backend)
+        timings[backend] = time.perf_counter() - start
+    baseline = timings["float"]
+    for backend, elapsed in timings.items():
+        print(f"⏱️ {backend:<8} {rows / elapsed:>12,.0f} ops/s ({elapsed / baseline:.1f}x float)")
+    return timings
+
+
+def benchmark_power(repeat=2000):
+    """Time each power mode on a workload it is meant for."""
+    cases = [
+        ("standard", "1.0001 ^ k, k < 1000", [(1.0001, k % 1000) for k in range(repeat)], None),
+        ("modular", "k ^ (10^18 + k) mod (10^9 + 7)",
+         [(k + 2, 10 ** 18 + k) for k in range(repeat)], 10 ** 9 + 7),
+        ("exact", "3 ^ (5000 + k), ~2,400 digits",
+         [(3, 5000 + k) for k in range(repeat)], None),
+        ("log", "1.5 ^ (10^7 + k), beyond float range",
+         [(1.5, 10 ** 7 + k) for k in range(repeat)], None),
+    ]
+    timings = {}
+    for mode, label, operands, modulus in cases:
+        start = time.perf_counter()
+        for a, b in operands:
+            power_mode(a, b, mode, modulus, "float")
+        timings[mode] = time.perf_counter() - start
+        print(f"⏱️ {mode:<8} {repeat / timings[mode]:>10,.0f} ops/s  ({label})")
+    return timings
+
+
+def benchmark_result_cache(calls=20000, distinct=200):
+    """Repeated exact powers from a small operand pool, with and without the cache."""
+    operands = [(3 + i % distinct, 2000 + i % distinct) for i in range(calls)]
+    saved = dict(RESULT_CACHE_STATS)
+    timings = {}
+    try:
+        for enabled in (False, True):
+            configure_result_cache(enabled)
+            clear_result_cache()
+            start = time.perf_counter()
+            for a, b in operands:
+                power_mode(a, b, "exact")
+            timings[enabled] = time.perf_counter() - start
+        hits = RESULT_CACHE_STATS["hits"]
+    finally:
+        configure_result_cache(saved["enabled"], saved["maxsize"])
+        clear_result_cache()
+    print(f"⏱️ uncached: {calls / timings[False]:,.0f} calls/s")
+    print(f"⏱️ cached:   {calls / timings[True]:,.0f} calls/s "
+          f"({hits / calls:.0%} hits, {timings[False] / timings[True]:.1f}x faster)")
+    return timings
+
+
+def benchmark_stream_stats(count=2000000):
+    """Streaming stats throughput and quantile rank error against an exact sort."""
+    import random
+
+    rng = random.Random(42)
+    values = array("d", (rng.lognormvariate(0.0, 1.0) for _ in range(count)))
+    stats = new_stream_stats()
+    start = time.perf_counter()
+    view = memoryview(values)
+    for offset in range(0, count, STATS_CHUNK):
+        stream_stats_extend(stats, view[offset:offset + STATS_CHUNK])
+    elapsed = time.perf_counter() - start
+
+    exact = sorted(values)
+    worst = 0.0
+    for q in DEFAULT_QUANTILES:
+        rank = bisect_left(exact, stream_quantile(stats, q)) / count
+        worst = max(worst, abs(rank - q))
+    print(f"⏱️ {count / elapsed:,.0f} values/s, {len(stats['centroids'][0])} centroids "
+          f"kept, worst quantile rank error {worst:.4%}")
+    return {"elapsed": elapsed, "rank_error": worst}
+
+
 if __name__ == "__main__":
-    run_calculator()
+    raise SystemExit(main())
@@ -303,6 +303,437 @@ def test_error_logging():
             f"   {status}: {error_type} count - Expected: {expected_count}, Got: {actual_count}")
 
 
+def test_expression_engine():
+    """Test tokenizer, parser precedence and guarded expression evaluation."""
+    print("\n6. Testing Expression Engine:")
+
+    import calculator_v2 as calc
+
+    calc._reset_session()
+    calc.memory_store(4.0)
+    test_cases = [
+        ("1 + 2 * 3", 7.0, "Multiplication binds tighter than addition"),
+        ("(1 + 2) * 3", 9.0, "Parentheses override precedence"),
+        ("-2 ^ 2", -4.0, "Power binds tighter than unary minus"),
+        ("2 ^ 3 ^ 2", 512.0, "Power is right-associative"),
+        ("2 ^ -1", 0.5, "Unary minus in exponent"),
+        ("10 - 4 - 3", 3.0, "Subtraction is left-associative"),
+        ("M * 2 + mem", 12.0, "Memory references"),
+        ("8 ÷ 2 × 3", 12.0, "Menu operator symbols"),
+        ("10 / 0", None, "Division by zero uses divide() guard"),
+        ("2 ^ 1001", None, "Exponent limit uses power() guard"),
+        ("1e308 * 10", None, "Overflow to infinity rejected"),
+        ("(-8) ^ 0.5", None, "Negative base with fractional exponent"),
+        ("2 * (3", None, "Missing closing parenthesis"),
+        ("3 + * 4", None, "Operator without operand"),
+        ("x + 1", None, "Unknown name"),
+    ]
+
+    try:
+        for text, expected, description in test_cases:
+            result, message = calc.evaluate_expression(text)
+            if expected is None:
+                assert result is None, f"{text} should fail"
+                print(f"   ✅ PASS: {description} - Expected error, got: {message}")
+            else:
+                assert result == expected, f"{text}: expected {expected}, got {result}"
+                print(f"   ✅ PASS: {description} - {text} = {result:g}")
+    finally:
+        calc._reset_session()
+
+    calc.parse_expression.cache_clear()
+    calc.evaluate_expression("(1 + 2) * 3")
+    calc.evaluate_expression("(1 + 2) * 3")
+    info = calc.parse_expression.cache_info()
+    assert info.hits == 1 and info.misses == 1
+    assert calc.parse_expression("1+2") is calc.parse_expression("1+2")
+    print("   ✅ PASS: Repeated expressions skip re-parsing")
+
+
+def test_compiled_expressions():
+    """Test that compiled expressions match the interpreter, guards included."""
+    print("\n7. Testing Compiled Expressions:")
+
+    import os
+    import tempfile
+    import calculator_v2 as calc
+
+    expressions = ["3*x^2 - 2*x*y + y/7", "x / (y - 2)", "x ^ y", "(x * 1e300) * y",
+                   "-x ^ 2 + M", "1 / (x * 1e308 * 10)"]
+    values = [0.0, 1.0, -2.0, 2.0, 0.5, 1e154, 1.5e154, 1001.0, float("inf"), float("nan")]
+    checked = 0
+    for text in expressions:
+        function = calc.compile_expression(text, ("x", "y"))
+        for x in values:
+            for y in values:
+                expected, _ = calc.evaluate_expression(text, {"x": x, "y": y})
+                try:
+                    actual = function(x, y)
+                except ArithmeticError:
+                    actual = None
+                assert actual == expected, f"{text} at x={x}, y={y}: {actual} != {expected}"
+                checked += 1
+    print(f"   ✅ PASS: {checked} compiled evaluations match the interpreter")
+
+    rows = list(calc.evaluate_compiled("x / y", ("x", "y"), [(1.0, 2.0), (1.0, 0.0)]))
+    assert rows == [(0.5, "Success"), (None, "Cannot divide by zero")]
+    print("   ✅ PASS: Division guard messages preserved in compiled code")
+
+    assert calc.compile_expression("x + 1", ("x",)) is calc.compile_expression("x + 1", ("x",))
+    try:
+        calc.compile_expression("x + z", ("x",))
+        raise AssertionError("Unknown names should fail at compile time")
+    except ValueError:
+        pass
+    print("   ✅ PASS: Compiled functions are cached; unknown names rejected up front")
+
+    deep = "(" * 300 + "x" + " + y) / y" * 300  # past CPython's parenthesis limit
+    function = calc.compile_expression(deep, ("x", "y"))
+    for x, y in ((1.0, 2.0), (3.0, 0.0), (1e308, 1e-300)):
+        expected, message = calc.evaluate_expression(deep, {"x": x, "y": y})
+        try:
+            actual = function(x, y)
+        except ArithmeticError as e:
+            actual = None
+            assert str(e) == message
+        assert actual == expected, (x, y, actual, expected)
+    with tempfile.TemporaryDirectory() as temp_dir:
+        source = os.path.join(temp_dir, "deep.csv")
+        with open(source, "w", encoding="utf-8") as f:
+            f.write("x,y\n1,2\n3,0\n")
+        ok, summary = calc.batch_csv(source, os.path.join(temp_dir, "out.csv"), expression=deep)
+        assert ok and summary["errors"] == {"Cannot divide by zero": 1}, summary
+    print("   ✅ PASS: 300-level nesting falls back to a tree walk, guards included")
+
+
+def test_batch_operations():
+    """Test column batch operations, error masks and CSV streaming."""
+    print("\n8. Testing Batch Operations:")
+
+    import os
+    import tempfile
+    from array import array
+    import calculator_v2 as calc
+
+    a = array("d", [10.0, 1.0, 1e308, -8.0, 7.0])
+    b = array("d", [4.0, 0.0, 1e-308, 2.0, -0.0])
+    results, mask = calc.batch_operation("divide", a, memoryview(b))
+    assert list(mask) == [calc.BATCH_OK, calc.BATCH_ZERO_DIVISION, calc.BATCH_NON_FINITE,
+                          calc.BATCH_OK, calc.BATCH_ZERO_DIVISION]
+    assert results[0] == 2.5 and results[3] == -4.0 and results[1] != results[1]
+    print("   ✅ PASS: Divide column flags zero divisors and overflow in the mask")
+
+    for op, scalar in (("add", calc.add), ("multiply", calc.multiply), ("power", calc.power)):
+        xs = [2.0, -8.0, 1e155, 0.0, 1e200, 3.0]
+        ys = [10.0, 0.5, 2.0, -1.0, 1e200, 1001.0]
+        results, mask = calc.batch_operation(op, xs, ys)
+        for x, y, value, code in zip(xs, ys, results, mask):
+            expected = scalar(x, y)
+            if isinstance(expected, tuple):
+                expected = expected[0]
+            if expected is None or not calc._is_finite(expected):
+                assert code != calc.BATCH_OK, f"{op}({x}, {y}) should be masked"
+            else:
+                assert code == calc.BATCH_OK and value == expected
+    print("   ✅ PASS: add/multiply/power columns agree with the scalar functions")
+
+    nan = float("nan")
+    results, mask = calc.batch_operation("power", [2.0, nan, 3.0], [2.0, 2.0, 2.0])
+    assert list(mask) == [calc.BATCH_OK, calc.BATCH_POWER_GUARD, calc.BATCH_OK]
+    results, mask = calc.batch_operation("power", [2.0, 3.0], [2.0, nan])
+    assert list(mask) == [calc.BATCH_OK, calc.BATCH_POWER_GUARD]
+    print("   ✅ PASS: A NaN anywhere in a power column takes the guarded path")
+
+    results, mask = calc.batch_operation("power", [10, 2], [400, 10])
+    assert list(mask) == [calc.BATCH_POWER_GUARD, calc.BATCH_OK] and results[1] == 1024.0
+    results, mask = calc.batch_operation("add", [10 ** 400, -10 ** 400, 1], [1, 1, 2])
+    assert list(mask) == [calc.BATCH_NON_FINITE, calc.BATCH_NON_FINITE, calc.BATCH_OK]
+    assert results[2] == 3.0
+    print("   ✅ PASS: Int columns past float range are masked, not raised")
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        source = os.path.join(temp_dir, "in.csv")
+        target = os.path.join(temp_dir, "out.csv")
+        with open(source, "w", encoding="utf-8") as f:
+            f.write("x,y,label\n6,3,a\n1,0,b\nabc,2,c\n2,5\n")
+        ok, summary = calc.batch_csv(source, target, "divide", chunk_rows=2)
+        assert ok and summary["rows"] == 4
+        with open(target, encoding="utf-8") as f:
+            lines = f.read().splitlines()
+        assert lines[0] == "x,y,label,result,error"
+        assert lines[1] == "6,3,a,2.0,"
+        assert lines[2] == "1,0,b,,Cannot divide by zero"
+        assert lines[3] == "abc,2,c,,Invalid number"
+        assert lines[4] == "2,5,0.4,"
+        print("   ✅ PASS: CSV rows stream through in chunks with result/error columns")
+
+        ok, summary = calc.batch_csv(source, target, expression="y ^ 2 + x")
+        assert ok and summary["errors"] == {"Invalid number": 1}
+        assert calc.main(["batch", source, target, "--op", "add"]) == 1
+        assert calc.main(["batch", os.path.join(temp_dir, "missing.csv"), target]) == 2
+        print("   ✅ PASS: Expression mode and CLI exit codes")
+
+        errors_csv = os.path.join(temp_dir, "errors.csv")
+        with open(errors_csv, "w", encoding="utf-8") as f:
+            f.write("x,y\n6,3\n1,0\n0,-1\n-8,0.5\n1e308,1\n")
+        ok, summary = calc.batch_csv(errors_csv, target, expression="x / y + x ^ y")
+        assert ok and summary["errors"] == {
+            "Cannot divide by zero": 1, "Power limits exceeded or overflow": 2,
+            calc.NON_FINITE_MESSAGE: 1}, summary
+        calc.HISTORY.clear()
+        ok, summary = calc.batch_csv(errors_csv, target, expression="x + ans[-1]", columns=["x"])
+        assert ok and summary["errors"] == {"Invalid operand": 5}, summary
+        print("   ✅ PASS: Expression failures keep their own error codes")
+
+
+def test_numeric_backends():
+    """Test Decimal, Fraction and exact-int backends and their guards."""
+    print("\n9. Testing Numeric Backends:")
+
+    from decimal import Decimal
+    from fractions import Fraction
+    import calculator_v2 as calc
+
+    try:
+        assert calc.calculate("add", "0.1", "0.2", "float")[0] != 0.3
+        assert calc.calculate("add", "0.1", "0.2", "decimal")[0] == Decimal("0.3")
+        assert calc.calculate("add", "0.1", "0.2", "fraction")[0] == Fraction(3, 10)
+        print("   ✅ PASS: 0.1 + 0.2 is exact with decimal and fraction backends")
+
+        ok, _ = calc.set_backend("decimal", 50)
+        assert ok and calc.BACKEND["name"] == "decimal"
+        third, _ = calc.calculate("divide", 1, 3)
+        assert str(third) == "0." + "3" * 50
+        assert not calc.set_backend("decimal", 0)[0]
+        print("   ✅ PASS: Decimal precision is configurable")
+
+        big, message = calc.calculate("power", 2, 5000, "int")
+        assert big == 2 ** 5000 and message == "Success"
+        assert calc.calculate("power", 2, 5000, "float")[0] is None
+        assert calc.calculate("power", 2, 5000, "decimal")[0] is not None
+        result, message = calc.calculate("power", 3, 10 ** 8, "fraction")
+        assert result is None and "too large" in message
+        result, message = calc.calculate("power", 10, 10 ** 7, "decimal")
+        assert result is None and "Decimal range" in message
+        print("   ✅ PASS: Overflow guards depend on the backend")
+
+        assert calc.calculate("divide", 7, 2, "int") == (3.5, "Success")
+        assert calc.calculate("divide", 8, 2, "int") == (4, "Success")
+        assert calc.calculate("divide", 1, 0, "fraction") == (None, "Cannot divide by zero")
+        assert calc.calculate("power", "-8", "0.5", "decimal")[0] is None
+        assert calc.calculate("add", "nan", 1, "decimal")[0] is None
+        print("   ✅ PASS: Division, domain and non-finite checks in every backend")
+
+        assert calc.format_number(Fraction(1, 3)) == "1/3"
+        assert calc.format_number(10 ** 400).endswith("e+400")
+        print("   ✅ PASS: Results format without float overflow")
+    finally:
+        calc._reset_session()
+
+
+def test_power_modes():
+    """Test modular, exact and log-domain power modes."""
+    print("\n10. Testing Power Modes:")
+
+    import math
+    from decimal import Decimal
+    from fractions import Fraction
+    import calculator_v2 as calc
+
+    assert calc.power_mode(2, 10 ** 18, "modular", 10 ** 9 + 7) == (pow(2, 10 ** 18, 10 ** 9 + 7), "Success")
+    assert calc.power_mode(3, -1, "modular", 7) == (5, "Success")
+    assert calc.power_mode(2, -1, "modular", 4)[0] is None
+    assert calc.power_mode(2.5, 3, "modular", 7)[0] is None
+    assert calc.power_mode(2, 3, "modular", 0)[0] is None
+    print("   ✅ PASS: Modular power handles huge exponents, inverses and bad moduli")
+
+    assert calc.power_mode(2, 3000, "exact") == (2 ** 3000, "Success")
+    assert calc.power_mode(2.5, 3, "exact") == (Fraction(125, 8), "Success")
+    result, message = calc.power_mode(10, 10 ** 7, "exact")
+    assert result is None and "10,000,000 digits" in message
+    print("   ✅ PASS: Exact power is bounded by an up-front size estimate, not ±1000")
+
+    result, _ = calc.power_mode(2, 1000, "log")
+    assert math.isclose(float(result), 2.0 ** 1000, rel_tol=1e-9)
+    result, _ = calc.power_mode(-1.5, 10 ** 7 + 1, "log")
+    assert result < 0 and result.adjusted() == math.floor((10 ** 7 + 1) * math.log10(1.5))
+    assert calc.power_mode(-8, 0.5, "log")[0] is None
+    assert calc.power_mode(0, -1, "log")[0] is None
+    assert calc.power_mode(1, 10 ** 400, "log") == (Decimal(1), "Success")
+    print("   ✅ PASS: Log-domain power reaches magnitudes far beyond float range")
+
+
+def test_result_cache():
+    """Test the LRU result cache, its statistics and NaN/-0.0 keys."""
+    print("\n11. Testing Result Cache:")
+
+    import math
+    import calculator_v2 as calc
+
+    calc._reset_session()
+    try:
+        calc.configure_result_cache(True, maxsize=3)
+        assert calc.calculate("multiply", -0.0, 5.0)[0] == 0.0
+        result, _ = calc.calculate("multiply", 0.0, 5.0)
+        assert math.copysign(1.0, result) == 1.0, "0.0 must not reuse the -0.0 entry"
+        result, _ = calc.calculate("multiply", -0.0, 5.0)
+        assert math.copysign(1.0, result) == -1.0
+        assert calc.RESULT_CACHE_STATS["hits"] == 1
+        print("   ✅ PASS: -0.0 and 0.0 are cached separately")
+
+        calc.power_mode(float("nan"), 2, "log")
+        calc.power_mode(float("nan") * 0, 2, "log")  # a different NaN object
+        assert calc.RESULT_CACHE_STATS["hits"] == 2
+        assert calc._cache_operand(1) != calc._cache_operand(1.0)
+        print("   ✅ PASS: NaN operands hit the cache; int and float keys differ")
+
+        calc.calculate("add", 1, 1)
+        calc.calculate("add", 2, 2)
+        assert len(calc.RESULT_CACHE) == 3
+        calc.calculate("multiply", -0.0, 5.0)  # evicted as least recently used
+        assert calc.RESULT_CACHE_STATS["misses"] == 6
+        print("   ✅ PASS: LRU eviction keeps the cache bounded")
+
+        calc.set_backend("decimal", 10)
+        short, _ = calc.calculate("divide", 1, 3)
+        calc.set_backend("decimal", 20)
+        longer, _ = calc.calculate("divide", 1, 3)
+        assert short != longer
+        print("   ✅ PASS: Backend and precision are part of the key")
+    finally:
+        calc._reset_session()
+
+
+def test_registers_and_history():
+    """Test named registers, ans[-k] history references and the session log."""
+    print("\n12. Testing Registers and Result History:")
+
+    import os
+    import tempfile
+    from decimal import Decimal
+    from fractions import Fraction
+    import calculator_v2 as calc
+
+    calc._reset_session()
+    try:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            log_file = os.path.join(temp_dir, "session.ndjson")
+            assert calc.open_session(log_file)[0]
+
+            calc.record_result("2 + 3", 5.0)
+            calc.record_result("ans * 10", 50.0)
+            assert "Stored" in calc.register_store("rate", 0.5)
+            assert "error" in calc.register_store("ans", 1.0)
+            assert calc.evaluate_expression("ans[-2] + ans * rate") == (30.0, "Success")
+            assert calc.compile_expression("ans[-1] * x", ("x",))(2.0) == 100.0
+            assert calc.evaluate_expression("ans[-3]")[0] is None
+            print("   ✅ PASS: ans, ans[-k] and named registers resolve in expressions")
+
+            for i in range(calc.HISTORY_SIZE + 5):
+                calc.record_result(f"#{i}", float(i))
+            assert len(calc.HISTORY) == calc.HISTORY_SIZE
+            assert calc.history_value(1) == calc.HISTORY_SIZE + 4
+            print("   ✅ PASS: History is a bounded ring buffer")
+
+            calc.register_store("exact", Decimal("0.1"))
+            calc.register_clear("rate")
+            saved_history = list(calc.HISTORY)
+            calc.REGISTERS.clear()
+            calc.HISTORY.clear()
+            ok, message = calc.open_session(log_file)
+            assert ok, message
+            assert list(calc.HISTORY) == saved_history
+            assert calc.REGISTERS == {"exact": Decimal("0.1")}
+            print("   ✅ PASS: Append-only log replays registers and history")
+
+            with open(log_file, encoding="utf-8") as f:
+                lines = sum(1 for _ in f)
+            assert lines <= calc.SESSION_COMPACT_FACTOR * (2 * calc.HISTORY_SIZE + 1)
+            with open(log_file, "a", encoding="utf-8") as f:
+                f.write('{"result": 1')  # torn final write
+            assert calc.open_session(log_file)[0]
+            assert list(calc.HISTORY) == saved_history
+            print("   ✅ PASS: Log stays compact and tolerates a torn last line")
+
+            big = 7 ** 20000  # ~16900 digits, past the int/str conversion limit
+            ratio = Fraction(big + 1, 3 ** 9000)
+            calc.record_result("7 ^ 20000", big)
+            calc.register_store("ratio", ratio)
+            calc.register_store("small", Fraction(1, 3))
+            assert calc.compact_session()[0]
+            calc.record_result("-(7 ^ 20000)", -big)
+            assert calc.open_session(log_file)[0]
+            assert calc.history_value(2) == big and calc.history_value(1) == -big
+            assert calc.REGISTERS["ratio"] == ratio
+            assert calc.REGISTERS["small"] == Fraction(1, 3)
+            print("   ✅ PASS: Ints past 4300 digits are logged as hex and replayed")
+    finally:
+        calc._reset_session()
+
+
+def test_stream_statistics():
+    """Test Welford/Chan variance, compensated sums and the quantile digest."""
+    print("\n13. Testing Streaming Statistics:")
+
+    import io
+    import math
+    import random
+    import statistics
+    import calculator_v2 as calc
+
+    rng = random.Random(7)
+    values = [rng.gauss(1e9, 3.0) for _ in range(50000)]  # large offset, small spread
+
+    pushed = calc.new_stream_stats()
+    for x in values:
+        calc.stream_stats_push(pushed, x)
+    chunked = calc.new_stream_stats()
+    for start in range(0, len(values), 4096):
+        calc.stream_stats_extend(chunked, values[start:start + 4096])
+    expected = statistics.variance(values)
+    for stats in (pushed, chunked):
+        summary = calc.stream_summary(stats)
+        assert summary["count"] == len(values)
+        assert abs(summary["variance"] - expected) / expected < 1e-6
+    print("   ✅ PASS: Welford and chunked (Chan) variance match statistics.variance")
+
+    stats = calc.new_stream_stats()
+    calc.stream_stats_extend(stats, [1e16, 1.0, -1e16] * 1000)
+    assert calc.stream_summary(stats)["sum"] == 1000.0
+    print("   ✅ PASS: Compensated sum survives catastrophic cancellation")
+
+    big = 1.7976931348623157e308  # DBL_MAX
+    stats = calc.stream_stats_file(io.StringIO(f"{big}\n{big}\n-1e308\n1e308\n"))
+    summary = calc.stream_summary(stats)
+    assert summary["count"] == 4 and math.isinf(summary["sum"])
+    assert abs(summary["mean"] - big / 2) / big < 1e-12
+    assert summary["min"] == -1e308 and summary["max"] == big
+    assert all(-1e308 <= v <= big for v in summary["quantiles"].values())
+    stats = calc.new_stream_stats()
+    calc.stream_stats_extend(stats, [1e308, 1e308])
+    calc.stream_stats_extend(stats, [1e308])
+    summary = calc.stream_summary(stats)
+    assert summary["mean"] == 1e308 and summary["variance"] == 0.0
+    print("   ✅ PASS: Values near DBL_MAX give a finite mean instead of OverflowError")
+
+    data = [rng.expovariate(1.0) for _ in range(200000)]
+    stats = calc.new_stream_stats(compression=100)
+    for start in range(0, len(data), 10000):
+        calc.stream_stats_extend(stats, data[start:start + 10000])
+    exact = sorted(data)
+    for q in (0.01, 0.5, 0.99):
+        estimate = calc.stream_quantile(stats, q)
+        rank = sum(1 for x in exact if x < estimate) / len(exact)
+        assert abs(rank - q) < 0.005, f"q={q}: rank {rank}"
+    assert len(stats["centroids"][0]) <= 100
+    print("   ✅ PASS: Quantile sketch within 0.5% rank error in bounded memory")
+
+    stats = calc.stream_stats_file(io.StringIO("1, 2\n3 abc\nnan\n4\n"))
+    summary = calc.stream_summary(stats, (0.5,))
+    assert summary["count"] == 4 and summary["mean"] == 2.5 and summary["skipped"] == 2
+    print("   ✅ PASS: Text streams parse in chunks and skip invalid tokens")
+
+
 def run_all_tests():
     """Run all test suites."""
     print("🚀 Running Comprehensive Test Suite...")
@@ -314,6 +745,14 @@ def run_all_tests():
     test_power_edge_cases()
     test_memory_operations()
     test_error_logging()
+    test_expression_engine()
+    test_compiled_expressions()
+    test_batch_operations()
+    test_numeric_backends()
+    test_power_modes()
+    test_result_cache()
+    test_registers_and_history()
+    test_stream_statistics()
 
     print("\n" + "=" * 60)
     print("✅ BULLETPROOF VALIDATION COMPLETE!")
@@ -331,6 +770,14 @@ def run_all_tests():
     print("   ✅ Error logging and statistics")
     print("   ✅ Non-finite number rejection (NaN, ±inf)")
     print("   ✅ Extremely large number handling")
+    print("   ✅ Expression parsing with precedence, parentheses and memory references")
+    print("   ✅ Compiled expressions matching the interpreter's overflow/NaN guards")
+    print("   ✅ Column batch operations with error masks and CSV streaming")
+    print("   ✅ Decimal/Fraction/int backends with backend-specific guards")
+    print("   ✅ Modular, exact and log-domain power modes")
+    print("   ✅ LRU result cache with correct NaN/-0.0 keys and hit/miss statistics")
+    print("   ✅ Named registers, ans[-k] history and append-only session log")
+    print("   ✅ Streaming statistics: Welford variance, compensated sums, quantile sketch")
 
     print("\n🎯 Try running: python3 calculator_v2.py")
     print("🧪 Test with: 'abc', 'nan', 'inf', division by zero, huge numbers, Ctrl+C, etc.")
@@ -3,8 +3,23 @@
 # Features: Bulletproof file I/O, configuration loading, batch operations, comprehensive error handling
 
 import random
+import secrets
+import sys
 import os
 import json
+import math
+import re
+import mmap
+import struct
+import hashlib
+import time
+import hmac
+import base64
+import binascii
+from collections import deque, namedtuple
+from contextlib import redirect_stdout
+from functools import lru_cache
+from itertools import islice
 from datetime import datetime
 
 # ---- Character pools (simple strings, no advanced data structures) ----
@@ -15,17 +30,29 @@ SYMBOLS = "!@#$%^&*()-_=+[]{};:,.?/"
 
 # ---- Global state and configuration ----
 ERROR_LOG = []  # Track session errors
-PASSWORD_HISTORY = []  # Track generated passwords
+PASSWORD_HISTORY = deque()  # Track generated passwords (bounded by max_history)
+HISTORY_STATS = {"strong": 0, "scored": 0, "entropy_total": 0.0}  # running totals
+HISTORY_LOG = {"unsaved": 0}  # entries added since the last append to the history file
+HISTORY_COMPACT_FACTOR = 2  # compact the log once it holds this many times max_history
+HISTORY_TAIL_BLOCK = 64 * 1024  # bytes read per step when seeking back from the end
 CONFIG = {
     "min_length": 8,
     "require_lower": True,
     "require_upper": True,
     "require_digit": True,
     "require_symbol": True,
-    "history_file": "password_history.json",
+    "history_file": "password_history.ndjson",
+    "legacy_history_file": "password_history.json",
+    "encrypt_history": False,
+    "encrypted_history_file": "password_history.enc",
     "config_file": "password_config.json",
-    "max_history": 100
+    "max_history": 100,
+    "check_blocklist": None,  # None: on whenever blocklist_file exists and loads
+    "hash_algorithm": "scrypt",
+    "wordlist_file": "wordlist.idx",
+    "blocklist_file": "breached_passwords.bloom"
 }
+DEFAULT_CONFIG = dict(CONFIG)  # a (re)loaded config file is applied on top of these
 
 # -------------------------
 # ERROR LOGGING AND SAFE INPUT FUNCTIONS
@@ -159,144 +186,728 @@ def generate_secure_password(length):
     return pwd
 
 
+# -------------------------
+# PASSPHRASE GENERATOR (diceware, memory-mapped wordlist index)
+# -------------------------
+# Index layout: header (magic, word count N), N+1 little-endian uint32 offsets,
+# then the UTF-8 words back to back. Word i is data[offset[i]:offset[i+1]], so a
+# lookup touches two offsets and one word; nothing is parsed at startup.
+
+WORDLIST_MAGIC = b"PTWORDS1"
+WORDLIST_HEADER = struct.Struct("<8sI")
+WORDLIST_OFFSET = struct.Struct("<I")
+WORDLIST_CACHE = {}  # index path -> loaded index dict
+
+
+def compile_wordlist(text_file, index_file):
+    """
+    Compile a wordlist (one word per line, or diceware `11111<TAB>word` lines) into
+    an indexed file. Duplicates and blank lines are dropped. Return (success, message).
+    """
+    try:
+        words = []
+        seen = set()
+        with open(text_file, "r", encoding="utf-8") as f:
+            for line in f:
+                fields = line.split()
+                if not fields:
+                    continue
+                word = fields[-1]
+                if word not in seen:
+                    seen.add(word)
+                    words.append(word)
+        if len(words) < 2:
+            return False, "Wordlist needs at least 2 distinct words"
+
+        encoded = [word.encode("utf-8") for word in words]
+        offsets = [0]
+        for word in encoded:
+            offsets.append(offsets[-1] + len(word))
+
+        temp_file = index_file + ".tmp"
+        with open(temp_file, "wb") as f:
+            f.write(WORDLIST_HEADER.pack(WORDLIST_MAGIC, len(words)))
+            f.write(struct.pack(f"<{len(offsets)}I", *offsets))
+            f.write(b"".join(encoded))
+        os.replace(temp_file, index_file)
+
+        WORDLIST_CACHE.pop(index_file, None)
+        bits = math.log2(len(words))
+        return True, f"Compiled {len(words)} words into {index_file} ({bits:.1f} bits/word)"
+
+    except FileNotFoundError:
+        log_error("FileNotFoundError", f"Wordlist not found: {text_file}")
+        return False, f"Wordlist not found: {text_file}"
+    except (OSError, UnicodeDecodeError) as e:
+        log_error("OSError", f"Cannot compile wordlist: {e}")
+        return False, f"Cannot compile wordlist: {e}"
+
+
+def load_wordlist_index(index_file=None):
+    """Memory-map a compiled wordlist (cached per path); raises ValueError if unusable."""
+    if index_file is None:
+        index_file = CONFIG["wordlist_file"]
+    if index_file in WORDLIST_CACHE:
+        return WORDLIST_CACHE[index_file]
+
+    try:
+        with open(index_file, "rb") as f:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError) as e:
+        log_error("WordlistError", f"Cannot open wordlist index {index_file}: {e}")
+        raise ValueError(f"No compiled wordlist at {index_file}; compile one first") from e
+
+    offsets_start = WORDLIST_HEADER.size
+    try:
+        magic, count = WORDLIST_HEADER.unpack_from(data, 0)
+        words_start = offsets_start + (count + 1) * WORDLIST_OFFSET.size
+        # The last offset is the end of the word block: truncation shows up here
+        (words_size,) = WORDLIST_OFFSET.unpack_from(data, words_start - WORDLIST_OFFSET.size)
+        valid = (magic == WORDLIST_MAGIC and count >= 2
+                 and len(data) >= words_start + words_size)
+    except struct.error:  # shorter than its header or offset table
+        valid = False
+    if not valid:
+        data.close()
+        log_error("WordlistError", f"Invalid or truncated wordlist index: {index_file}")
+        raise ValueError(f"Invalid wordlist index: {index_file}")
+
+    index = {
+        "data": data,
+        "count": count,
+        "offsets_start": offsets_start,
+        "words_start": words_start,
+    }
+    WORDLIST_CACHE[index_file] = index
+    return index
+
+
+def wordlist_word(index, i):
+    """Return word number `i` from a loaded index."""
+    position = index["offsets_start"] + i * WORDLIST_OFFSET.size
+    start, end = struct.unpack_from("<II", index["data"], position)
+    words_start = index["words_start"]
+    return index["data"][words_start + start:words_start + end].decode("utf-8")
+
+
+def generate_passphrase(word_count=6, separator="-", index=None):
+    """Pick `word_count` words uniformly (CSPRNG) from the compiled wordlist."""
+    if index is None:
+        index = load_wordlist_index()
+    words = []
+    for _ in range(word_count):
+        words.append(wordlist_word(index, secrets.randbelow(index["count"])))
+    return separator.join(words)
+
+
+def passphrase_entropy(word_count, index=None):
+    """Exact entropy of a generated passphrase: word_count * log2(wordlist size)."""
+    if index is None:
+        index = load_wordlist_index()
+    return round(word_count * math.log2(index["count"]), 1)
+
+
 # -------------------------
 # VALIDATION (pure functions)
 # -------------------------
 
+# Compiled, immutable validation policy: built once per distinct rule set, then
+# reused, so the per-password hot path does no option parsing or config checks.
+Policy = namedtuple("Policy", ["min_length", "required", "blocklist_file", "too_short"])
+
+CLASS_REQUIREMENTS = (  # (class marker, failure message) in reporting order
+    ("a", "Missing a lowercase letter."),
+    ("A", "Missing an uppercase letter."),
+    ("0", "Missing a digit."),
+    ("!", "Missing a symbol."),
+)
+
+
+@lru_cache(maxsize=64)
+def make_policy(min_length=8, require_lower=True, require_upper=True,
+                require_digit=True, require_symbol=True, blocklist_file=None):
+    """Compile policy options into an immutable Policy (cached per distinct options)."""
+    flags = (require_lower, require_upper, require_digit, require_symbol)
+    required = tuple(requirement for flag, requirement in zip(flags, CLASS_REQUIREMENTS)
+                     if flag)
+    return Policy(min_length, required, blocklist_file,
+                  f"Too short: need at least {min_length} characters.")
+
+
+def _char_classes(password):
+    """Return the set of class markers ("a", "A", "0", "!") present in the password."""
+    classes = set(password.translate(CLASS_TABLE))
+    others = classes.difference(CLASS_SIZES)
+    if others:
+        # Non-ASCII letters/digits still count (é is lowercase, ٣ is a digit)
+        classes -= others
+        for ch in others:
+            if ch.islower():
+                classes.add("a")
+            elif ch.isupper():
+                classes.add("A")
+            elif ch.isdigit():
+                classes.add("0")
+    return classes
+
+
+def validate_with_policy(password, policy):
+    """Return (is_valid, message) for a password under a compiled Policy."""
+    if len(password) < policy.min_length:
+        return False, policy.too_short
+
+    classes = _char_classes(password)
+    for marker, message in policy.required:
+        if marker not in classes:
+            return False, message
+
+    if policy.blocklist_file is not None:
+        blocklist = load_blocklist(policy.blocklist_file)
+        if blocklist is not None and is_breached(password, blocklist):
+            return False, "Found in a list of breached passwords."
+
+    return True, "Password is strong."
+
+
 def is_strong(password, min_length=8, require_lower=True, require_upper=True,
               require_digit=True, require_symbol=True):
     """
     Check password against rules; return True/False ONLY.
     (Detailed messages live in validate_password)
     """
-    # Length check
-    if len(password) < min_length:
-        return False
-
-    # Category checks via simple loops (no comprehensions yet)
-    has_lower = False
-    has_upper = False
-    has_digit = False
-    has_symbol = False
-
-    for ch in password:
-        if ch.islower():
-            has_lower = True
-        elif ch.isupper():
-            has_upper = True
-        elif ch.isdigit():
-            has_digit = True
-        elif ch in SYMBOLS:
-            has_symbol = True
-
-    if require_lower and not has_lower:
-        return False
-    if require_upper and not has_upper:
-        return False
-    if require_digit and not has_digit:
-        return False
-    if require_symbol and not has_symbol:
-        return False
-
-    return True
+    policy = make_policy(min_length, require_lower, require_upper,
+                         require_digit, require_symbol)
+    return validate_with_policy(password, policy)[0]
 
 
 def validate_password(password, min_length=8, require_lower=True, require_upper=True,
-                      require_digit=True, require_symbol=True):
+                      require_digit=True, require_symbol=True, blocklist_file=None):
     """
     Return a tuple: (is_valid, message)
       - is_valid: True/False
       - message: clear, user-friendly reason
+    If `blocklist_file` names a compiled filter, known-breached passwords are rejected.
     """
-    # Length first
-    if len(password) < min_length:
-        return False, f"Too short: need at least {min_length} characters."
-
-    # Category presence checks (recompute flags)
-    has_lower = False
-    has_upper = False
-    has_digit = False
-    has_symbol = False
-
-    for ch in password:
-        if ch.islower():
-            has_lower = True
-        elif ch.isupper():
-            has_upper = True
-        elif ch.isdigit():
-            has_digit = True
-        elif ch in SYMBOLS:
-            has_symbol = True
-
-    if require_lower and not has_lower:
-        return False, "Missing a lowercase letter."
-    if require_upper and not has_upper:
-        return False, "Missing an uppercase letter."
-    if require_digit and not has_digit:
-        return False, "Missing a digit."
-    if require_symbol and not has_symbol:
-        return False, "Missing a symbol."
+    policy = make_policy(min_length, require_lower, require_upper,
+                         require_digit, require_symbol, blocklist_file)
+    return validate_with_policy(password, policy)
 
-    return True, "Password is strong."
+
+# -------------------------
+# STRENGTH SCORING (entropy estimate in bits)
+# -------------------------
+
+# Common words/passwords; extend with load_strength_wordlist() for a bigger list
+COMMON_WORDS = (
+    "password passwd pass admin administrator root user login welcome letmein "
+    "master secret hello love lover iloveyou princess dragon monkey shadow sunshine "
+    "football baseball soccer hockey batman superman trustno1 freedom whatever "
+    "qwerty azerty access flower summer winter spring autumn michael jennifer "
+    "jordan hunter ranger buster thomas tigger charlie robert daniel george "
+    "computer internet google apple orange banana cookie cheese chocolate pepper "
+    "starwars pokemon ninja mustang harley matrix killer hacker game gamer "
+    "changeme default guest test demo secure security private company office "
+    "money dollar euro london paris berlin madrid america france canada "
+    "happy lucky angel baby family friend friends forever heart sweet "
+    "blue red green black white yellow purple silver golden gold"
+).split()
+
+KEYBOARD_ROWS = (
+    "qwertyuiop", "asdfghjkl", "zxcvbnm", "1234567890",
+    "azertyuiop", "qsdfghjklm", "wxcvbn", "abcdefghijklmnopqrstuvwxyz",
+)
+
+LEET_TABLE = str.maketrans({"0": "o", "1": "l", "3": "e", "4": "a", "5": "s",
+                            "7": "t", "@": "a", "$": "s", "!": "i"})
+
+STRENGTH_LABELS = (  # (minimum bits, label), checked from the top
+    (128, "very strong"),
+    (60, "strong"),
+    (36, "fair"),
+    (28, "weak"),
+    (0, "very weak"),
+)
+STRONG_LABELS = ("strong", "very strong")
+
+MIN_PATTERN_LEN = 3
+PATTERN_BITS = {}      # lowercase token -> bits an attacker needs to guess it
+PATTERN_PREFIXES = set()  # first MIN_PATTERN_LEN chars of every token (fast reject)
+MAX_PATTERN_LEN = 0
+
+
+def _build_pattern_table(words):
+    """Precompute dictionary words and keyboard runs into the shared lookup table."""
+    global MAX_PATTERN_LEN
+
+    sequences = set()
+    for row in KEYBOARD_ROWS:
+        for text in (row, row[::-1]):
+            for start in range(len(text)):
+                for end in range(start + MIN_PATTERN_LEN, len(text) + 1):
+                    sequences.add(text[start:end])
+
+    words = set(word.lower() for word in words if len(word) >= MIN_PATTERN_LEN)
+    word_bits = math.log2(max(len(words), 2))
+    sequence_bits = math.log2(len(sequences))
+
+    for token in sequences:
+        PATTERN_BITS[token] = sequence_bits
+    for token in words:
+        # A dictionary word is cheaper than a keyboard run only when the list is small
+        PATTERN_BITS[token] = min(word_bits, PATTERN_BITS.get(token, word_bits))
+
+    PATTERN_PREFIXES.update(token[:MIN_PATTERN_LEN] for token in PATTERN_BITS)
+    MAX_PATTERN_LEN = max(len(token) for token in PATTERN_BITS)
+
+
+def load_strength_wordlist(filename):
+    """Add a plain-text wordlist (one word per line) to the shared pattern table."""
+    try:
+        with open(filename, "r", encoding="utf-8", errors="replace") as f:
+            words = [line.strip() for line in f if line.strip()]
+        _build_pattern_table(COMMON_WORDS + words)
+        return True, f"Loaded {len(words)} words into strength dictionary"
+    except FileNotFoundError:
+        log_error("FileNotFoundError", f"Wordlist not found: {filename}")
+        return False, f"Wordlist not found: {filename}"
+    except OSError as e:
+        log_error("OSError", f"Cannot read wordlist: {e}")
+        return False, f"Cannot read wordlist: {e}"
+
+
+_build_pattern_table(COMMON_WORDS)
+
+
+# Maps every character to its class marker so one set() call finds all classes
+CLASS_TABLE = str.maketrans(
+    {ch: "a" for ch in LOWER} | {ch: "A" for ch in UPPER}
+    | {ch: "0" for ch in DIGITS} | {ch: "!" for ch in SYMBOLS})
+CLASS_SIZES = {"a": 26, "A": 26, "0": 10, "!": len(SYMBOLS)}
+REPEAT_OR_DIGITS = re.compile(r"(.)\1\1|\d{4}")
+
+
+CHARSET_BITS = {}  # class signature -> log2(pool size); signatures repeat across passwords
+CHARSET_CACHE_LIMIT = 4096  # Unicode passwords add new signatures; stop caching past this
+GRAM_SLICES = {}  # password length -> slice of every MIN_PATTERN_LEN-gram
+
+
+def _charset_size(password, classes=None):
+    """Size of the character pool an attacker must brute-force for this password."""
+    if classes is None:
+        classes = set(password.translate(CLASS_TABLE))
+    size = 0
+    for marker in classes:
+        if marker in CLASS_SIZES:
+            size += CLASS_SIZES[marker]
+    others = classes.difference(CLASS_SIZES)
+    if others:
+        # Spaces and other ASCII punctuation are a small pool; Unicode is a large one
+        size += 10 if all(ch.isascii() for ch in others) else 100
+    return max(size, 1)
+
+
+def _charset_bits(password):
+    """log2 of _charset_size(), cached by the set of character classes present."""
+    classes = frozenset(password.translate(CLASS_TABLE))
+    bits = CHARSET_BITS.get(classes)
+    if bits is None:
+        bits = math.log2(_charset_size(password, classes))
+        if len(CHARSET_BITS) < CHARSET_CACHE_LIMIT:
+            CHARSET_BITS[classes] = bits
+    return bits
+
+
+def _gram_slices(n):
+    """Slices of every MIN_PATTERN_LEN-gram in a string of length n, built once per n."""
+    slices = GRAM_SLICES.get(n)
+    if slices is None:
+        slices = GRAM_SLICES[n] = [slice(i, i + MIN_PATTERN_LEN)
+                                   for i in range(n - MIN_PATTERN_LEN + 1)]
+    return slices
+
+
+def _date_length(password, i):
+    """Return length of a plausible date (YYYY, DDMMYY, DDMMYYYY, YYYYMMDD) at i, else 0."""
+    for length in (8, 6):
+        chunk = password[i:i + length]
+        if len(chunk) == length and chunk.isdigit():
+            if length == 8:
+                candidates = ((chunk[0:4], chunk[4:6], chunk[6:8]),
+                              (chunk[4:8], chunk[2:4], chunk[0:2]),
+                              (chunk[4:8], chunk[0:2], chunk[2:4]))
+            else:
+                candidates = ((chunk[0:2], chunk[2:4], chunk[4:6]),
+                              (chunk[4:6], chunk[2:4], chunk[0:2]),
+                              (chunk[4:6], chunk[0:2], chunk[2:4]))
+            for year, month, day in candidates:
+                if length == 8 and not 1900 <= int(year) <= 2099:
+                    continue
+                if 1 <= int(month) <= 12 and 1 <= int(day) <= 31:
+                    return length
+    chunk = password[i:i + 4]
+    if len(chunk) == 4 and chunk.isdigit() and chunk[:2] in ("19", "20"):
+        return 4
+    return 0
+
+
+DATE_BITS = {4: math.log2(200), 6: math.log2(366 * 100), 8: math.log2(366 * 200)}
+
+
+def estimate_entropy(password):
+    """
+    Estimate guessing entropy in bits.
+    Brute-force characters cost log2(charset) each; dictionary words, keyboard
+    sequences, repeated characters and dates are charged as single guesses.
+    """
+    n = len(password)
+    if n == 0:
+        return 0.0
+
+    char_bits = _charset_bits(password)
+    lowered = password.lower()
+    unleeted = lowered.translate(LEET_TABLE)
+    patterns = PATTERN_BITS
+    prefixes = PATTERN_PREFIXES
+
+    # Fast path: nothing can start a pattern, so every character is brute force
+    grams = _gram_slices(n)
+    if (prefixes.isdisjoint(map(lowered.__getitem__, grams))
+            and (unleeted == lowered or prefixes.isdisjoint(map(unleeted.__getitem__, grams)))
+            and not REPEAT_OR_DIGITS.search(password)):
+        return round(n * char_bits, 1)
+
+    bits = 0.0
+    i = 0
+
+    while i < n:
+        # Repeated character run (aaaa, 1111)
+        ch = password[i]
+        run = 1
+        while i + run < n and password[i + run] == ch:
+            run += 1
+        if run >= MIN_PATTERN_LEN:
+            bits += char_bits + math.log2(run)
+            i += run
+            continue
+
+        # Dates
+        if password[i].isdigit():
+            date_len = _date_length(password, i)
+            if date_len:
+                bits += DATE_BITS[date_len]
+                i += date_len
+                continue
+
+        # Longest dictionary word / keyboard sequence starting at i
+        matched = 0
+        if (lowered[i:i + MIN_PATTERN_LEN] in prefixes
+                or unleeted[i:i + MIN_PATTERN_LEN] in prefixes):
+            for end in range(min(n, i + MAX_PATTERN_LEN), i + MIN_PATTERN_LEN - 1, -1):
+                token = lowered[i:end]
+                cost = patterns.get(token)
+                if cost is None:
+                    leet = unleeted[i:end]
+                    cost = patterns.get(leet)
+                    if cost is not None and leet != token:
+                        cost += 1  # attacker also tries common substitutions
+                if cost is not None:
+                    if token != password[i:end]:
+                        cost += 1  # capitalisation variant
+                    bits += cost
+                    matched = end - i
+                    break
+        if matched:
+            i += matched
+            continue
+
+        bits += char_bits
+        i += 1
+
+    return round(bits, 1)
+
+
+def strength_label(bits):
+    """Map an entropy score to a human label."""
+    for minimum, label in STRENGTH_LABELS:
+        if bits >= minimum:
+            return label
+    return STRENGTH_LABELS[-1][1]
+
+
+# -------------------------
+# BREACHED PASSWORD BLOCKLIST (Bloom filter, memory-mapped)
+# -------------------------
+
+BLOOM_MAGIC = b"PTBLOOM1"
+BLOOM_HEADER = struct.Struct("<8sQQQ")  # magic, bit count m, hash count k, entries n
+BLOCKLIST_CACHE = {}  # filter path -> loaded filter dict (or None if unavailable)
+
+
+def _bloom_hashes(password):
+    """Two independent 64-bit hashes; the k probe positions are h1 + i*h2 (double hashing)."""
+    digest = hashlib.blake2b(password.encode("utf-8", "surrogatepass"),
+                             digest_size=16).digest()
+    h1 = int.from_bytes(digest[:8], "little")
+    h2 = int.from_bytes(digest[8:], "little") | 1
+    return h1, h2
+
+
+def bloom_parameters(entry_count, false_positive_rate=0.001):
+    """Return (bit_count, hash_count) for the target false-positive rate."""
+    entry_count = max(entry_count, 1)
+    bits = math.ceil(-entry_count * math.log(false_positive_rate) / (math.log(2) ** 2))
+    bits = max(8, (bits + 7) // 8 * 8)  # whole bytes
+    hashes = max(1, round(bits / entry_count * math.log(2)))
+    return bits, hashes
+
+
+def build_blocklist(text_file, filter_file, false_positive_rate=0.001):
+    """
+    Compile a plain-text password list (one per line) into a Bloom filter file.
+    Two streaming passes: count entries, then set bits. Return (success, message).
+    """
+    try:
+        entry_count = 0
+        with open(text_file, "r", encoding="utf-8", errors="surrogateescape") as f:
+            for line in f:
+                if line.rstrip("\r\n"):
+                    entry_count += 1
+
+        bit_count, hash_count = bloom_parameters(entry_count, false_positive_rate)
+        bits = bytearray(bit_count // 8)
+
+        with open(text_file, "r", encoding="utf-8", errors="surrogateescape") as f:
+            for line in f:
+                password = line.rstrip("\r\n")
+                if not password:
+                    continue
+                h1, h2 = _bloom_hashes(password)
+                for i in range(hash_count):
+                    position = (h1 + i * h2) % bit_count
+                    bits[position >> 3] |= 1 << (position & 7)
+
+        os.makedirs(os.path.dirname(filter_file) if os.path.dirname(
+            filter_file) else ".", exist_ok=True)
+        with open(filter_file, "wb") as f:
+            f.write(BLOOM_HEADER.pack(BLOOM_MAGIC, bit_count, hash_count, entry_count))
+            f.write(bits)
+
+        BLOCKLIST_CACHE.pop(filter_file, None)
+        bits_per_entry = bit_count / max(entry_count, 1)
+        return True, (f"Compiled {entry_count} passwords into {filter_file} "
+                      f"({len(bits)} bytes, {bits_per_entry:.1f} bits/entry, k={hash_count})")
+
+    except FileNotFoundError:
+        log_error("FileNotFoundError", f"Blocklist source not found: {text_file}")
+        return False, f"Blocklist source not found: {text_file}"
+    except PermissionError as e:
+        log_error("PermissionError", f"Blocklist build permission error: {e}")
+        return False, f"Permission denied: {e}"
+    except OSError as e:
+        log_error("OSError", f"File system error building blocklist: {e}")
+        return False, f"File system error: {e}"
+
+
+def load_blocklist(filter_file):
+    """
+    Memory-map a compiled filter (cached per path). Return the filter dict, or None
+    if the file is missing or invalid; the failure is logged once per path.
+    """
+    if filter_file in BLOCKLIST_CACHE:
+        return BLOCKLIST_CACHE[filter_file]
+
+    blocklist = None
+    try:
+        with open(filter_file, "rb") as f:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            magic, bit_count, hash_count, entry_count = BLOOM_HEADER.unpack_from(data, 0)
+            # bit_count 0 would divide by zero and hash_count 0 would match everything
+            if (magic != BLOOM_MAGIC or bit_count < 8 or hash_count < 1
+                    or len(data) < BLOOM_HEADER.size + (bit_count + 7) // 8):
+                raise ValueError(f"Invalid blocklist file: {filter_file}")
+        except (ValueError, struct.error):
+            data.close()
+            raise
+        blocklist = {
+            "data": data,
+            "offset": BLOOM_HEADER.size,
+            "bit_count": bit_count,
+            "hash_count": hash_count,
+            "entry_count": entry_count,
+        }
+    except FileNotFoundError:
+        log_error("FileNotFoundError", f"Blocklist file not found: {filter_file}")
+    except (OSError, ValueError, struct.error) as e:
+        log_error("BlocklistError", f"Cannot load blocklist {filter_file}: {e}")
+
+    BLOCKLIST_CACHE[filter_file] = blocklist
+    return blocklist
+
+
+def is_breached(password, blocklist):
+    """True if `password` is (probably) in the blocklist; False is always exact."""
+    data = blocklist["data"]
+    offset = blocklist["offset"]
+    bit_count = blocklist["bit_count"]
+    h1, h2 = _bloom_hashes(password)
+    for i in range(blocklist["hash_count"]):
+        position = (h1 + i * h2) % bit_count
+        if not data[offset + (position >> 3)] & (1 << (position & 7)):
+            return False
+    return True
 
 
 # -------------------------
 # FILE I/O OPERATIONS WITH BULLETPROOF ERROR HANDLING
 # -------------------------
 
-def load_config(filename=None):
-    """Load configuration from file with comprehensive error handling."""
+# Typed config schema: key -> (exact type, minimum for ints or None)
+CONFIG_SCHEMA = {
+    "min_length": (int, 1),
+    "require_lower": (bool, None),
+    "require_upper": (bool, None),
+    "require_digit": (bool, None),
+    "require_symbol": (bool, None),
+    "history_file": (str, None),
+    "legacy_history_file": (str, None),
+    "encrypt_history": (bool, None),
+    "encrypted_history_file": (str, None),
+    "config_file": (str, None),
+    "max_history": (int, 0),
+    "check_blocklist": (bool, None),
+    "hash_algorithm": (str, None),
+    "wordlist_file": (str, None),
+    "blocklist_file": (str, None),
+}
+NULLABLE_CONFIG_KEYS = ("check_blocklist",)  # null means "decide automatically"
+CONFIG_CHECK_INTERVAL = 1.0  # seconds between config file mtime checks
+CONFIG_STATE = {"mtime": None, "next_check": 0.0}
+
+
+def validate_config_data(loaded_config):
+    """
+    Validate a loaded config object against CONFIG_SCHEMA in one pass.
+    Return (valid_values, errors); invalid or unknown keys are left out.
+    """
+    if not isinstance(loaded_config, dict):
+        return {}, ["Config root must be object"]
+
+    valid = {}
+    errors = []
+    for key, value in loaded_config.items():
+        if key not in CONFIG_SCHEMA:
+            errors.append(f"Unknown config key: {key}")
+            continue
+        expected_type, minimum = CONFIG_SCHEMA[key]
+        if value is None and key in NULLABLE_CONFIG_KEYS:
+            valid[key] = value
+        elif type(value) is not expected_type:  # exact: True is not a valid int here
+            errors.append(f"Invalid type for {key}: {type(value)}")
+        elif minimum is not None and value < minimum:
+            errors.append(f"Invalid value for {key}: {value}")
+        elif key == "hash_algorithm" and value not in HASH_DEFAULTS:
+            errors.append(f"Invalid value for {key}: {value}")
+        else:
+            valid[key] = value
+    return valid, errors
+
+
+def _blocklist_enabled():
+    """Explicit check_blocklist setting, or (if None) whether the filter file loads."""
+    check = CONFIG["check_blocklist"]
+    if check is not None:
+        return check
+    filter_file = CONFIG["blocklist_file"]
+    if filter_file not in BLOCKLIST_CACHE and not os.path.exists(filter_file):
+        return False  # no filter built yet: skip quietly instead of logging a miss
+    return load_blocklist(filter_file) is not None
+
+
+def current_policy():
+    """Return the compiled Policy for the active config (reloading it if the file changed)."""
+    refresh_config()
+    return make_policy(
+        CONFIG["min_length"], CONFIG["require_lower"], CONFIG["require_upper"],
+        CONFIG["require_digit"], CONFIG["require_symbol"],
+        CONFIG["blocklist_file"] if _blocklist_enabled() else None)
+
+
+def refresh_config(filename=None, interval=CONFIG_CHECK_INTERVAL):
+    """
+    Reload the config if its file changed since the last load. The file is stat()ed
+    at most once per `interval` seconds. Return True if a new config was applied.
+    """
+    now = time.monotonic()
+    if now < CONFIG_STATE["next_check"]:
+        return False
+    CONFIG_STATE["next_check"] = now + interval
+
     if filename is None:
         filename = CONFIG["config_file"]
+    try:
+        mtime = os.stat(filename).st_mtime_ns
+    except OSError:
+        return False
+    if mtime == CONFIG_STATE["mtime"]:
+        return False
+    ok, _ = load_config(filename, verbose=False)
+    return ok
 
-    default_config = CONFIG.copy()
+
+def load_config(filename=None, verbose=True):
+    """Load configuration from file with comprehensive error handling."""
+    if filename is None:
+        filename = CONFIG["config_file"]
 
     try:
+        # Remember which version we saw, even if it is invalid, so a hot-reload
+        # only retries once the file changes again
+        CONFIG_STATE["mtime"] = os.stat(filename).st_mtime_ns
         with open(filename, "r", encoding="utf-8") as f:
             loaded_config = json.load(f)
 
         # Validate config file format
         if not isinstance(loaded_config, dict):
-            print("❌ Invalid config format (must be a JSON object); using defaults")
+            if verbose:
+                print("❌ Invalid config format (must be a JSON object); using defaults")
             log_error("ConfigError", "Config root must be object")
             return False, "Invalid config format; using defaults"
 
-        # Validate and merge configuration
-        for key, value in loaded_config.items():
-            if key in default_config:
-                # Type validation
-                if isinstance(default_config[key], bool) and isinstance(value, bool):
-                    CONFIG[key] = value
-                elif isinstance(default_config[key], int) and isinstance(value, int):
-                    if key == "min_length" and value >= 1:
-                        CONFIG[key] = value
-                    elif key == "max_history" and value >= 0:
-                        CONFIG[key] = value
-                elif isinstance(default_config[key], str) and isinstance(value, str):
-                    CONFIG[key] = value
-                else:
-                    log_error("ConfigError",
-                              f"Invalid type for {key}: {type(value)}")
-            else:
-                log_error("ConfigError", f"Unknown config key: {key}")
+        # Validate once, then rebuild from the defaults so a key deleted from the
+        # file reverts instead of keeping its old value (config_file stays put)
+        valid, errors = validate_config_data(loaded_config)
+        for error in errors:
+            log_error("ConfigError", error)
+        rebuilt = dict(DEFAULT_CONFIG, config_file=CONFIG["config_file"])
+        rebuilt.update(valid)
+        CONFIG.clear()
+        CONFIG.update(rebuilt)
 
-        print(f"✅ Configuration loaded from {filename}")
+        _trim_history()  # max_history may have shrunk
+
+        if verbose:
+            print(f"✅ Configuration loaded from {filename}")
         return True, f"Configuration loaded successfully"
 
     except FileNotFoundError:
-        print(f"⚠️ Config file {filename} not found, using defaults")
+        if verbose:
+            print(f"⚠️ Config file {filename} not found, using defaults")
         log_error("FileNotFoundError", f"Config file not found: {filename}")
         return False, "Config file not found, using defaults"
     except json.JSONDecodeError as e:
-        print(f"❌ Invalid JSON in config file: {e}")
+        if verbose:
+            print(f"❌ Invalid JSON in config file: {e}")
         log_error("JSONDecodeError", f"Invalid JSON in config: {e}")
         return False, f"Invalid JSON in config file: {e}"
     except PermissionError:
-        print(f"❌ Permission denied reading {filename}")
+        if verbose:
+            print(f"❌ Permission denied reading {filename}")
         log_error("PermissionError", f"Cannot read config file: {filename}")
         return False, f"Permission denied reading {filename}"
     except Exception as e:
-        print(f"❌ Unexpected error loading config: {e}")
+        if verbose:
+            print(f"❌ Unexpected error loading config: {e}")
         log_error("ConfigError", f"Unexpected config load error: {e}")
         return False, f"Unexpected error: {e}"
 
@@ -325,24 +936,280 @@ def save_config(filename=None):
         return False, f"Unexpected error: {e}"
 
 
+def _read_tail_lines(filename, count):
+    """Return the last `count` non-empty lines, reading backwards from the end of the file."""
+    if count <= 0:
+        return []
+
+    blocks = []
+    newlines = 0
+    with open(filename, "rb") as f:
+        f.seek(0, os.SEEK_END)
+        position = f.tell()
+        while position > 0 and newlines <= count:
+            step = min(HISTORY_TAIL_BLOCK, position)
+            position -= step
+            f.seek(position)
+            block = f.read(step)
+            newlines += block.count(b"\n")
+            blocks.append(block)
+
+    lines = b"".join(reversed(blocks)).split(b"\n")
+    if position > 0:
+        lines = lines[1:]  # first piece may start mid-record
+    lines = [line.decode("utf-8") for line in lines if line.strip()]
+    return lines[-count:]
+
+
+def _write_history_lines(filename, lines):
+    """Atomically replace `filename` with the given NDJSON lines."""
+    temp_file = filename + ".tmp"
+    with open(temp_file, "w", encoding="utf-8") as f:
+        for line in lines:
+            f.write(line + "\n")
+    os.replace(temp_file, filename)
+
+
+def compact_history_file(filename=None):
+    """Rewrite the history log keeping only the newest max_history records."""
+    if filename is None:
+        filename = history_path()
+    lines = _read_history_tail(filename, CONFIG.get("max_history", 100))
+    if CONFIG["encrypt_history"]:
+        _write_encrypted_history(filename, lines)
+    else:
+        _write_history_lines(filename, lines)
+    return len(lines)
+
+
+def migrate_legacy_history(legacy_file, filename):
+    """
+    One-time conversion of a legacy JSON array history (list of dicts or strings)
+    into the NDJSON log. The legacy file is renamed to `<name>.bak` afterwards.
+    """
+    try:
+        with open(legacy_file, "r", encoding="utf-8") as f:
+            loaded_history = json.load(f)
+
+        if not isinstance(loaded_history, list):
+            log_error("HistoryError", "Invalid legacy history file format")
+            return False, "Invalid legacy history file format"
+
+        # Normalize: accept either list[dict] or list[str] for backward compatibility
+        lines = []
+        for item in loaded_history:
+            if isinstance(item, dict):
+                lines.append(json.dumps(item))
+            elif isinstance(item, str):
+                # Convert legacy string entries to new format (scored once, here)
+                entropy = estimate_entropy(item)
+                lines.append(json.dumps({
+                    "password": item,
+                    "type": "imported",
+                    "timestamp": datetime.now().isoformat(),
+                    "entropy": entropy,
+                    "strength": strength_label(entropy)
+                }))
+            else:
+                log_error("HistoryError",
+                          f"Unsupported entry type: {type(item)}")
+
+        _write_history_lines(filename, lines)
+        os.replace(legacy_file, legacy_file + ".bak")
+        return True, f"Migrated {len(lines)} entries from {legacy_file}"
+
+    except json.JSONDecodeError as e:
+        log_error("JSONDecodeError", f"Invalid JSON in legacy history: {e}")
+        return False, f"Invalid JSON in legacy history file: {e}"
+    except OSError as e:
+        log_error("OSError", f"Legacy history migration failed: {e}")
+        return False, f"Legacy history migration failed: {e}"
+
+
+# ---- Encrypted-at-rest history (stdlib only) ----
+# File layout: header (magic, scrypt salt and cost), then chunks. Each chunk is
+#   ciphertext length | nonce | ciphertext | HMAC-SHA256 tag | total chunk size
+# The trailing size lets tail reads walk chunks backwards from the end of file.
+# Keystream: SHAKE-256(enc_key || nonce); tag covers length, nonce and ciphertext.
+
+ENC_MAGIC = b"PTENC001"
+ENC_HEADER = struct.Struct("<8s16sBBB")  # magic, salt, log2(n), r, p
+ENC_CHUNK_HEAD = struct.Struct("<I16s")  # ciphertext length, nonce
+ENC_CHUNK_TAIL = struct.Struct("<I")     # total chunk size
+ENC_TAG_SIZE = 32
+ENC_SCRYPT = (14, 8, 1)  # log2(n), r, p
+HISTORY_KEYS = {}  # filename -> {"salt", "enc_key", "mac_key"}
+
+
+def derive_history_keys(passphrase, salt, cost=ENC_SCRYPT):
+    """Derive (encryption key, MAC key) from a passphrase with hashlib.scrypt."""
+    log2_n, r, p = cost
+    key = hashlib.scrypt(passphrase.encode("utf-8"), salt=salt, n=2 ** log2_n,
+                         r=r, p=p, dklen=64)
+    return key[:32], key[32:]
+
+
+def _keystream_xor(enc_key, nonce, data):
+    """XOR `data` with a SHAKE-256 keystream bound to (key, nonce)."""
+    if not data:
+        return b""
+    stream = hashlib.shake_256(enc_key + nonce).digest(len(data))
+    mixed = int.from_bytes(data, "little") ^ int.from_bytes(stream, "little")
+    return mixed.to_bytes(len(data), "little")
+
+
+def encrypt_history_chunk(keys, plaintext):
+    """Encrypt-then-MAC one chunk of NDJSON bytes; returns the framed chunk."""
+    nonce = os.urandom(16)
+    ciphertext = _keystream_xor(keys["enc_key"], nonce, plaintext)
+    head = ENC_CHUNK_HEAD.pack(len(ciphertext), nonce)
+    tag = hmac.new(keys["mac_key"], head + ciphertext, hashlib.sha256).digest()
+    size = len(head) + len(ciphertext) + ENC_TAG_SIZE + ENC_CHUNK_TAIL.size
+    return head + ciphertext + tag + ENC_CHUNK_TAIL.pack(size)
+
+
+def decrypt_history_chunk(keys, chunk):
+    """Verify and decrypt one framed chunk; raises ValueError if authentication fails."""
+    length, nonce = ENC_CHUNK_HEAD.unpack_from(chunk, 0)
+    body_end = ENC_CHUNK_HEAD.size + length
+    ciphertext = chunk[ENC_CHUNK_HEAD.size:body_end]
+    tag = chunk[body_end:body_end + ENC_TAG_SIZE]
+    expected = hmac.new(keys["mac_key"], chunk[:body_end], hashlib.sha256).digest()
+    if not hmac.compare_digest(tag, expected):
+        raise ValueError("History chunk failed authentication (wrong passphrase or tampered file)")
+    return _keystream_xor(keys["enc_key"], nonce, ciphertext)
+
+
+def unlock_history(passphrase, filename=None):
+    """Derive and cache keys for an encrypted history file (salt read from it if it exists)."""
+    if filename is None:
+        filename = CONFIG["encrypted_history_file"]
+    try:
+        with open(filename, "rb") as f:
+            magic, salt, log2_n, r, p = ENC_HEADER.unpack(f.read(ENC_HEADER.size))
+        if magic != ENC_MAGIC:
+            raise ValueError(f"Not an encrypted history file: {filename}")
+        cost = (log2_n, r, p)
+    except FileNotFoundError:
+        salt, cost = os.urandom(16), ENC_SCRYPT
+
+    enc_key, mac_key = derive_history_keys(passphrase, salt, cost)
+    HISTORY_KEYS[filename] = {"salt": salt, "cost": cost,
+                              "enc_key": enc_key, "mac_key": mac_key}
+    return HISTORY_KEYS[filename]
+
+
+def get_history_keys(filename):
+    """Return cached keys, asking for the passphrase (env var or prompt) on first use."""
+    if filename not in HISTORY_KEYS:
+        passphrase = os.environ.get("PASSWORD_TOOLKIT_PASSPHRASE")
+        if passphrase is None:
+            import getpass
+            passphrase = getpass.getpass("🔑 History passphrase: ")
+        unlock_history(passphrase, filename)
+    return HISTORY_KEYS[filename]
+
+
+def _encrypted_header(keys):
+    log2_n, r, p = keys["cost"]
+    return ENC_HEADER.pack(ENC_MAGIC, keys["salt"], log2_n, r, p)
+
+
+def _append_encrypted_history(filename, data):
+    """Append one encrypted chunk; existing chunks are never rewritten."""
+    keys = get_history_keys(filename)
+    chunk = encrypt_history_chunk(keys, data.encode("utf-8"))
+    new_file = not os.path.exists(filename) or os.path.getsize(filename) == 0
+    with open(filename, "ab") as f:
+        if new_file:
+            f.write(_encrypted_header(keys))
+        f.write(chunk)
+
+
+def _read_encrypted_tail_lines(filename, count):
+    """Decrypt chunks from the end of the file until `count` records are collected."""
+    if count <= 0:
+        return []
+    keys = get_history_keys(filename)
+    lines = []
+    with open(filename, "rb") as f:
+        magic, salt = ENC_HEADER.unpack(f.read(ENC_HEADER.size))[:2]
+        if magic != ENC_MAGIC or salt != keys["salt"]:
+            raise ValueError(f"Not an encrypted history file for this key: {filename}")
+        f.seek(0, os.SEEK_END)
+        position = f.tell()
+        while position > ENC_HEADER.size and len(lines) < count:
+            f.seek(position - ENC_CHUNK_TAIL.size)
+            (size,) = ENC_CHUNK_TAIL.unpack(f.read(ENC_CHUNK_TAIL.size))
+            position -= size
+            if size <= ENC_CHUNK_TAIL.size or position < ENC_HEADER.size:
+                raise ValueError("Corrupt chunk framing in encrypted history")
+            f.seek(position)
+            plaintext = decrypt_history_chunk(keys, f.read(size))
+            lines = [line for line in plaintext.decode("utf-8").split("\n")
+                     if line.strip()] + lines
+    return lines[-count:]
+
+
+def _write_encrypted_history(filename, lines):
+    """Atomically rewrite an encrypted history file as a single chunk (used by compaction)."""
+    keys = get_history_keys(filename)
+    data = "".join(line + "\n" for line in lines).encode("utf-8")
+    temp_file = filename + ".tmp"
+    with open(temp_file, "wb") as f:
+        f.write(_encrypted_header(keys))
+        f.write(encrypt_history_chunk(keys, data))
+    os.replace(temp_file, filename)
+
+
+def history_path():
+    """Active history file for the configured storage format."""
+    if CONFIG["encrypt_history"]:
+        return CONFIG["encrypted_history_file"]
+    return CONFIG["history_file"]
+
+
+def _read_history_tail(filename, count):
+    if CONFIG["encrypt_history"]:
+        return _read_encrypted_tail_lines(filename, count)
+    return _read_tail_lines(filename, count)
+
+
 def save_password_history(filename=None):
-    """Save password history to file with comprehensive error handling."""
+    """
+    Append entries added since the last save to the NDJSON history log
+    (as one encrypted chunk when encrypt_history is on).
+    The log is compacted once it grows past HISTORY_COMPACT_FACTOR * max_history records.
+    """
     if filename is None:
-        filename = CONFIG["history_file"]
+        filename = history_path()
 
-    if not PASSWORD_HISTORY:
-        return True, "No passwords to save"
+    pending = min(HISTORY_LOG["unsaved"], len(PASSWORD_HISTORY))
+    if pending == 0:
+        return True, "No new passwords to save"
 
     try:
         # Ensure directory exists
         os.makedirs(os.path.dirname(filename) if os.path.dirname(
             filename) else ".", exist_ok=True)
 
-        with open(filename, "w", encoding="utf-8") as f:
-            json.dump(PASSWORD_HISTORY, f, indent=2)
+        new_entries = islice(PASSWORD_HISTORY, len(PASSWORD_HISTORY) - pending, None)
+        data = "".join(json.dumps(entry) + "\n" for entry in new_entries)
+        if CONFIG["encrypt_history"]:
+            _append_encrypted_history(filename, data)
+        else:
+            with open(filename, "a", encoding="utf-8") as f:
+                f.write(data)
+        HISTORY_LOG["unsaved"] = 0
+
+        # json.dumps output is ASCII, so len(data) is the byte count
+        max_records = HISTORY_COMPACT_FACTOR * max(CONFIG.get("max_history", 100), 1)
+        if os.path.getsize(filename) > max_records * (len(data) / pending):
+            kept = compact_history_file(filename)
+            print(f"🗜️ Compacted {filename} to {kept} records")
 
-        print(f"✅ Saved {len(PASSWORD_HISTORY)} passwords to {filename}")
-        return True, f"Saved {len(PASSWORD_HISTORY)} passwords successfully"
+        print(f"✅ Saved {pending} new passwords to {filename}")
+        return True, f"Saved {pending} new passwords successfully"
 
     except PermissionError:
         print(f"❌ Permission denied writing {filename}")
@@ -359,95 +1226,143 @@ def save_password_history(filename=None):
 
 
 def load_password_history(filename=None):
-    """Load password history from file with error recovery."""
-    global PASSWORD_HISTORY
+    """Load the newest max_history records from the history log with error recovery."""
     if filename is None:
-        filename = CONFIG["history_file"]
+        filename = history_path()
 
     try:
-        with open(filename, "r", encoding="utf-8") as f:
-            loaded_history = json.load(f)
+        legacy_file = CONFIG["legacy_history_file"]
+        if (not CONFIG["encrypt_history"] and not os.path.exists(filename)
+                and os.path.exists(legacy_file)):
+            ok, message = migrate_legacy_history(legacy_file, filename)
+            print(f"🔄 {message}" if ok else f"❌ {message}")
 
-        # Validate and normalize loaded data
-        if isinstance(loaded_history, list):
-            # Normalize: accept either list[dict] or list[str] for backward compatibility
-            normalized = []
-            for item in loaded_history:
-                if isinstance(item, dict):
-                    normalized.append(item)
-                elif isinstance(item, str):
-                    # Convert legacy string entries to new format
-                    normalized.append({
-                        "password": item,
-                        "type": "imported",
-                        "timestamp": datetime.now().isoformat(),
-                        "strength": "strong" if is_strong(item) else "weak"
-                    })
-                else:
-                    log_error("HistoryError",
-                              f"Unsupported entry type: {type(item)}")
-
-            PASSWORD_HISTORY = normalized
-            print(
-                f"✅ Loaded {len(PASSWORD_HISTORY)} passwords from {filename}")
-            return True, f"Loaded {len(PASSWORD_HISTORY)} passwords successfully"
-        else:
-            log_error("HistoryError", "Invalid history file format")
-            return False, "Invalid history file format"
+        lines = _read_history_tail(filename, CONFIG.get("max_history", 100))
+        try:
+            # Fast path: parse every record in one call
+            items = json.loads("[" + ",".join(lines) + "]")
+        except json.JSONDecodeError:
+            # Slow path: find and skip the bad record(s), e.g. one cut short by a crash
+            items = []
+            for line in lines:
+                try:
+                    items.append(json.loads(line))
+                except json.JSONDecodeError as e:
+                    log_error("JSONDecodeError", f"Skipped corrupt history record: {e}")
+
+        entries = []
+        for item in items:
+            if isinstance(item, dict):
+                entries.append(item)
+            else:
+                log_error("HistoryError",
+                          f"Unsupported entry type: {type(item)}")
+
+        replace_history(entries)
+        print(
+            f"✅ Loaded {len(PASSWORD_HISTORY)} passwords from {filename}")
+        return True, f"Loaded {len(PASSWORD_HISTORY)} passwords successfully"
 
     except FileNotFoundError:
         print(f"⚠️ History file {filename} not found, starting fresh")
         log_error("FileNotFoundError", f"History file not found: {filename}")
-        PASSWORD_HISTORY = []
+        replace_history([])
         return False, "History file not found, starting fresh"
-    except json.JSONDecodeError as e:
-        print(f"❌ Invalid JSON in history file: {e}")
-        log_error("JSONDecodeError", f"Invalid JSON in history: {e}")
-        PASSWORD_HISTORY = []
-        return False, f"Invalid JSON in history file: {e}"
     except PermissionError:
         print(f"❌ Permission denied reading {filename}")
         log_error("PermissionError", f"Cannot read history file: {filename}")
         return False, f"Permission denied reading {filename}"
+    except UnicodeDecodeError as e:
+        # A ValueError too, but the bytes (or the decrypted plaintext) are bad, not the key
+        print(f"❌ History file {filename} is corrupt or unreadable: {e}")
+        log_error("HistoryError", f"Corrupt history file {filename}: {e}")
+        return False, f"History file is corrupt or unreadable: {e}"
+    except ValueError as e:
+        # Authentication failure: keep the file untouched and forget the bad key
+        print(f"❌ Cannot decrypt history: {e}")
+        log_error("DecryptionError", str(e))
+        HISTORY_KEYS.pop(filename, None)
+        return False, f"Cannot decrypt history: {e}"
     except Exception as e:
         print(f"❌ Unexpected error loading history: {e}")
         log_error("HistoryError", f"Unexpected history load error: {e}")
-        PASSWORD_HISTORY = []
+        replace_history([])
         return False, f"Unexpected error: {e}"
 
 
-def add_to_history(password, password_type="generated"):
-    """Add password to history with metadata."""
-    global PASSWORD_HISTORY
+def _account_history_entry(entry, sign):
+    """Add (sign=1) or remove (sign=-1) one entry's contribution to HISTORY_STATS."""
+    if entry.get("strength") in STRONG_LABELS:
+        HISTORY_STATS["strong"] += sign
+    if "entropy" in entry:
+        HISTORY_STATS["scored"] += sign
+        HISTORY_STATS["entropy_total"] += sign * entry["entropy"]
 
+
+def _trim_history():
+    """Evict oldest entries (O(1) each) until the history fits max_history."""
+    max_history = CONFIG.get("max_history", 100)
+    while len(PASSWORD_HISTORY) > max_history:
+        _account_history_entry(PASSWORD_HISTORY.popleft(), -1)
+
+
+def replace_history(entries):
+    """Replace history contents in place (same deque object) and rebuild the counters."""
+    PASSWORD_HISTORY.clear()
+    HISTORY_STATS["strong"] = 0
+    HISTORY_STATS["scored"] = 0
+    HISTORY_STATS["entropy_total"] = 0.0
+    for entry in entries:
+        PASSWORD_HISTORY.append(entry)
+        _account_history_entry(entry, 1)
+    HISTORY_LOG["unsaved"] = 0
+    _trim_history()
+
+
+def add_to_history(password, password_type="generated", entropy=None):
+    """
+    Add password to history with metadata. Pass `entropy` when it is known exactly
+    (e.g. generated passphrases); otherwise it is estimated.
+    """
+    if entropy is None:
+        entropy = estimate_entropy(password)
     entry = {
         "password": password,
         "type": password_type,
         "timestamp": datetime.now().isoformat(),
-        "strength": "strong" if is_strong(password) else "weak"
+        "entropy": entropy,
+        "strength": strength_label(entropy)
     }
 
     PASSWORD_HISTORY.append(entry)
+    _account_history_entry(entry, 1)
+    HISTORY_LOG["unsaved"] += 1
 
     # Maintain history size limit
-    max_history = CONFIG.get("max_history", 100)
-    if len(PASSWORD_HISTORY) > max_history:
-        PASSWORD_HISTORY = PASSWORD_HISTORY[-max_history:]
+    _trim_history()
 
 
 def batch_generate_passwords(count, password_type="secure", length=12):
-    """Generate multiple passwords with partial failure recovery."""
+    """
+    Generate multiple passwords with partial failure recovery.
+    For password_type="passphrase", `length` is the number of words.
+    """
     generated = []
     errors = []
 
     for i in range(count):
         try:
+            entropy = None
             if password_type == "simple":
                 password = generate_simple_password(length)
+            elif password_type == "passphrase":
+                index = load_wordlist_index()
+                password = generate_passphrase(length, index=index)
+                entropy = passphrase_entropy(length, index)
             else:
                 password = generate_secure_password(length)
 
-            add_to_history(password, f"batch_{password_type}")
+            add_to_history(password, f"batch_{password_type}", entropy)
             generated.append(password)
 
         except Exception as e:
@@ -458,6 +1373,313 @@ def batch_generate_passwords(count, password_type="secure", length=12):
     return generated, errors
 
 
+# -------------------------
+# BULK AUDIT (streaming, parallel chunks)
+# -------------------------
+
+def _read_line_chunks(f, chunk_size):
+    """Yield lists of (line_number, password) without reading the whole file."""
+    chunk = []
+    for line_no, line in enumerate(f, 1):
+        password = line.rstrip("\r\n")
+        if not password:
+            continue  # blank lines are not passwords
+        chunk.append((line_no, password))
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _audit_chunk(job):
+    """Validate one chunk; runs inside a worker process. Returns (line_no, ok, message, length)."""
+    chunk, policy = job
+    results = []
+    for line_no, password in chunk:
+        ok, message = validate_with_policy(password, policy)
+        results.append((line_no, ok, message, len(password)))
+    return results
+
+
+def _map_chunks(worker, chunks, arg, workers):
+    """
+    Yield worker((chunk, arg)) for each chunk in input order, using a process pool
+    when workers > 1 and keeping at most 2*workers chunks in flight.
+    """
+    if workers <= 1:
+        for chunk in chunks:
+            yield worker((chunk, arg))
+        return
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = []
+        for chunk in chunks:
+            pending.append(pool.submit(worker, (chunk, arg)))
+            if len(pending) >= workers * 2:
+                yield pending.pop(0).result()
+        for future in pending:
+            yield future.result()
+
+
+def new_audit_report():
+    """Return an empty aggregated audit report."""
+    return {
+        "total": 0,
+        "passed": 0,
+        "failed": 0,
+        "failure_reasons": {},   # message -> count
+        "length_distribution": {},  # length -> count
+    }
+
+
+def audit_password_file(input_file, output_file=None, chunk_size=10000, workers=None,
+                        policy=None):
+    """
+    Stream-audit a password file (one password per line) against the policy.
+    Per-line results go to `output_file` as tab-separated `line_no, PASS/FAIL, message`.
+    Return a tuple: (success, report_or_message)
+    """
+    if policy is None:
+        policy = current_policy()
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if chunk_size < 1:
+        return False, "Chunk size must be >= 1"
+
+    report = new_audit_report()
+    out = None
+
+    try:
+        with open(input_file, "r", encoding="utf-8", errors="replace") as f:
+            if output_file is not None:
+                out = open(output_file, "w", encoding="utf-8")
+
+            chunks = _read_line_chunks(f, chunk_size)
+            for results in _map_chunks(_audit_chunk, chunks, policy, workers):
+                lines = []
+                for line_no, ok, message, length in results:
+                    report["total"] += 1
+                    lengths = report["length_distribution"]
+                    lengths[length] = lengths.get(length, 0) + 1
+                    if ok:
+                        report["passed"] += 1
+                    else:
+                        report["failed"] += 1
+                        reasons = report["failure_reasons"]
+                        reasons[message] = reasons.get(message, 0) + 1
+                    if out is not None:
+                        status = "PASS" if ok else "FAIL"
+                        lines.append(f"{line_no}\t{status}\t{message}\n")
+                if out is not None:
+                    out.write("".join(lines))
+
+        return True, report
+
+    except FileNotFoundError:
+        log_error("FileNotFoundError", f"Audit file not found: {input_file}")
+        return False, f"Audit file not found: {input_file}"
+    except PermissionError as e:
+        log_error("PermissionError", f"Audit permission error: {e}")
+        return False, f"Permission denied: {e}"
+    except OSError as e:
+        log_error("OSError", f"File system error during audit: {e}")
+        return False, f"File system error: {e}"
+    finally:
+        if out is not None:
+            out.close()
+
+
+def display_audit_report(report):
+    """Print an aggregated audit report (histograms only, never passwords)."""
+    total = report["total"]
+    print("\n🔎 Audit Report:")
+    print(f"Passwords audited: {total}")
+    if total == 0:
+        return
+    print(f"Passed: {report['passed']} ({report['passed'] / total:.1%})")
+    print(f"Failed: {report['failed']} ({report['failed'] / total:.1%})")
+
+    if report["failure_reasons"]:
+        print("\n❌ Failure reasons:")
+        reasons = sorted(report["failure_reasons"].items(),
+                         key=lambda item: -item[1])
+        for message, count in reasons:
+            print(f"  {count:>10}  {message}")
+
+    print("\n📏 Length distribution:")
+    for length in sorted(report["length_distribution"]):
+        count = report["length_distribution"][length]
+        print(f"  {length:>4} chars: {count}")
+
+
+# -------------------------
+# PASSWORD HASHING (scrypt / PBKDF2, encoded parameters)
+# -------------------------
+# Encoded formats (parameters travel with the hash, so they can be raised later):
+#   $scrypt$ln=15,r=8,p=1$<salt b64>$<hash b64>
+#   $pbkdf2-sha256$i=600000$<salt b64>$<hash b64>
+
+HASH_DEFAULTS = {
+    "scrypt": {"ln": 15, "r": 8, "p": 1},
+    "pbkdf2-sha256": {"i": 600000},
+}
+HASH_PARAM_LIMITS = {  # inclusive ranges accepted from encoded hashes
+    "scrypt": {"ln": (1, 20), "r": (1, 64), "p": (1, 16)},
+    "pbkdf2-sha256": {"i": (1, 100_000_000)},
+}
+HASH_SALT_BYTES = 16
+HASH_KEY_BYTES = 32
+
+
+def _b64(data):
+    return base64.b64encode(data).decode("ascii")
+
+
+def _derive_hash(algorithm, password, salt, params):
+    """Run the KDF; raises ValueError for an unknown algorithm."""
+    secret = password.encode("utf-8")
+    if algorithm == "scrypt":
+        n, r, p = 2 ** params["ln"], params["r"], params["p"]
+        return hashlib.scrypt(secret, salt=salt, n=n, r=r, p=p, dklen=HASH_KEY_BYTES,
+                              maxmem=256 * n * r + 1024 * 1024)
+    if algorithm == "pbkdf2-sha256":
+        return hashlib.pbkdf2_hmac("sha256", secret, salt, params["i"], HASH_KEY_BYTES)
+    raise ValueError(f"Unknown hash algorithm: {algorithm}")
+
+
+def hash_password(password, algorithm="scrypt", params=None):
+    """Return an encoded hash string with a fresh random salt."""
+    if params is None:
+        params = HASH_DEFAULTS[algorithm]
+    salt = os.urandom(HASH_SALT_BYTES)
+    digest = _derive_hash(algorithm, password, salt, params)
+    encoded_params = ",".join(f"{key}={value}" for key, value in params.items())
+    return f"${algorithm}${encoded_params}${_b64(salt)}${_b64(digest)}"
+
+
+def parse_password_hash(encoded):
+    """Split an encoded hash into (algorithm, params, salt, digest); raises ValueError."""
+    parts = encoded.split("$")
+    if len(parts) != 5 or parts[0] != "":
+        raise ValueError("Malformed password hash")
+    algorithm, param_text, salt_text, digest_text = parts[1:]
+    if algorithm not in HASH_DEFAULTS:
+        raise ValueError(f"Unknown hash algorithm: {algorithm}")
+    params = {}
+    for item in param_text.split(","):
+        key, _, value = item.partition("=")
+        params[key] = int(value)
+    if set(params) != set(HASH_DEFAULTS[algorithm]):
+        raise ValueError(f"Missing or unexpected parameters for {algorithm}")
+    for key, (low, high) in HASH_PARAM_LIMITS[algorithm].items():
+        if not low <= params[key] <= high:
+            raise ValueError(f"{algorithm} parameter {key}={params[key]} outside {low}..{high}")
+    salt = base64.b64decode(salt_text, validate=True)
+    digest = base64.b64decode(digest_text, validate=True)
+    if not salt or not digest:
+        raise ValueError("Malformed password hash")
+    return algorithm, params, salt, digest
+
+
+def verify_password(password, encoded):
+    """Constant-time check of `password` against an encoded hash. Malformed hashes never match."""
+    try:
+        algorithm, params, salt, digest = parse_password_hash(encoded)
+    except (ValueError, binascii.Error) as e:
+        log_error("HashError", f"Malformed password hash: {e}")
+        return False
+    try:
+        candidate = _derive_hash(algorithm, password, salt, params)
+    except (ValueError, MemoryError) as e:  # parameters the KDF itself refuses
+        log_error("HashError", f"Cannot derive hash: {e}")
+        return False
+    return hmac.compare_digest(candidate, digest)
+
+
+def needs_rehash(encoded, algorithm="scrypt", params=None):
+    """True if the hash uses a different algorithm or different cost than the target."""
+    if params is None:
+        params = HASH_DEFAULTS[algorithm]
+    try:
+        current_algorithm, current_params, _, _ = parse_password_hash(encoded)
+    except (ValueError, binascii.Error):
+        return True
+    return current_algorithm != algorithm or current_params != params
+
+
+def tune_hash_params(target_ms=250, algorithm="scrypt"):
+    """
+    Benchmark this machine and return the cheapest params whose hash takes at
+    least `target_ms` (or the largest tried, for scrypt at ln=20).
+    """
+    salt = os.urandom(HASH_SALT_BYTES)
+    target = target_ms / 1000
+
+    if algorithm == "scrypt":
+        params = dict(HASH_DEFAULTS["scrypt"])
+        params["ln"] = 10
+        while True:
+            start = time.perf_counter()
+            _derive_hash("scrypt", "tuning", salt, params)
+            elapsed = time.perf_counter() - start
+            if elapsed >= target or params["ln"] >= 20:
+                return params
+            params["ln"] += 1  # each step doubles time and memory
+
+    if algorithm == "pbkdf2-sha256":
+        probe = {"i": 20000}
+        start = time.perf_counter()
+        _derive_hash(algorithm, "tuning", salt, probe)
+        elapsed = time.perf_counter() - start
+        iterations = int(probe["i"] * target / max(elapsed, 1e-9))
+        return {"i": max(1000, iterations // 1000 * 1000)}
+
+    raise ValueError(f"Unknown hash algorithm: {algorithm}")
+
+
+def _hash_chunk(job):
+    """Hash one chunk of (line_no, line) in a worker. Lines are `label<TAB>password` or `password`."""
+    chunk, (algorithm, params) = job
+    results = []
+    for line_no, line in chunk:
+        label, tab, password = line.partition("\t")
+        if not tab:
+            label, password = str(line_no), line
+        results.append(f"{label}\t{hash_password(password, algorithm, params)}\n")
+    return results
+
+
+def bulk_hash_file(input_file, output_file, algorithm="scrypt", params=None,
+                   chunk_size=64, workers=None):
+    """
+    Stream `label<TAB>password` lines (or bare passwords) into `label<TAB>hash` lines,
+    hashing chunks across a process pool. Return (success, message).
+    """
+    if params is None:
+        params = HASH_DEFAULTS[algorithm]
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    count = 0
+    try:
+        with open(input_file, "r", encoding="utf-8", errors="replace") as f_in, \
+                open(output_file, "w", encoding="utf-8") as f_out:
+            chunks = _read_line_chunks(f_in, chunk_size)
+            for lines in _map_chunks(_hash_chunk, chunks, (algorithm, params), workers):
+                f_out.write("".join(lines))
+                count += len(lines)
+        return True, f"Hashed {count} passwords into {output_file}"
+    except FileNotFoundError:
+        log_error("FileNotFoundError", f"Rehash input not found: {input_file}")
+        return False, f"Input file not found: {input_file}"
+    except OSError as e:
+        log_error("OSError", f"File system error during bulk hashing: {e}")
+        return False, f"File system error: {e}"
+
+
 # -------------------------
 # CLI INTERFACE
 # -------------------------
@@ -475,10 +1697,12 @@ def display_menu():
     print("6) Save/Load operations")
     print("7) Configuration & Statistics")
     print("8) Run self-tests")
-    print("9) Quit")
+    print("9) Audit password file")
+    print("10) Hash / verify passwords for storage")
+    print("11) Quit")
     print("=" * 65)
 
-    return safe_get_menu_choice(1, 9)
+    return safe_get_menu_choice(1, 11)
 
 
 def display_save_load_menu():
@@ -488,9 +1712,11 @@ def display_save_load_menu():
     print("2) Load password history")
     print("3) Save configuration")
     print("4) Load configuration")
-    print("5) Back to main menu")
+    print("5) Build breached-password filter from a text list")
+    print("6) Compile passphrase wordlist")
+    print("7) Back to main menu")
 
-    return safe_get_menu_choice(1, 5)
+    return safe_get_menu_choice(1, 7)
 
 
 def display_config_menu():
@@ -505,6 +1731,18 @@ def display_config_menu():
     return safe_get_menu_choice(1, 5)
 
 
+def display_hash_menu():
+    """Display password hashing menu."""
+    print("\n🔏 Password Hashing:")
+    print("1) Hash a password")
+    print("2) Verify a password against a stored hash")
+    print("3) Bulk hash a password file")
+    print("4) Auto-tune hash cost for this machine")
+    print("5) Back to main menu")
+
+    return safe_get_menu_choice(1, 5)
+
+
 def get_password_length():
     """Get password length with enhanced validation."""
     return safe_get_int("Enter password length: ", min_val=1, max_val=128)
@@ -517,18 +1755,22 @@ def display_statistics():
     print(f"Total errors logged: {len(ERROR_LOG)}")
 
     if PASSWORD_HISTORY:
-        strong_count = sum(
-            1 for entry in PASSWORD_HISTORY if entry.get("strength") == "strong")
-        print(f"Strong passwords: {strong_count}/{len(PASSWORD_HISTORY)}")
+        print(f"Strong passwords: {HISTORY_STATS['strong']}/{len(PASSWORD_HISTORY)}")
+        if HISTORY_STATS["scored"]:
+            average = HISTORY_STATS["entropy_total"] / HISTORY_STATS["scored"]
+            print(f"Average entropy: {average:.1f} bits")
 
         # Show recent passwords (without revealing actual passwords)
         print("\n🔍 Recent Password History (last 5):")
-        for entry in PASSWORD_HISTORY[-5:]:
+        recent = list(islice(reversed(PASSWORD_HISTORY), 5))
+        for entry in reversed(recent):
             timestamp = entry.get("timestamp", "unknown")[
                 :19]  # Remove microseconds
             password_type = entry.get("type", "unknown")
             strength = entry.get("strength", "unknown")
-            print(f"  {timestamp} | {password_type} | {strength}")
+            entropy = entry.get("entropy")
+            bits = f" ({entropy:.1f} bits)" if entropy is not None else ""
+            print(f"  {timestamp} | {password_type} | {strength}{bits}")
 
     if ERROR_LOG:
         print("\n❌ Error Summary:")
@@ -573,11 +1815,11 @@ def display_password_history():
         if reveal_passwords:
             password = entry.get("password", "***")
             print(
-                f"{i:3}. {timestamp} | {password_type:15} | {strength:6} | {password}")
+                f"{i:3}. {timestamp} | {password_type:15} | {strength:11} | {password}")
         else:
             length = len(entry.get("password", ""))
             print(
-                f"{i:3}. {timestamp} | {password_type:15} | {strength:6} | [hidden, {length} chars]")
+                f"{i:3}. {timestamp} | {password_type:15} | {strength:11} | [hidden, {length} chars]")
 
 
 def run_password_tool():
@@ -596,13 +1838,13 @@ def run_password_tool():
             try:
                 choice = display_menu()
 
-                if choice == 9:  # Quit
+                if choice == 11:  # Quit
                     print("\n👋 Thank you for using Password Toolkit v2.0!")
                     print(
                         f"📊 Session summary: {len(PASSWORD_HISTORY)} passwords generated, {len(ERROR_LOG)} errors handled")
 
                     # Offer to save before quitting
-                    if PASSWORD_HISTORY:
+                    if HISTORY_LOG["unsaved"]:
                         try:
                             save_choice = input(
                                 "💾 Save password history before quitting? (Y/n): ").lower().strip()
@@ -626,6 +1868,9 @@ def run_password_tool():
                         is_valid, message = validate_password(password)
                         strength_status = "🟢 STRONG" if is_valid else "🟡 WEAK"
                         print(f"   Strength: {strength_status} - {message}")
+                        entropy = estimate_entropy(password)
+                        print(
+                            f"   Entropy: {entropy:.1f} bits ({strength_label(entropy)})")
 
                     except Exception as e:
                         print(f"❌ Password generation failed: {e}")
@@ -643,6 +1888,9 @@ def run_password_tool():
                         is_valid, message = validate_password(password)
                         strength_status = "🟢 STRONG" if is_valid else "🟡 WEAK"
                         print(f"   Strength: {strength_status} - {message}")
+                        entropy = estimate_entropy(password)
+                        print(
+                            f"   Entropy: {entropy:.1f} bits ({strength_label(entropy)})")
 
                     except Exception as e:
                         print(f"❌ Password generation failed: {e}")
@@ -657,11 +1905,16 @@ def run_password_tool():
                         print("Password type:")
                         print("1) Simple (letters + digits)")
                         print("2) Secure (all categories)")
-                        type_choice = safe_get_menu_choice(1, 2)
+                        print("3) Passphrase (diceware words)")
+                        type_choice = safe_get_menu_choice(1, 3)
 
-                        length = get_password_length()
+                        if type_choice == 3:
+                            length = safe_get_int(
+                                "Words per passphrase: ", min_val=1, max_val=20)
+                        else:
+                            length = get_password_length()
 
-                        password_type = "simple" if type_choice == 1 else "secure"
+                        password_type = ("simple", "secure", "passphrase")[type_choice - 1]
                         generated, errors = batch_generate_passwords(
                             count, password_type, length)
 
@@ -694,12 +1947,8 @@ def run_password_tool():
                     try:
                         password = safe_get_string(
                             "Enter password to validate: ", min_length=1)
-                        is_valid, message = validate_password(password,
-                                                              min_length=CONFIG["min_length"],
-                                                              require_lower=CONFIG["require_lower"],
-                                                              require_upper=CONFIG["require_upper"],
-                                                              require_digit=CONFIG["require_digit"],
-                                                              require_symbol=CONFIG["require_symbol"])
+                        is_valid, message = validate_with_policy(
+                            password, current_policy())
 
                         status = "🟢 STRONG" if is_valid else "🔴 WEAK"
                         print(f"{status}: {message}")
@@ -732,7 +1981,22 @@ def run_password_tool():
                             save_config()
                         elif save_load_choice == 4:  # Load config
                             load_config()
-                        elif save_load_choice == 5:  # Back
+                        elif save_load_choice == 5:  # Build blocklist filter
+                            text_file = safe_get_string(
+                                "Path to plain-text password list: ", min_length=1)
+                            print("⏳ Compiling filter...")
+                            ok, message = build_blocklist(
+                                text_file, CONFIG["blocklist_file"])
+                            print(f"✅ {message}" if ok else f"❌ {message}")
+                            if ok and CONFIG["check_blocklist"] is not False:
+                                print("🛡️ Breached-password check enabled")
+                        elif save_load_choice == 6:  # Compile wordlist
+                            text_file = safe_get_string(
+                                "Path to wordlist (one word per line): ", min_length=1)
+                            ok, message = compile_wordlist(
+                                text_file, CONFIG["wordlist_file"])
+                            print(f"✅ {message}" if ok else f"❌ {message}")
+                        elif save_load_choice == 7:  # Back
                             continue
 
                     except Exception as e:
@@ -773,6 +2037,66 @@ def run_password_tool():
                         print(f"❌ Self-tests failed: {e}")
                         log_error("TestError", f"Self-tests failed: {e}")
 
+                elif choice == 9:  # Audit password file
+                    try:
+                        input_file = safe_get_string(
+                            "Path to password file: ", min_length=1)
+                        output_file = input(
+                            "Per-line results file (blank to skip): ").strip() or None
+                        print("⏳ Auditing...")
+                        ok, result = audit_password_file(input_file, output_file)
+                        if ok:
+                            display_audit_report(result)
+                            if output_file:
+                                print(f"✅ Per-line results written to {output_file}")
+                        else:
+                            print(f"❌ {result}")
+                    except (KeyboardInterrupt, EOFError):
+                        print("\n👋 Goodbye!")
+                        raise SystemExit(0)
+                    except Exception as e:
+                        print(f"❌ Audit failed: {e}")
+                        log_error("AuditError", f"Audit failed: {e}")
+
+                elif choice == 10:  # Hash / verify passwords
+                    try:
+                        hash_choice = display_hash_menu()
+                        algorithm = CONFIG["hash_algorithm"]
+
+                        if hash_choice == 1:  # Hash
+                            password = safe_get_string(
+                                "Password to hash: ", min_length=1)
+                            print(hash_password(password, algorithm))
+                        elif hash_choice == 2:  # Verify
+                            password = safe_get_string("Password: ", min_length=1)
+                            encoded = safe_get_string("Stored hash: ", min_length=1)
+                            if verify_password(password, encoded):
+                                print("🟢 Password matches")
+                                if needs_rehash(encoded, algorithm):
+                                    print("⚠️ Hash uses outdated parameters; rehash it")
+                            else:
+                                print("🔴 Password does not match")
+                        elif hash_choice == 3:  # Bulk hash
+                            input_file = safe_get_string(
+                                "Input file (label<TAB>password per line): ")
+                            output_file = safe_get_string("Output file: ")
+                            print("⏳ Hashing...")
+                            ok, message = bulk_hash_file(
+                                input_file, output_file, algorithm)
+                            print(f"✅ {message}" if ok else f"❌ {message}")
+                        elif hash_choice == 4:  # Auto-tune
+                            target_ms = safe_get_int(
+                                "Target latency in ms: ", min_val=10, max_val=5000)
+                            params = tune_hash_params(target_ms, algorithm)
+                            HASH_DEFAULTS[algorithm] = params
+                            print(f"✅ Using {algorithm} parameters {params} this session")
+                        elif hash_choice == 5:  # Back
+                            continue
+
+                    except Exception as e:
+                        print(f"❌ Hashing operation failed: {e}")
+                        log_error("HashError", f"Hashing operation failed: {e}")
+
             except (KeyboardInterrupt, EOFError):
                 print("\n👋 Goodbye!")
                 break
@@ -788,6 +2112,386 @@ def run_password_tool():
         print("🔄 Application shutting down safely...")
 
 
+# -------------------------
+# NON-INTERACTIVE CLI (subcommands for shell pipelines)
+# -------------------------
+# Exit codes: 0 = everything passed, 1 = some passwords failed policy,
+#             2 = usage or I/O error (argparse also uses 2 for usage errors)
+
+EXIT_OK = 0
+EXIT_FAILED = 1
+EXIT_ERROR = 2
+CLI_FLUSH_LINES = 8192  # output lines buffered before each write
+CLI_POLICY_REFRESH_LINES = 100000  # re-check the config file this often when streaming
+
+
+def _cli_generate(args):
+    if args.count < 1 or args.length < 1:
+        print("❌ count and --length must be positive", file=sys.stderr)
+        return EXIT_ERROR
+    # --length counts words for passphrases, so only character lengths meet min_length
+    min_length = current_policy().min_length
+    if args.type != "passphrase" and args.length < min_length:
+        print(f"❌ --length {args.length} is below the policy minimum of {min_length}",
+              file=sys.stderr)
+        return EXIT_ERROR
+
+    # stdout carries only passwords; history status lines go to stderr
+    if args.save_history:
+        with redirect_stdout(sys.stderr):
+            load_password_history()
+    if args.type == "passphrase":
+        index = load_wordlist_index()
+        entropy = passphrase_entropy(args.length, index)
+
+    out = []
+    for _ in range(args.count):
+        if args.type == "simple":
+            password = generate_simple_password(args.length)
+        elif args.type == "passphrase":
+            password = generate_passphrase(args.length, index=index)
+        else:
+            password = generate_secure_password(args.length)
+        if args.save_history:
+            add_to_history(password, f"cli_{args.type}",
+                           entropy if args.type == "passphrase" else None)
+        out.append(password)
+        if len(out) >= CLI_FLUSH_LINES:
+            sys.stdout.write("\n".join(out) + "\n")
+            out = []
+    if out:
+        sys.stdout.write("\n".join(out) + "\n")
+
+    if args.save_history:
+        with redirect_stdout(sys.stderr):
+            ok, _ = save_password_history()
+        if not ok:
+            return EXIT_ERROR
+    return EXIT_OK
+
+
+def _cli_validate(args):
+    """Validate stdin line by line; print PASS/FAIL<TAB>message unless --quiet."""
+    policy = current_policy()
+    failed = 0
+    out = []
+    for line_no, line in enumerate(sys.stdin, 1):
+        if line_no % CLI_POLICY_REFRESH_LINES == 0:
+            policy = current_policy()  # pick up edited policies mid-stream
+        password = line.rstrip("\r\n")
+        ok, message = validate_with_policy(password, policy)
+        if not ok:
+            failed += 1
+        if not args.quiet:
+            out.append(("PASS\t" if ok else "FAIL\t") + message)
+            if len(out) >= CLI_FLUSH_LINES:
+                sys.stdout.write("\n".join(out) + "\n")
+                out = []
+    if out:
+        sys.stdout.write("\n".join(out) + "\n")
+    return EXIT_FAILED if failed else EXIT_OK
+
+
+def _cli_audit(args):
+    ok, result = audit_password_file(args.file, args.output, args.chunk_size,
+                                     args.workers, current_policy())
+    if not ok:
+        print(f"❌ {result}", file=sys.stderr)
+        return EXIT_ERROR
+    display_audit_report(result)
+    return EXIT_FAILED if result["failed"] else EXIT_OK
+
+
+def _cli_stats(args):
+    ok, message = load_password_history()
+    if not ok and os.path.exists(history_path()):
+        print(f"❌ {message}", file=sys.stderr)
+        return EXIT_ERROR
+    display_statistics()
+    return EXIT_OK
+
+
+def _cli_bench(args):
+    benchmarks = {
+        "strength": benchmark_strength,
+        "blocklist": benchmark_blocklist,
+        "history": benchmark_history_io,
+        "wordlist": benchmark_wordlist,
+        "cli": benchmark_cli,
+    }
+    unknown = [name for name in args.names if name not in benchmarks]
+    if unknown:
+        print(f"❌ Unknown benchmark(s): {', '.join(unknown)}", file=sys.stderr)
+        return EXIT_ERROR
+    for name in args.names or list(benchmarks):
+        benchmarks[name]()
+    return EXIT_OK
+
+
+def build_arg_parser():
+    """Argument parser for the non-interactive subcommands."""
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        prog="password_toolkit_v2.py",
+        description="Password Toolkit. Run without arguments for the interactive menu.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    generate = commands.add_parser("generate", help="print N generated passwords")
+    generate.add_argument("count", type=int)
+    generate.add_argument("--type", choices=("simple", "secure", "passphrase"),
+                          default="secure")
+    generate.add_argument("--length", type=int, default=12,
+                          help="characters, or words for passphrases")
+    generate.add_argument("--save-history", action="store_true",
+                          help="also record the passwords in the history file")
+    generate.set_defaults(handler=_cli_generate)
+
+    validate = commands.add_parser("validate", help="validate passwords from stdin")
+    validate.add_argument("--quiet", action="store_true",
+                          help="no per-line output; exit status only")
+    validate.set_defaults(handler=_cli_validate)
+
+    audit = commands.add_parser("audit", help="audit a password file")
+    audit.add_argument("file")
+    audit.add_argument("--output", help="per-line results file")
+    audit.add_argument("--workers", type=int, default=None)
+    audit.add_argument("--chunk-size", type=int, default=10000)
+    audit.set_defaults(handler=_cli_audit)
+
+    stats = commands.add_parser("stats", help="show history statistics")
+    stats.set_defaults(handler=_cli_stats)
+
+    bench = commands.add_parser("bench", help="run benchmarks")
+    # no argparse choices: Python < 3.12 rejects an empty list against them
+    bench.add_argument("names", nargs="*", metavar="name",
+                       help="strength, blocklist, history, wordlist or cli (default: all)")
+    bench.set_defaults(handler=_cli_bench)
+
+    return parser
+
+
+def main(argv=None):
+    """Entry point: interactive menu without arguments, subcommands otherwise."""
+    if argv is None:
+        argv = sys.argv[1:]
+    if not argv:
+        run_password_tool()
+        return EXIT_OK
+
+    args = build_arg_parser().parse_args(argv)
+    if os.path.exists(CONFIG["config_file"]):
+        load_config(verbose=False)
+    try:
+        return args.handler(args)
+    except BrokenPipeError:
+        # Downstream closed early (e.g. `| head`); silence the flush at exit
+        devnull = os.open(os.devnull, os.O_WRONLY)
+        os.dup2(devnull, sys.stdout.fileno())
+        return EXIT_OK
+    except (ValueError, OSError) as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return EXIT_ERROR
+    except KeyboardInterrupt:
+        return EXIT_ERROR
+
+
+# -------------------------
+# BENCHMARKS
+# -------------------------
+
+def benchmark_strength(count=100000, length=12):
+    """Score `count` generated passwords and return passwords scored per second."""
+    passwords = [generate_secure_password(length) for _ in range(count)]
+    start = time.perf_counter()
+    for password in passwords:
+        estimate_entropy(password)
+    elapsed = time.perf_counter() - start
+    rate = count / elapsed if elapsed > 0 else float("inf")
+    print(f"⏱️ estimate_entropy: {count} passwords in {elapsed:.3f}s ({rate:,.0f}/s)")
+    return rate
+
+
+def benchmark_blocklist(entry_count=1000000, lookups=100000, false_positive_rate=0.001):
+    """Build a filter from `entry_count` random passwords; report size, build and lookup speed."""
+    import sys
+    import tempfile
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        text_file = os.path.join(temp_dir, "breached.txt")
+        filter_file = os.path.join(temp_dir, "breached.bloom")
+        with open(text_file, "w", encoding="utf-8") as f:
+            for _ in range(entry_count):
+                f.write(generate_simple_password(10) + "\n")
+
+        start = time.perf_counter()
+        ok, message = build_blocklist(text_file, filter_file, false_positive_rate)
+        build_time = time.perf_counter() - start
+        if not ok:
+            print(f"❌ {message}")
+            return None
+        print(f"⏱️ build: {message} in {build_time:.2f}s")
+
+        # Compare with an in-memory set of the same passwords
+        with open(text_file, "r", encoding="utf-8") as f:
+            as_set = set(line.rstrip("\n") for line in f)
+        set_bytes = sys.getsizeof(as_set) + sum(sys.getsizeof(p) for p in as_set)
+        filter_bytes = os.path.getsize(filter_file)
+        print(f"💾 filter: {filter_bytes:,} bytes vs Python set: {set_bytes:,} bytes "
+              f"({set_bytes / filter_bytes:.0f}x larger)")
+
+        blocklist = load_blocklist(filter_file)
+        probes = [generate_secure_password(12) for _ in range(lookups)]
+        start = time.perf_counter()
+        false_positives = 0
+        for password in probes:
+            if is_breached(password, blocklist):
+                false_positives += 1
+        elapsed = time.perf_counter() - start
+        print(f"⏱️ lookup: {lookups / elapsed:,.0f}/s, observed false-positive rate "
+              f"{false_positives / lookups:.4%} (target {false_positive_rate:.4%})")
+
+        blocklist["data"].close()
+        BLOCKLIST_CACHE.pop(filter_file, None)
+        return {"build_seconds": build_time, "filter_bytes": filter_bytes,
+                "set_bytes": set_bytes, "lookups_per_second": lookups / elapsed}
+
+
+def benchmark_history_io(history_size=1000, saves=200):
+    """
+    Compare per-save and load latency of the legacy full-JSON rewrite, the NDJSON
+    append log and the encrypted chunked log, with `history_size` entries kept.
+    """
+    import contextlib
+    import io
+    import tempfile
+
+    saved_config = dict(CONFIG)
+    saved_history = list(PASSWORD_HISTORY)
+    results = {}
+    try:
+        with tempfile.TemporaryDirectory() as temp_dir, \
+                contextlib.redirect_stdout(io.StringIO()):
+            CONFIG["max_history"] = history_size
+            seed = [generate_secure_password(16) for _ in range(history_size)]
+
+            # Legacy: json.dump of the whole history on every save
+            legacy_file = os.path.join(temp_dir, "legacy.json")
+            replace_history([])
+            for password in seed:
+                add_to_history(password, "bench")
+            start = time.perf_counter()
+            for _ in range(saves):
+                add_to_history(generate_secure_password(16), "bench")
+                with open(legacy_file, "w", encoding="utf-8") as f:
+                    json.dump(list(PASSWORD_HISTORY), f, indent=2)
+            results["json_save"] = (time.perf_counter() - start) / saves
+            start = time.perf_counter()
+            with open(legacy_file, "r", encoding="utf-8") as f:
+                replace_history(json.load(f))
+            results["json_load"] = time.perf_counter() - start
+
+            for label, encrypt in (("ndjson", False), ("encrypted", True)):
+                CONFIG["encrypt_history"] = encrypt
+                CONFIG["history_file"] = os.path.join(temp_dir, "history.ndjson")
+                CONFIG["encrypted_history_file"] = os.path.join(temp_dir, "history.enc")
+                if encrypt:
+                    unlock_history("benchmark passphrase")
+                replace_history([])
+                for password in seed:
+                    add_to_history(password, "bench")
+                save_password_history()
+
+                start = time.perf_counter()
+                for _ in range(saves):
+                    add_to_history(generate_secure_password(16), "bench")
+                    save_password_history()
+                results[f"{label}_save"] = (time.perf_counter() - start) / saves
+
+                start = time.perf_counter()
+                load_password_history()
+                results[f"{label}_load"] = time.perf_counter() - start
+            HISTORY_KEYS.clear()
+    finally:
+        CONFIG.clear()
+        CONFIG.update(saved_config)
+        replace_history(saved_history)
+
+    print(f"⏱️ History I/O with {history_size} entries ({saves} saves):")
+    for label in ("json", "ndjson", "encrypted"):
+        print(f"  {label:10} save {results[label + '_save'] * 1000:8.3f} ms   "
+              f"load {results[label + '_load'] * 1000:8.3f} ms")
+    return results
+
+
+def benchmark_wordlist(word_count=100000, passphrases=10000):
+    """Compare startup cost and memory of a Python list wordlist vs the mmap'd index."""
+    import sys
+    import tempfile
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        text_file = os.path.join(temp_dir, "words.txt")
+        index_file = os.path.join(temp_dir, "words.idx")
+        with open(text_file, "w", encoding="utf-8") as f:
+            for i in range(word_count):
+                f.write(f"{generate_simple_password(6).lower()}{i}\n")
+        ok, message = compile_wordlist(text_file, index_file)
+        if not ok:
+            print(f"❌ {message}")
+            return None
+
+        start = time.perf_counter()
+        with open(text_file, "r", encoding="utf-8") as f:
+            words = [line.strip() for line in f]
+        list_load = time.perf_counter() - start
+        list_bytes = sys.getsizeof(words) + sum(sys.getsizeof(w) for w in words)
+
+        start = time.perf_counter()
+        index = load_wordlist_index(index_file)
+        index_load = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for _ in range(passphrases):
+            generate_passphrase(6, index=index)
+        rate = passphrases / (time.perf_counter() - start)
+
+        print(f"⏱️ list load: {list_load * 1000:.2f} ms, {list_bytes:,} bytes of objects")
+        print(f"⏱️ mmap index load: {index_load * 1000:.3f} ms, "
+              f"{os.path.getsize(index_file):,} bytes on disk (paged in on demand)")
+        print(f"⏱️ {rate:,.0f} six-word passphrases/s")
+
+        index["data"].close()
+        WORDLIST_CACHE.pop(index_file, None)
+        return {"list_load": list_load, "index_load": index_load,
+                "list_bytes": list_bytes, "passphrases_per_second": rate}
+
+
+def benchmark_cli(lines=200000, cold_runs=5):
+    """Time interpreter cold start for a subcommand and steady-state `validate` throughput."""
+    import subprocess
+    import tempfile
+
+    command = [sys.executable, os.path.abspath(__file__), "validate", "--quiet"]
+
+    start = time.perf_counter()
+    for _ in range(cold_runs):
+        subprocess.run(command, input=b"", check=False)
+    cold = (time.perf_counter() - start) / cold_runs
+
+    with tempfile.TemporaryFile() as f:
+        for _ in range(lines):
+            f.write((generate_secure_password(12) + "\n").encode("ascii"))
+        f.seek(0)
+        start = time.perf_counter()
+        subprocess.run(command, stdin=f, stdout=subprocess.DEVNULL, check=False)
+        elapsed = time.perf_counter() - start
+
+    rate = lines / max(elapsed - cold, 1e-9)
+    print(f"⏱️ cold start: {cold * 1000:.1f} ms per `validate` invocation")
+    print(f"⏱️ steady state: {rate:,.0f} lines/s ({lines} lines in {elapsed:.2f}s)")
+    return {"cold_start": cold, "lines_per_second": rate}
+
+
 # -------------------------
 # SELF-TESTS
 # -------------------------
@@ -823,8 +2527,16 @@ def _run_self_tests():
     ok, msg = validate_password("Aa1!", min_length=8)
     assert not ok and "short" in msg.lower()
 
+    # Entropy scoring penalises dictionary words, sequences, repeats and dates
+    assert estimate_entropy("") == 0.0
+    assert estimate_entropy("password") < estimate_entropy("xqzvbnwk")
+    assert estimate_entropy("qwerty12") < estimate_entropy("qpwmeb12")
+    assert estimate_entropy("aaaaaaaa") < estimate_entropy("aqwjfmza")
+    assert estimate_entropy("19901231") < estimate_entropy("38475629")
+    assert strength_label(estimate_entropy("Password1!")) not in STRONG_LABELS
+
     print("All self-tests passed ✅")
 
 
 if __name__ == "__main__":
-    run_password_tool()
+    raise SystemExit(main())
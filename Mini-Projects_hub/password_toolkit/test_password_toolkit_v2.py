@@ -307,6 +307,565 @@ def test_password_strength_validation():
         print(f"      '{password}' -> {message}")
 
 
+def test_bulk_audit():
+    """Test streaming file audit with per-line results and aggregated report."""
+    print("\n7. Testing Bulk Password Audit:")
+
+    from password_toolkit_v2 import audit_password_file
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        input_file = os.path.join(temp_dir, "passwords.txt")
+        output_file = os.path.join(temp_dir, "audit.tsv")
+        with open(input_file, "w", encoding="utf-8") as f:
+            f.write("Password123!\nshort\n\npassword123!\nAa1!aaaa\n")
+
+        for workers, chunk_size in ((1, 2), (2, 1)):
+            ok, report = audit_password_file(input_file, output_file,
+                                             chunk_size=chunk_size, workers=workers)
+            assert ok, report
+            assert report["total"] == 4
+            assert report["passed"] == 2 and report["failed"] == 2
+            assert report["failure_reasons"]["Missing an uppercase letter."] == 1
+            assert report["length_distribution"][12] == 2
+            print(f"   ✅ PASS: Aggregated report (workers={workers}, chunk={chunk_size})")
+
+            with open(output_file, "r", encoding="utf-8") as f:
+                rows = [line.rstrip("\n").split("\t") for line in f]
+            # Blank line 3 is skipped but line numbers stay true to the file
+            assert [row[0] for row in rows] == ["1", "2", "4", "5"]
+            assert [row[1] for row in rows] == ["PASS", "FAIL", "FAIL", "PASS"]
+            print("   ✅ PASS: Per-line results written in file order")
+
+        ok, message = audit_password_file(os.path.join(temp_dir, "missing.txt"))
+        assert not ok and "not found" in message
+        print("   ✅ PASS: Missing audit file reported without crashing")
+
+
+def test_entropy_scoring():
+    """Test entropy-based strength scoring and its use in history entries."""
+    print("\n8. Testing Entropy Strength Scoring:")
+
+    import password_toolkit_v2 as toolkit
+
+    test_cases = [
+        ("password", "xqzvbnwk", "Dictionary word scores below random letters"),
+        ("P@ssw0rd", "Kq7wZx2m", "Leet-speak word still treated as a word"),
+        ("qwertyui", "qpwmebzt", "Keyboard sequence scores below random letters"),
+        ("abc12345", "hzq71946", "Alphabet/number runs penalised"),
+        ("zzzzzzzz", "zqxwvtsr", "Repeated characters penalised"),
+        ("31121999", "38475629", "Dates penalised"),
+    ]
+
+    for weak, random_like, description in test_cases:
+        weak_bits = toolkit.estimate_entropy(weak)
+        random_bits = toolkit.estimate_entropy(random_like)
+        assert weak_bits < random_bits, (weak, weak_bits, random_like, random_bits)
+        print(f"   ✅ PASS: {description} - {weak_bits} < {random_bits} bits")
+
+    assert toolkit.strength_label(0) == "very weak"
+    assert toolkit.strength_label(200) == "very strong"
+    print("   ✅ PASS: Labels cover the whole score range")
+
+    saved_history = list(toolkit.PASSWORD_HISTORY)
+    try:
+        toolkit.replace_history([])
+        toolkit.add_to_history("xK9#mQ2$vL7!pR4@", "test")
+        entry = toolkit.PASSWORD_HISTORY[-1]
+        assert entry["entropy"] == toolkit.estimate_entropy("xK9#mQ2$vL7!pR4@")
+        assert entry["strength"] == toolkit.strength_label(entry["entropy"])
+        print(f"   ✅ PASS: History entry stores score ({entry['entropy']} bits, "
+              f"{entry['strength']})")
+    finally:
+        toolkit.replace_history(saved_history)
+
+
+def test_breached_blocklist():
+    """Test Bloom filter build, membership checks and validate_password integration."""
+    print("\n9. Testing Breached Password Blocklist:")
+
+    import password_toolkit_v2 as toolkit
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        text_file = os.path.join(temp_dir, "breached.txt")
+        filter_file = os.path.join(temp_dir, "breached.bloom")
+        breached = ["Password1!", "Welcome2024!", "Qwerty123$"] + [
+            f"leaked{i}" for i in range(1000)]
+        with open(text_file, "w", encoding="utf-8") as f:
+            f.write("\n".join(breached) + "\n")
+
+        ok, message = toolkit.build_blocklist(text_file, filter_file)
+        assert ok, message
+        print(f"   ✅ PASS: {message}")
+
+        blocklist = toolkit.load_blocklist(filter_file)
+        assert all(toolkit.is_breached(p, blocklist) for p in breached)
+        print("   ✅ PASS: Every listed password is found (no false negatives)")
+
+        ok, msg = toolkit.validate_password("Password1!", blocklist_file=filter_file)
+        assert not ok and "breached" in msg
+        ok, msg = toolkit.validate_password("Password1!")
+        assert ok
+        print("   ✅ PASS: 'Password1!' rejected only when the blocklist is enabled")
+
+        ok, msg = toolkit.validate_password(
+            "xK9#mQ2$vL7!", blocklist_file=os.path.join(temp_dir, "missing.bloom"))
+        assert ok
+        print("   ✅ PASS: Missing filter file does not block validation")
+
+        bad_file = os.path.join(temp_dir, "bad.bloom")
+        for bit_count, hash_count, body in ((0, 3, b""), (64, 0, b"\xff" * 8),
+                                            (65, 3, b"\xff" * 8), (1 << 40, 3, b"\xff")):
+            with open(bad_file, "wb") as f:
+                f.write(toolkit.BLOOM_HEADER.pack(toolkit.BLOOM_MAGIC, bit_count, hash_count, 1))
+                f.write(body)
+            toolkit.BLOCKLIST_CACHE.pop(bad_file, None)
+            assert toolkit.load_blocklist(bad_file) is None, (bit_count, hash_count)
+            ok, msg = toolkit.validate_password("xK9#mQ2$vL7!", blocklist_file=bad_file)
+            assert ok
+        print("   ✅ PASS: Zero-bit, zero-hash and short filters rejected on load")
+
+        import importlib.util
+        spec = importlib.util.spec_from_file_location("fresh_toolkit", toolkit.__file__)
+        fresh = importlib.util.module_from_spec(spec)  # default CONFIG, empty ERROR_LOG
+        spec.loader.exec_module(fresh)
+        fresh.CONFIG["config_file"] = os.path.join(temp_dir, "missing.json")
+        fresh.CONFIG["blocklist_file"] = os.path.join(temp_dir, "absent.bloom")
+        assert fresh.current_policy().blocklist_file is None
+        assert not fresh.ERROR_LOG, fresh.ERROR_LOG
+        print("   ✅ PASS: Fresh session without a filter logs no blocklist error")
+
+        fresh.CONFIG["blocklist_file"] = filter_file  # built earlier, e.g. last session
+        assert fresh.current_policy().blocklist_file == filter_file
+        assert not fresh.validate_with_policy("Password1!", fresh.current_policy())[0]
+        fresh.CONFIG["check_blocklist"] = False
+        assert fresh.current_policy().blocklist_file is None
+        valid, errors = fresh.validate_config_data({"check_blocklist": None})
+        assert valid == {"check_blocklist": None} and not errors
+        fresh.BLOCKLIST_CACHE[filter_file]["data"].close()
+        print("   ✅ PASS: An existing filter is used automatically unless disabled")
+
+        blocklist["data"].close()
+        toolkit.BLOCKLIST_CACHE.clear()
+
+
+def test_history_ring_buffer():
+    """Test bounded history eviction and running counters."""
+    print("\n10. Testing History Ring Buffer:")
+
+    import password_toolkit_v2 as toolkit
+
+    saved_history = list(toolkit.PASSWORD_HISTORY)
+    saved_max = toolkit.CONFIG["max_history"]
+    history = toolkit.PASSWORD_HISTORY
+    try:
+        toolkit.CONFIG["max_history"] = 3
+        toolkit.replace_history([])
+        for password in ("password", "xK9#mQ2$vL7!pR4@", "aaaa", "Zr8!wq3#Lm5$Tp9&"):
+            toolkit.add_to_history(password, "test")
+
+        assert toolkit.PASSWORD_HISTORY is history
+        assert [e["password"] for e in history] == [
+            "xK9#mQ2$vL7!pR4@", "aaaa", "Zr8!wq3#Lm5$Tp9&"]
+        print("   ✅ PASS: Oldest entry evicted in place at capacity")
+
+        expected_strong = sum(
+            1 for e in history if e["strength"] in toolkit.STRONG_LABELS)
+        expected_total = sum(e["entropy"] for e in history)
+        assert toolkit.HISTORY_STATS["strong"] == expected_strong
+        assert toolkit.HISTORY_STATS["scored"] == 3
+        assert abs(toolkit.HISTORY_STATS["entropy_total"] - expected_total) < 1e-9
+        print(f"   ✅ PASS: Running counters match ({expected_strong} strong)")
+
+        toolkit.replace_history([{"password": "legacy", "strength": "strong"}])
+        assert toolkit.HISTORY_STATS == {"strong": 1, "scored": 0, "entropy_total": 0.0}
+        print("   ✅ PASS: Counters rebuilt on replace (legacy entries without score)")
+    finally:
+        toolkit.CONFIG["max_history"] = saved_max
+        toolkit.replace_history(saved_history)
+
+
+def test_ndjson_history_log():
+    """Test append-only history saves, compaction, tail loading and legacy migration."""
+    print("\n11. Testing Append-Only History Log:")
+
+    import password_toolkit_v2 as toolkit
+
+    saved_history = list(toolkit.PASSWORD_HISTORY)
+    saved_config = dict(toolkit.CONFIG)
+    try:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            log_file = os.path.join(temp_dir, "history.ndjson")
+            legacy_file = os.path.join(temp_dir, "history.json")
+            toolkit.CONFIG["history_file"] = log_file
+            toolkit.CONFIG["legacy_history_file"] = legacy_file
+            toolkit.CONFIG["max_history"] = 5
+            toolkit.replace_history([])
+
+            for i in range(3):
+                toolkit.add_to_history(f"first{i}", "test")
+            toolkit.save_password_history()
+            toolkit.add_to_history("second0", "test")
+            toolkit.save_password_history()
+            with open(log_file, "r", encoding="utf-8") as f:
+                records = [json.loads(line)["password"] for line in f]
+            assert records == ["first0", "first1", "first2", "second0"]
+            print("   ✅ PASS: Each save appends only the new entries")
+
+            for i in range(10):
+                toolkit.add_to_history(f"bulk{i}", "test")
+                toolkit.save_password_history()
+            with open(log_file, "r", encoding="utf-8") as f:
+                line_count = sum(1 for _ in f)
+            assert line_count <= 2 * 5
+            print(f"   ✅ PASS: Log compacted to stay bounded ({line_count} records)")
+
+            ok, _ = toolkit.load_password_history()
+            assert ok
+            assert [e["password"] for e in toolkit.PASSWORD_HISTORY] == [
+                f"bulk{i}" for i in range(5, 10)]
+            print("   ✅ PASS: Load reads only the newest max_history records")
+
+            with open(log_file, "a", encoding="utf-8") as f:
+                f.write('{"password": "trunc')  # simulated crash mid-append
+            ok, _ = toolkit.load_password_history()
+            assert ok and len(toolkit.PASSWORD_HISTORY) == 4
+            print("   ✅ PASS: Truncated trailing record skipped")
+
+            with open(log_file, "rb") as f:
+                intact = f.read()
+            with open(log_file, "ab") as f:
+                f.write(b'{"password": "\xff\xfe"}\n')
+            ok, message = toolkit.load_password_history()
+            assert not ok and "corrupt" in message and "decrypt" not in message, message
+            assert len(toolkit.PASSWORD_HISTORY) == 4
+            with open(log_file, "wb") as f:
+                f.write(intact)
+            print("   ✅ PASS: Undecodable bytes reported as a corrupt file, not a bad key")
+
+            os.remove(log_file)
+            with open(legacy_file, "w", encoding="utf-8") as f:
+                json.dump(["Legacy123!", {"password": "dict", "type": "old",
+                                          "strength": "weak"}], f)
+            ok, _ = toolkit.load_password_history()
+            assert ok and len(toolkit.PASSWORD_HISTORY) == 2
+            assert toolkit.PASSWORD_HISTORY[0]["type"] == "imported"
+            assert "entropy" in toolkit.PASSWORD_HISTORY[0]
+            assert os.path.exists(legacy_file + ".bak")
+            assert not os.path.exists(legacy_file)
+            print("   ✅ PASS: Legacy JSON migrated once to NDJSON")
+    finally:
+        toolkit.CONFIG.clear()
+        toolkit.CONFIG.update(saved_config)
+        toolkit.replace_history(saved_history)
+
+
+def test_encrypted_history():
+    """Test chunked, authenticated encrypted history storage."""
+    print("\n12. Testing Encrypted History Store:")
+
+    import password_toolkit_v2 as toolkit
+
+    saved_history = list(toolkit.PASSWORD_HISTORY)
+    saved_config = dict(toolkit.CONFIG)
+    try:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            enc_file = os.path.join(temp_dir, "history.enc")
+            toolkit.CONFIG["encrypt_history"] = True
+            toolkit.CONFIG["encrypted_history_file"] = enc_file
+            toolkit.CONFIG["max_history"] = 50
+            toolkit.unlock_history("correct horse", enc_file)
+            toolkit.replace_history([])
+
+            toolkit.add_to_history("Secret123!", "test")
+            toolkit.save_password_history()
+            with open(enc_file, "rb") as f:
+                first_save = f.read()
+            assert b"Secret123!" not in first_save
+            print("   ✅ PASS: Passwords are not stored in plaintext")
+
+            toolkit.add_to_history("Another456?", "test")
+            toolkit.save_password_history()
+            with open(enc_file, "rb") as f:
+                second_save = f.read()
+            assert second_save.startswith(first_save)
+            print("   ✅ PASS: Append adds a chunk without rewriting earlier ones")
+
+            ok, _ = toolkit.load_password_history()
+            assert ok
+            assert [e["password"] for e in toolkit.PASSWORD_HISTORY] == [
+                "Secret123!", "Another456?"]
+            print("   ✅ PASS: Tail read decrypts and authenticates chunks")
+
+            toolkit.HISTORY_KEYS.clear()
+            toolkit.unlock_history("wrong passphrase", enc_file)
+            ok, message = toolkit.load_password_history()
+            assert not ok and "decrypt" in message
+            print("   ✅ PASS: Wrong passphrase rejected")
+
+            toolkit.unlock_history("correct horse", enc_file)
+            tampered = bytearray(second_save)
+            tampered[-40] ^= 0x01
+            with open(enc_file, "wb") as f:
+                f.write(tampered)
+            ok, message = toolkit.load_password_history()
+            assert not ok and "authentication" in message
+            print("   ✅ PASS: Tampered chunk detected by HMAC")
+    finally:
+        toolkit.HISTORY_KEYS.clear()
+        toolkit.CONFIG.clear()
+        toolkit.CONFIG.update(saved_config)
+        toolkit.replace_history(saved_history)
+
+
+def test_password_hashing():
+    """Test encoded KDF hashes, verification, rehash detection and bulk hashing."""
+    print("\n13. Testing Password Hashing:")
+
+    import password_toolkit_v2 as toolkit
+
+    cheap = {"scrypt": {"ln": 10, "r": 8, "p": 1}, "pbkdf2-sha256": {"i": 1000}}
+    for algorithm, params in cheap.items():
+        encoded = toolkit.hash_password("S3cret!pass", algorithm, params)
+        assert encoded.startswith(f"${algorithm}$")
+        assert toolkit.verify_password("S3cret!pass", encoded)
+        assert not toolkit.verify_password("S3cret!pasS", encoded)
+        assert encoded != toolkit.hash_password("S3cret!pass", algorithm, params)
+        print(f"   ✅ PASS: {algorithm} hash verifies and is salted")
+
+        assert not toolkit.needs_rehash(encoded, algorithm, params)
+        assert toolkit.needs_rehash(encoded, algorithm)  # defaults are stronger
+        print(f"   ✅ PASS: {algorithm} rehash detection follows encoded params")
+
+    for malformed in ("", "plain", "$scrypt$ln=10$abc", "$md5$i=1$AA==$AA==",
+                      "$scrypt$ln=0,r=8,p=1$AAAA$AAAA",     # cost parameters out of range
+                      "$scrypt$ln=40,r=8,p=1$AAAA$AAAA",
+                      "$scrypt$ln=10,r=0,p=1$AAAA$AAAA",
+                      "$pbkdf2-sha256$i=0$AAAA$AAAA",
+                      "$pbkdf2-sha256$i=-5$AAAA$AAAA",
+                      "$pbkdf2-sha256$i=x$AAAA$AAAA",
+                      "$pbkdf2-sha256$i=1000$AA!A*A$AAAA",  # junk base64 characters
+                      "$pbkdf2-sha256$i=1000$$AAAA"):      # empty salt
+        assert not toolkit.verify_password("x", malformed), malformed
+    good = toolkit.hash_password("x", "pbkdf2-sha256", {"i": 1000})
+    salt = good.split("$")[3]
+    assert not toolkit.verify_password("x", good.replace(salt, salt[:2] + "#" + salt[2:]))
+    print("   ✅ PASS: Malformed hashes never verify")
+
+    params = toolkit.tune_hash_params(1, "pbkdf2-sha256")
+    assert params["i"] >= 1000
+    print(f"   ✅ PASS: Auto-tuner returned {params}")
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        input_file = os.path.join(temp_dir, "users.tsv")
+        output_file = os.path.join(temp_dir, "hashes.tsv")
+        with open(input_file, "w", encoding="utf-8") as f:
+            f.write("alice\tWonder1and!\nbob\tBuilder#42\nbarepassword\n")
+        ok, message = toolkit.bulk_hash_file(input_file, output_file, "pbkdf2-sha256",
+                                             cheap["pbkdf2-sha256"], chunk_size=1,
+                                             workers=2)
+        assert ok, message
+        with open(output_file, "r", encoding="utf-8") as f:
+            rows = [line.rstrip("\n").split("\t") for line in f]
+        assert [row[0] for row in rows] == ["alice", "bob", "3"]
+        assert toolkit.verify_password("Builder#42", rows[1][1])
+        print("   ✅ PASS: Bulk hashing across a process pool keeps input order")
+
+
+def test_passphrase_generator():
+    """Test wordlist compilation, mmap lookups and passphrase batch generation."""
+    print("\n14. Testing Diceware Passphrase Generator:")
+
+    import password_toolkit_v2 as toolkit
+
+    saved_history = list(toolkit.PASSWORD_HISTORY)
+    saved_config = dict(toolkit.CONFIG)
+    try:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            text_file = os.path.join(temp_dir, "words.txt")
+            index_file = os.path.join(temp_dir, "words.idx")
+            words = ["apple", "brick", "cello", "dune", "éclair", "fjord", "apple"]
+            with open(text_file, "w", encoding="utf-8") as f:
+                f.write("11111\tapple\n")  # diceware-style line
+                f.write("\n".join(words[1:]) + "\n\n")
+
+            ok, message = toolkit.compile_wordlist(text_file, index_file)
+            assert ok, message
+            index = toolkit.load_wordlist_index(index_file)
+            assert index["count"] == 6
+            assert [toolkit.wordlist_word(index, i) for i in range(6)] == words[:6]
+            print(f"   ✅ PASS: {message}")
+
+            phrase = toolkit.generate_passphrase(5, " ", index=index)
+            assert len(phrase.split(" ")) == 5
+            assert all(word in words for word in phrase.split(" "))
+            print(f"   ✅ PASS: Generated passphrase '{phrase}'")
+
+            toolkit.CONFIG["wordlist_file"] = index_file
+            toolkit.replace_history([])
+            generated, errors = toolkit.batch_generate_passwords(3, "passphrase", 4)
+            assert len(generated) == 3 and not errors
+            entry = toolkit.PASSWORD_HISTORY[-1]
+            assert entry["type"] == "batch_passphrase"
+            assert entry["entropy"] == toolkit.passphrase_entropy(4, index)
+            print(f"   ✅ PASS: Batch passphrases scored exactly ({entry['entropy']} bits)")
+
+            toolkit.CONFIG["wordlist_file"] = os.path.join(temp_dir, "missing.idx")
+            generated, errors = toolkit.batch_generate_passwords(1, "passphrase", 4)
+            assert not generated and len(errors) == 1
+            print("   ✅ PASS: Missing wordlist reported as a batch error")
+
+            with open(index_file, "rb") as f:
+                compiled = f.read()
+            short_file = os.path.join(temp_dir, "short.idx")
+            for size in (0, 5, 12, 20, len(compiled) - 3):
+                with open(short_file, "wb") as f:
+                    f.write(compiled[:size])
+                try:
+                    toolkit.load_wordlist_index(short_file)
+                    raise AssertionError(f"{size}-byte index should be rejected")
+                except ValueError as e:
+                    assert "wordlist" in str(e)
+            print("   ✅ PASS: Truncated index files rejected with ValueError")
+
+            index["data"].close()
+            toolkit.WORDLIST_CACHE.clear()
+    finally:
+        toolkit.CONFIG.clear()
+        toolkit.CONFIG.update(saved_config)
+        toolkit.replace_history(saved_history)
+
+
+def test_config_hot_reload():
+    """Test schema validation, compiled policies and mtime-based config reload."""
+    print("\n15. Testing Config Schema and Hot Reload:")
+
+    import password_toolkit_v2 as toolkit
+
+    valid, errors = toolkit.validate_config_data(
+        {"min_length": True, "max_history": -1, "require_digit": False, "nope": 1})
+    assert valid == {"require_digit": False}
+    assert len(errors) == 3
+    print("   ✅ PASS: Schema rejects bool-as-int, out-of-range and unknown keys")
+
+    policy = toolkit.make_policy(10, True, True, True, False)
+    assert policy is toolkit.make_policy(10, True, True, True, False)
+    try:
+        policy.min_length = 1
+        raise AssertionError("Policy should be immutable")
+    except AttributeError:
+        pass
+    assert toolkit.validate_with_policy("Abcdefgh12", policy) == (True, "Password is strong.")
+    assert toolkit.validate_with_policy("éééééééé1A!", policy)[0]  # Unicode lowercase
+    print("   ✅ PASS: Compiled policies are cached and immutable")
+
+    saved_config = dict(toolkit.CONFIG)
+    saved_state = dict(toolkit.CONFIG_STATE)
+    try:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            config_file = os.path.join(temp_dir, "config.json")
+            toolkit.CONFIG["config_file"] = config_file
+            with open(config_file, "w", encoding="utf-8") as f:
+                json.dump({"min_length": 12}, f)
+            ok, _ = toolkit.load_config(config_file, verbose=False)
+            assert ok and toolkit.current_policy().min_length == 12
+
+            with open(config_file, "w", encoding="utf-8") as f:
+                json.dump({"min_length": 16, "require_symbol": False}, f)
+            stat = os.stat(config_file)
+            os.utime(config_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+            toolkit.CONFIG_STATE["next_check"] = 0.0
+            policy = toolkit.current_policy()
+            assert policy.min_length == 16
+            assert "!" not in [marker for marker, _ in policy.required]
+            print("   ✅ PASS: Edited config picked up without restart")
+
+            with open(config_file, "w", encoding="utf-8") as f:
+                json.dump({"require_symbol": False}, f)  # min_length removed
+            os.utime(config_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 2 * 10**9))
+            toolkit.CONFIG_STATE["next_check"] = 0.0
+            policy = toolkit.current_policy()
+            assert policy.min_length == toolkit.DEFAULT_CONFIG["min_length"]
+            assert toolkit.CONFIG["config_file"] == config_file
+            print("   ✅ PASS: Keys deleted from the file revert to their defaults")
+
+            assert not toolkit.refresh_config(config_file, interval=0)
+            print("   ✅ PASS: Unchanged file is not reloaded")
+    finally:
+        toolkit.CONFIG.clear()
+        toolkit.CONFIG.update(saved_config)
+        toolkit.CONFIG_STATE.update(saved_state)
+
+
+def test_noninteractive_cli():
+    """Test the generate/validate/audit subcommands and their exit codes."""
+    print("\n16. Testing Non-Interactive CLI:")
+
+    import io
+    import sys
+    import password_toolkit_v2 as toolkit
+
+    def run(argv, stdin=""):
+        saved = sys.stdin, sys.stdout
+        sys.stdin, sys.stdout = io.StringIO(stdin), io.StringIO()
+        try:
+            code = toolkit.main(argv)
+            return code, sys.stdout.getvalue()
+        finally:
+            sys.stdin, sys.stdout = saved
+
+    saved_history = list(toolkit.PASSWORD_HISTORY)
+    try:
+        code, output = run(["generate", "5", "--length", "14"])
+        lines = output.splitlines()
+        assert code == toolkit.EXIT_OK and len(lines) == 5
+        assert all(len(line) == 14 for line in lines)
+        assert list(toolkit.PASSWORD_HISTORY) == saved_history  # no history I/O
+        print("   ✅ PASS: generate streams N passwords without touching history")
+
+        from contextlib import redirect_stderr
+        too_short = str(toolkit.current_policy().min_length - 1)
+        for argv in (["generate", "2", "--length", "0"], ["generate", "0"],
+                     ["generate", "-3"], ["generate", "2", "--length", too_short],
+                     ["generate", "2", "--type", "passphrase", "--length", "0"]):
+            with redirect_stderr(io.StringIO()) as err:
+                code, output = run(argv)
+            assert code == toolkit.EXIT_ERROR and output == "", argv
+            assert err.getvalue().startswith("❌"), argv
+        print("   ✅ PASS: Non-positive counts and too-short lengths exit 2")
+
+        saved_config = dict(toolkit.CONFIG)
+        try:
+            with tempfile.TemporaryDirectory() as temp_dir:
+                toolkit.CONFIG["config_file"] = os.path.join(temp_dir, "missing_config.json")
+                toolkit.CONFIG["history_file"] = os.path.join(temp_dir, "history.ndjson")
+                toolkit.CONFIG["encrypt_history"] = False
+                for _ in range(2):  # first run starts fresh, second loads the saved file
+                    code, output = run(["generate", "3", "--length", "12", "--save-history"])
+                    lines = output.splitlines()
+                    assert code == toolkit.EXIT_OK and len(lines) == 3, output
+                    assert all(len(line) == 12 and " " not in line for line in lines), output
+                    assert lines == [entry["password"] for entry in
+                                     list(toolkit.PASSWORD_HISTORY)[-3:]]
+        finally:
+            toolkit.CONFIG.clear()
+            toolkit.CONFIG.update(saved_config)
+        print("   ✅ PASS: generate --save-history keeps status lines off stdout")
+
+        code, output = run(["validate"], "Password1!\nabc\n")
+        assert code == toolkit.EXIT_FAILED
+        assert output.splitlines()[0].startswith("PASS\t")
+        assert output.splitlines()[1].startswith("FAIL\t")
+        assert run(["validate", "--quiet"], "Password1!\n") == (toolkit.EXIT_OK, "")
+        print("   ✅ PASS: validate reports per line and exits 1 on failures")
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            code, _ = run(["audit", os.path.join(temp_dir, "missing.txt")])
+            assert code == toolkit.EXIT_ERROR
+        print("   ✅ PASS: audit exits 2 on a missing file")
+    finally:
+        toolkit.replace_history(saved_history)
+
+
 def run_all_tests():
     """Run all test suites."""
     print("🚀 Running Comprehensive Test Suite...")
@@ -317,6 +876,16 @@ def run_all_tests():
     test_password_generation_edge_cases()
     test_batch_operations()
     test_password_strength_validation()
+    test_bulk_audit()
+    test_entropy_scoring()
+    test_breached_blocklist()
+    test_history_ring_buffer()
+    test_ndjson_history_log()
+    test_encrypted_history()
+    test_password_hashing()
+    test_passphrase_generator()
+    test_config_hot_reload()
+    test_noninteractive_cli()
 
     print("\n" + "=" * 60)
     print("✅ BULLETPROOF VALIDATION COMPLETE!")
@@ -331,6 +900,16 @@ def run_all_tests():
     print("   ✅ Password generation edge cases and error handling")
     print("   ✅ Batch operations with partial failure recovery")
     print("   ✅ Password strength validation with detailed feedback")
+    print("   ✅ Streaming bulk audit with aggregated report")
+    print("   ✅ Entropy strength scoring (words, sequences, repeats, dates)")
+    print("   ✅ Breached password Bloom filter (build, lookup, validation)")
+    print("   ✅ Bounded history with O(1) eviction and running counters")
+    print("   ✅ Append-only NDJSON history log with compaction and migration")
+    print("   ✅ Encrypted history chunks with scrypt keys and HMAC authentication")
+    print("   ✅ scrypt/PBKDF2 hashing with encoded parameters and auto-tuning")
+    print("   ✅ Diceware passphrases from a memory-mapped wordlist index")
+    print("   ✅ Typed config schema, compiled policies and hot reload")
+    print("   ✅ Non-interactive subcommands with streaming output and exit codes")
     print("   ✅ Exception handling for all critical code paths")
     print("   ✅ Graceful degradation on errors")
 
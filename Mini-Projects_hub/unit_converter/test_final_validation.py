@@ -1,6 +1,19 @@
 # Final Validation Test for Unit Converter v2.1
 # Tests all edge cases and error handling improvements
 
+import importlib.util
+import os
+
+
+def load_converter():
+    """Import unit_converter_v2.1.py (the dot in the name blocks a plain import)."""
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "unit_converter_v2.1.py")
+    spec = importlib.util.spec_from_file_location("unit_converter_v2_1", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
 print("🧪 FINAL VALIDATION: Unit Converter v2.1")
 print("=" * 50)
 
@@ -72,6 +85,200 @@ for val_in, val_out, label_in, label_out, dec in format_tests:
     result = format_result(val_in, val_out, label_in, label_out, dec)
     print(f"   {result}")
 
+
+# Test 5: Unit registry (table-driven conversions)
+def test_unit_registry():
+    uc = load_converter()
+    checks = [
+        (uc.km_to_miles(100), 62.1371),
+        (uc.c_to_f(25), 77.0),
+        (uc.f_to_c(uc.ABSOLUTE_ZERO_F), uc.ABSOLUTE_ZERO_C),
+        (uc.gb_to_mb(1), 1024.0),
+        (uc.eur_to_usd(100), 108.0),
+        (uc.convert(1, "ft", "cm"), 30.48),
+        (uc.convert(0, "K", "°F"), uc.ABSOLUTE_ZERO_F),
+        (uc.convert(1, "mi", "yd"), 1000 / uc.MILES_PER_KM / 0.9144),
+        (uc.convert(1, "TB", "KB"), 1024.0 ** 3),
+    ]
+    for got, expected in checks:
+        assert abs(got - expected) <= 1e-9 * max(1.0, abs(expected)), (got, expected)
+    # Every same-dimension pair is precomputed; cross-dimension pairs are refused.
+    assert uc.CONVERSION_TABLE[("km", "km")] == (1.0, 0.0)
+    assert uc.UNIT_MINIMUMS["°F"] == uc.ABSOLUTE_ZERO_F and uc.UNIT_MINIMUMS["K"] == 0
+    for bad in (("km", "kg"), ("km", "parsec")):
+        try:
+            uc.convert(1, *bad)
+        except ValueError:
+            pass
+        else:
+            raise AssertionError(f"{bad} should be rejected")
+    # Adding a unit is data only.
+    uc.register_unit("nmi", "length", 1852)
+    assert abs(uc.convert(1, "nmi", "km") - 1.852) < 1e-12
+    print("   ✅ PASS: Registry conversions, minimums and unit registration")
+
+
+# Test 6: Batch column conversion
+def test_batch_convert():
+    import tempfile
+    from array import array
+
+    uc = load_converter()
+    values, results, mask = uc.convert_column(["0", "100", "abc", "-300", "inf"], "°C", "°F")
+    assert list(results[:2]) == [32.0, 212.0]
+    assert list(mask) == [0, 0, uc.BATCH_INVALID, uc.BATCH_BELOW_MIN, uc.BATCH_NON_FINITE]
+    column = array("d", [1.0, 2.5])
+    assert list(uc.convert_column(memoryview(column), "GB", "MB")[1]) == [1024.0, 2560.0]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        sources = {
+            "values.txt": "1\n\n2.5\nx\n",
+            "values.csv": "name,km\na,1\nb,2.5\nc,x\n",
+            "values.ndjson": '{"km": 1}\n{"km": "2.5"}\n{"km": null}\n',
+        }
+        for name, text in sources.items():
+            source = os.path.join(tmp, name)
+            target = os.path.join(tmp, name + ".out")
+            with open(source, "w", encoding="utf-8") as f:
+                f.write(text)
+            ok, summary = uc.batch_convert(source, target, "km", "m", column="km", chunk_size=2)
+            assert ok and summary == {"values": 3, "errors": {"Invalid number": 1}}, summary
+            with open(target, encoding="utf-8") as f:
+                lines = f.read().splitlines()
+            assert lines[:2] == [uc.format_result(1.0, 1000.0, "km", "m"),
+                                 uc.format_result(2.5, 2500.0, "km", "m")], lines
+            assert lines[2].startswith("❌ Invalid number")
+        huge = os.path.join(tmp, "huge.ndjson")
+        with open(huge, "w", encoding="utf-8") as f:
+            f.write('{"km": 1%s}\n{"km": 5}\n' % ("0" * 400))  # int past float range
+        ok, summary = uc.batch_convert(huge, target, "km", "m", column="km")
+        assert ok and summary["errors"] == {uc.BATCH_ERRORS[uc.BATCH_NON_FINITE]: 1}, summary
+        assert list(uc.convert_column([10 ** 400, 2], "km", "m")[2]) == [uc.BATCH_NON_FINITE, 0]
+        assert uc.batch_convert(source, target, "km", "kg")[0] is False
+        assert uc.batch_convert(os.path.join(tmp, "missing.txt"), target, "km", "m")[0] is False
+    print("   ✅ PASS: Batch conversion of raw, CSV and NDJSON columns")
+
+
+# Test 7: Currency rate provider
+def test_currency_rates():
+    import io
+    import tempfile
+    from contextlib import redirect_stderr
+
+    uc = load_converter()
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "rates.csv")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("date,base,quote,rate\n"
+                    "2024-01-01,EUR,USD,1.10\n2024-01-01,EUR,GBP,0.80\n"
+                    "2024-02-01,USD,EUR,0.80\n"  # quoted the other way round
+                    "2024-03-01,EUR,JPY,160\nnot-a-date,EUR,USD,9\n")
+        ok, message = uc.load_rates(path)
+        assert ok and "1 row(s) skipped" in message, message
+
+        assert abs(uc.get_rate("EUR", "USD") - 1.25) < 1e-12  # carried forward from 02-01
+        assert abs(uc.get_rate("EUR", "USD", "2024-01-15") - 1.10) < 1e-12
+        assert abs(uc.get_rate("GBP", "USD", "2024-01-01") - 1.10 / 0.80) < 1e-12
+        assert ("GBP", "USD") in {key[1:] for key in uc.CROSS_RATES}
+        assert abs(uc.convert(100, "gbp", "JPY") - 100 / 0.80 * 160) < 1e-9  # registry synced
+        assert abs(uc.eur_to_usd(100) - 125.0) < 1e-9
+        bad_dates = ("banana", "2024-8-15", "20240815", "2024-13-99", 20240815)
+        for bad in (("EUR", "USD", "2023-12-31"), ("EUR", "XYZ", None),
+                    *(("EUR", "USD", day) for day in bad_dates)):
+            try:
+                uc.get_rate(*bad)
+            except ValueError:
+                pass
+            else:
+                raise AssertionError(f"{bad} should be rejected")
+        with redirect_stderr(io.StringIO()) as err:
+            code = uc.main(["rate", "EUR", "USD", "--date", "2024-8-15", "--rates-file", path])
+        assert code == 2 and "Invalid date" in err.getvalue(), err.getvalue()
+
+        # Within the TTL the file is not re-read; once expired it is.
+        with open(path, "a", encoding="utf-8") as f:
+            f.write("2024-04-01,EUR,USD,1.50\n")
+        assert abs(uc.get_rate("EUR", "USD") - 1.25) < 1e-12
+        uc.RATE_TTL = 0.0
+        assert abs(uc.get_rate("EUR", "USD") - 1.50) < 1e-12
+
+        # A file deleted after loading keeps serving its rates on TTL expiry
+        dates = list(uc.RATES["dates"])
+        os.remove(path)
+        assert abs(uc.get_rate("GBP", "USD") - 1.50 / 0.80) < 1e-12
+        assert uc.RATES["dates"] == dates
+        assert uc.load_rates(path)[0] is False and uc.RATES["dates"] == dates
+
+        ok, message = uc.load_rates(os.path.join(tmp, "missing.csv"))
+        assert not ok and uc.eur_to_usd(100) == 100 * uc.EUR_TO_USD
+    print("   ✅ PASS: Rates file, cross rates, historical lookup and TTL")
+
+
+# Test 8: Compound unit expressions
+def test_unit_expressions():
+    uc = load_converter()
+    checks = [
+        ("km/h", "m/s", 1000 / 3600),
+        ("MB/s", "GB/min", 60 / 1024),
+        ("kg*m/s^2", "g·cm/s**2", 1e5),
+        ("m^2", "cm^2", 1e4),
+        ("(kg*m)/(s*s)", "kg*m/s^2", 1.0),
+        ("1/h", "1/s", 1 / 3600),
+        ("K/s", "°C/s", 1.0),  # temperatures inside expressions are intervals
+    ]
+    for source, target, expected in checks:
+        got = uc.convert(1.0, source, target)
+        assert abs(got - expected) <= 1e-12 * max(1.0, expected), (source, target, got)
+    assert uc.parse_unit_expression("km/h")[1] == uc.parse_unit_expression("m*s^-1")[1]
+    assert uc.convert(20, "°C", "K") == 293.15  # bare units still convert affinely
+
+    huge = "*".join(["km^32"] * 4), "*".join(["m^32"] * 4)  # factor 1e384
+    for source, target in (("km/h", "kg"), ("m/", "m"), ("m^", "m"), ("(m", "m"), ("m$", "m"),
+                           ("km^400", "m^400"), ("m^99999999", "m^99999999"), huge):
+        try:
+            uc.convert(1.0, source, target)
+        except ValueError:
+            pass
+        else:
+            raise AssertionError(f"{source} -> {target} should be rejected")
+
+    hits = uc.conversion_factors.cache_info().hits
+    values, results, mask = uc.convert_column(["36", "72"], "km/h", "m/s")
+    assert list(results) == [10.0, 20.0] and not any(mask)
+    assert uc.conversion_factors.cache_info().hits > hits
+    uc.register_unit("kn", "length", 1852)  # new units invalidate the memo
+    assert uc.compound_factors.cache_info().currsize == 0
+    assert abs(uc.convert(1, "kn/h", "km/h") - 1.852) < 1e-12
+    print("   ✅ PASS: Compound expressions, dimension checks and memoized factors")
+
+
+# Test 9: Result formatting modes
+def test_format_modes():
+    from decimal import Decimal
+
+    uc = load_converter()
+    assert uc.format_result(100.0, 62.1371, "km", "miles") == "100.000 km = 62.137 miles"
+    assert uc.format_result(1.0, 100.0, "m", "cm", 3, "sig") == "1.00 m = 100 cm"
+    assert uc.format_result(2.675, Decimal("0.108"), "EUR", "USD", 2, "money") == \
+        "2.68 EUR = 0.11 USD"  # float formatting would give 2.67
+    assert uc.convert_money("0.10", "EUR", "USD") == Decimal("0.108")
+
+    values = [0.0, 1.0, 2.675, -3.14159, 99.95, 123456.789, 1e-7, 100.0]
+    results = [value * 1.08 for value in values]
+    for mode, decimals in (("fixed", 2), ("fixed", 0), ("sig", 3), ("sig", 1), ("money", 2)):
+        expected = "".join(uc.format_result(a, b, "EUR", "%", decimals, mode) + "\n"
+                           for a, b in zip(values, results))
+        assert uc.format_results(values, results, "EUR", "%", decimals, mode) == expected, mode
+    for mode, decimals in (("sig", 0), ("words", 2)):
+        try:
+            uc.format_result(1.0, 1.0, "m", "m", decimals, mode)
+        except ValueError:
+            pass
+        else:
+            raise AssertionError(f"{mode}/{decimals} should be rejected")
+    print("   ✅ PASS: Fixed, significant-figure and money formatting, batch fast path")
+
+
 # Test 4: Error handling features summary
 print("\n4. 🛡️ Error Handling Features Implemented:")
 features = [
@@ -90,6 +297,18 @@ features = [
 for feature in features:
     print(f"   {feature}")
 
+if __name__ == "__main__":
+    print("\n5. 📐 Unit Registry:")
+    test_unit_registry()
+    print("\n6. 📦 Batch Column Conversion:")
+    test_batch_convert()
+    print("\n7. 💱 Currency Rates:")
+    test_currency_rates()
+    print("\n8. 🧩 Compound Unit Expressions:")
+    test_unit_expressions()
+    print("\n9. 🔢 Result Formatting Modes:")
+    test_format_modes()
+
 print("\n" + "=" * 50)
 print("🏆 UNIT CONVERTER v2.1 - PRODUCTION READY!")
 print("🛡️ All edge cases handled, all best practices followed")
@@ -97,7 +316,7 @@ print("🚀 Ready for enterprise deployment!")
 
 print("\n📋 Manual Test Checklist:")
 print("   Try these inputs when running the converter:")
-print("   • Menu: 0, 7, abc → should retry")
+print("   • Menu: 0, 8, abc → should retry")
 print("   • Direction: 3, 0, q → should retry")
 print("   • Numbers: '', 'abc', 'nan', 'inf' → should retry")
 print("   • Temperature: -273.16°C, -459.68°F → should reject")
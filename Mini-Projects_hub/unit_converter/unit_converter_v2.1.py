@@ -2,10 +2,27 @@
 # Scope: primitives, control flow, strings, functions + exceptions
 # Features: Comprehensive error handling, input validation, retry loops
 
+import argparse
+import csv
+import json
+import math
+import os
+import re
+import sys
+import time
+from datetime import date
+from decimal import ROUND_HALF_UP, Decimal, InvalidOperation
+from array import array
+from bisect import bisect_right
+from contextlib import nullcontext
+from fractions import Fraction
+from functools import lru_cache
+from itertools import chain, islice, repeat
+
 # Constants (immutable config at module scope; not modified)
 MILES_PER_KM = 0.621371
 POUNDS_PER_KG = 2.20462
-EUR_TO_USD = 1.08
+EUR_TO_USD = 1.08  # fallback when no rates file is available
 MB_PER_GB = 1024
 
 # Physical constraints
@@ -13,45 +30,462 @@ ABSOLUTE_ZERO_C = -273.15
 ABSOLUTE_ZERO_F = -459.67
 
 
-# ---------- Pure conversion functions (math only) ----------
+# ---------- Unit registry (data, not code) ----------
+# Each unit maps to its dimension and an affine map onto the dimension's base
+# unit: base = value * factor + offset. Factors are exact (int, Fraction or
+# decimal strings) so the precomputed pair factors are correctly rounded.
+# Adding a unit means adding one line here.
+
+DIMENSIONS = {
+    # dimension: (base unit, physical minimum in base units)
+    "length": ("m", 0),
+    "temperature": ("°C", Fraction(str(ABSOLUTE_ZERO_C))),
+    "mass": ("kg", 0),
+    "currency": ("EUR", 0),
+    "data": ("MB", 0),
+    "time": ("s", 0),
+}
+
+UNIT_DEFINITIONS = {
+    # unit: (dimension, factor, offset)
+    "m": ("length", 1, 0),
+    "km": ("length", 1000, 0),
+    "cm": ("length", "0.01", 0),
+    "mm": ("length", "0.001", 0),
+    "miles": ("length", Fraction(1000) / Fraction(str(MILES_PER_KM)), 0),
+    "yd": ("length", "0.9144", 0),
+    "ft": ("length", "0.3048", 0),
+    "in": ("length", "0.0254", 0),
+    "°C": ("temperature", 1, 0),
+    "°F": ("temperature", Fraction(5, 9), Fraction(-160, 9)),
+    "K": ("temperature", 1, "-273.15"),
+    "kg": ("mass", 1, 0),
+    "g": ("mass", "0.001", 0),
+    "lb": ("mass", 1 / Fraction(str(POUNDS_PER_KG)), 0),
+    "oz": ("mass", 1 / (16 * Fraction(str(POUNDS_PER_KG))), 0),
+    "EUR": ("currency", 1, 0),
+    "USD": ("currency", 1 / Fraction(str(EUR_TO_USD)), 0),
+    "MB": ("data", 1, 0),
+    "GB": ("data", MB_PER_GB, 0),
+    "TB": ("data", MB_PER_GB ** 2, 0),
+    "KB": ("data", Fraction(1, MB_PER_GB), 0),
+    "B": ("data", Fraction(1, MB_PER_GB ** 2), 0),
+    "s": ("time", 1, 0),
+    "ms": ("time", "0.001", 0),
+    "min": ("time", 60, 0),
+    "h": ("time", 3600, 0),
+    "day": ("time", 86400, 0),
+}
+
+UNIT_ALIASES = {
+    "mi": "miles", "mile": "miles", "meter": "m", "meters": "m", "feet": "ft", "foot": "ft",
+    "inch": "in", "inches": "in", "C": "°C", "F": "°F", "kelvin": "K", "lbs": "lb",
+    "kb": "KB", "mb": "MB", "gb": "GB", "tb": "TB", "eur": "EUR", "usd": "USD",
+    "sec": "s", "hr": "h", "hour": "h", "hours": "h", "days": "day",
+}
+
+
+def build_conversion_table(definitions):
+    """Precompute (scale, shift) for every same-dimension unit pair, plus unit minimums.
+
+    out = value * scale + shift, derived exactly in Fractions then rounded once.
+    """
+    exact = {unit: (dimension, Fraction(factor), Fraction(offset))
+             for unit, (dimension, factor, offset) in definitions.items()}
+    table = {}
+    minimums = {}
+    for src, (dimension, f1, o1) in exact.items():
+        minimum = (Fraction(DIMENSIONS[dimension][1]) - o1) / f1
+        minimums[src] = int(minimum) if minimum.denominator == 1 else float(minimum)
+        for dst, (other, f2, o2) in exact.items():
+            if other == dimension:
+                table[(src, dst)] = (float(f1 / f2), float((o1 - o2) / f2))
+    return table, minimums
+
+
+CONVERSION_TABLE, UNIT_MINIMUMS = build_conversion_table(UNIT_DEFINITIONS)
+
+
+def _rebuild_registry():
+    """Recompute the pair table after UNIT_DEFINITIONS changed; drop derived caches."""
+    global CONVERSION_TABLE, UNIT_MINIMUMS
+    CONVERSION_TABLE, UNIT_MINIMUMS = build_conversion_table(UNIT_DEFINITIONS)
+    parse_unit_expression.cache_clear()
+    compound_factors.cache_clear()
+    conversion_factors.cache_clear()
+
+
+def register_unit(unit, dimension, factor, offset=0):
+    """Add or redefine a unit and rebuild the pair table."""
+    if dimension not in DIMENSIONS:
+        raise ValueError(f"Unknown dimension '{dimension}'")
+    if Fraction(factor) == 0:
+        raise ValueError("Unit factor must be non-zero")
+    UNIT_DEFINITIONS[unit] = (dimension, factor, offset)
+    _rebuild_registry()
+
+
+def resolve_unit(name):
+    """Canonical unit name for a name or alias; ValueError if unknown."""
+    name = name.strip()
+    if name in UNIT_DEFINITIONS:
+        return name
+    if name in UNIT_ALIASES:
+        return UNIT_ALIASES[name]
+    if UNIT_DEFINITIONS.get(name.upper(), ("",))[0] == "currency":
+        return name.upper()
+    raise ValueError(f"Unknown unit '{name}'")
+
+
+# ---------- Compound unit expressions ----------
+# "km/h", "kg*m/s^2", "J/(kg*K)"-style expressions reduce to a factor onto
+# base units and a dimension vector (one exponent per DIMENSIONS entry).
+# Grammar:  expr := term (("*" | "·" | "/") term)*
+#           term := atom (("^" | "**") integer)?
+#           atom := unit | "1" | "(" expr ")"
+# Offsets are ignored inside expressions, so temperatures there are
+# intervals (K/s == °C/s); a bare unit still converts affinely.
+
+MAX_UNIT_EXPONENT = 32  # |exponent| bound; keeps Fraction powers cheap
+UNIT_TOKEN_RE = re.compile(r"\s*(?:(\*\*|[*·/^()])|([A-Za-z°µ]+)|(-?\d+)|(\S))")
+
+
+def _unit_tokens(text):
+    tokens = []
+    for match in UNIT_TOKEN_RE.finditer(text):
+        operator_, name, number, bad = match.groups()
+        if bad is not None:
+            raise ValueError(f"Unexpected '{bad}' in unit expression '{text}'")
+        if operator_ is not None:
+            tokens.append(("op", "^" if operator_ == "**" else operator_))
+        elif name is not None:
+            tokens.append(("unit", name))
+        elif number is not None:
+            tokens.append(("number", number))
+    return tokens
+
+
+@lru_cache(maxsize=1024)
+def parse_unit_expression(text):
+    """Reduce a unit expression to (factor onto base units, dimension vector).
+
+    The factor is an exact Fraction; the vector is a tuple of exponents in
+    DIMENSIONS order. Raises ValueError for syntax errors or unknown units.
+    """
+    tokens = _unit_tokens(text)
+    position = 0
+    order = list(DIMENSIONS)
+
+    def peek():
+        return tokens[position] if position < len(tokens) else (None, None)
+
+    def atom():
+        nonlocal position
+        kind, value = peek()
+        position += 1
+        if kind == "unit":
+            dimension, factor, _ = UNIT_DEFINITIONS[resolve_unit(value)]
+            vector = [0] * len(order)
+            vector[order.index(dimension)] = 1
+            return Fraction(factor), vector
+        if (kind, value) == ("number", "1"):
+            return Fraction(1), [0] * len(order)
+        if (kind, value) == ("op", "("):
+            result = expression()
+            if peek() != ("op", ")"):
+                raise ValueError(f"Missing ')' in unit expression '{text}'")
+            position += 1
+            return result
+        raise ValueError(f"Expected a unit in '{text}'")
+
+    def term():
+        nonlocal position
+        factor, vector = atom()
+        if peek() == ("op", "^"):
+            position += 1
+            kind, value = peek()
+            if kind != "number":
+                raise ValueError(f"Expected an integer exponent in '{text}'")
+            position += 1
+            exponent = int(value)
+            if abs(exponent) > MAX_UNIT_EXPONENT:
+                raise ValueError(f"Exponent {exponent} out of range "
+                                 f"(±{MAX_UNIT_EXPONENT}) in '{text}'")
+            factor, vector = factor ** exponent, [e * exponent for e in vector]
+        return factor, vector
+
+    def expression():
+        nonlocal position
+        factor, vector = term()
+        while peek() in (("op", "*"), ("op", "·"), ("op", "/")):
+            divide = peek()[1] == "/"
+            position += 1
+            other_factor, other_vector = term()
+            if divide:
+                factor /= other_factor
+                vector = [a - b for a, b in zip(vector, other_vector)]
+            else:
+                factor *= other_factor
+                vector = [a + b for a, b in zip(vector, other_vector)]
+        return factor, vector
+
+    if not tokens:
+        raise ValueError("Empty unit expression")
+    factor, vector = expression()
+    if position != len(tokens):
+        raise ValueError(f"Unexpected '{tokens[position][1]}' in unit expression '{text}'")
+    return factor, tuple(vector)
+
+
+def describe_dimension(vector):
+    """Human-readable dimension vector, e.g. 'length·time^-1'."""
+    parts = [name if exponent == 1 else f"{name}^{exponent}"
+             for name, exponent in zip(DIMENSIONS, vector) if exponent]
+    return "·".join(parts) or "dimensionless"
+
+
+@lru_cache(maxsize=4096)
+def compound_factors(from_text, to_text):
+    """(scale, 0.0) between two compatible unit expressions, memoized per pair."""
+    from_factor, from_vector = parse_unit_expression(from_text)
+    to_factor, to_vector = parse_unit_expression(to_text)
+    if from_vector != to_vector:
+        raise ValueError(f"Cannot convert {from_text} ({describe_dimension(from_vector)}) "
+                         f"to {to_text} ({describe_dimension(to_vector)})")
+    try:
+        scale = float(from_factor / to_factor)
+    except OverflowError:
+        scale = 0.0
+    if not scale:  # overflowed, or underflowed to zero
+        raise ValueError(f"Conversion factor from {from_text} to {to_text} is out of range")
+    return scale, 0.0
+
+
+def canonical_unit(text):
+    """Registry name for a simple unit, or the stripped text of a valid expression."""
+    try:
+        return resolve_unit(text)
+    except ValueError:
+        text = text.strip()
+        parse_unit_expression(text)
+        return text
+
+
+def unit_minimum(unit):
+    """Physical minimum for a simple unit; None (unbounded) for compound expressions."""
+    try:
+        return UNIT_MINIMUMS[resolve_unit(unit)]
+    except ValueError:
+        return None
+
+
+@lru_cache(maxsize=4096)
+def conversion_factors(from_unit, to_unit):
+    """(scale, shift) for a unit or expression pair, memoized; ValueError if incompatible."""
+    try:
+        from_unit, to_unit = resolve_unit(from_unit), resolve_unit(to_unit)
+    except ValueError:
+        return compound_factors(from_unit.strip(), to_unit.strip())
+    try:
+        return CONVERSION_TABLE[(from_unit, to_unit)]
+    except KeyError:
+        raise ValueError(f"Cannot convert {from_unit} ({UNIT_DEFINITIONS[from_unit][0]}) "
+                         f"to {to_unit} ({UNIT_DEFINITIONS[to_unit][0]})") from None
+
+
+def convert(value, from_unit, to_unit):
+    """Convert between compatible units or unit expressions: one lookup, one multiply-add."""
+    scale, shift = CONVERSION_TABLE.get((from_unit, to_unit)) or conversion_factors(from_unit, to_unit)
+    return value * scale + shift
+
+
+# ---------- Currency rates (local file standing in for a feed) ----------
+# The rates file has rows "date,base,quote,rate" meaning 1 base = rate quote;
+# each row must involve RATE_BASE. Rates are loaded into one snapshot per
+# date ({currency: units per RATE_BASE}, carried forward so every snapshot is
+# complete) and kept for RATE_TTL seconds. Cross rates go through RATE_BASE
+# and are cached per snapshot; historical lookups bisect the sorted dates.
+
+RATES_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "currency_rates.csv")
+RATE_BASE = "EUR"
+RATE_TTL = 3600.0  # seconds
+
+RATES = {
+    "path": None,
+    "loaded_at": None,   # time.monotonic() of the last load
+    "dates": [],         # sorted ISO dates; "" for the built-in fallback
+    "snapshots": [],     # parallel to dates
+}
+CROSS_RATES = {}  # (snapshot index, from, to) -> rate; cleared on every load
+
+
+def load_rates(path=None):
+    """Load (or reload) the rates file and refresh the currency units.
+
+    Falls back to the built-in EUR_TO_USD rate when the file is missing and
+    nothing has been loaded from this path yet; on any other failure the
+    current rates are left untouched. Returns (success, message).
+    """
+    path = path or RATES_FILE
+    by_date = {}
+    skipped = 0
+    try:
+        with open(path, newline="", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                try:
+                    day = date.fromisoformat(row["date"].strip()).isoformat()
+                    base, quote = row["base"].strip().upper(), row["quote"].strip().upper()
+                    rate = float(row["rate"])
+                except (KeyError, AttributeError, ValueError):
+                    skipped += 1
+                    continue
+                if not math.isfinite(rate) or rate <= 0:
+                    skipped += 1
+                elif base == RATE_BASE:
+                    by_date.setdefault(day, {})[quote] = rate
+                elif quote == RATE_BASE:
+                    by_date.setdefault(day, {})[base] = 1 / rate
+                else:
+                    skipped += 1
+    except FileNotFoundError:
+        if RATES["dates"] and RATES["path"] == path:  # deleted since: keep its rates
+            return False, f"Rates file {path} not found; keeping the loaded rates"
+        by_date = {"": {"USD": EUR_TO_USD}}
+        message = f"Rates file {path} not found; using built-in EUR/USD {EUR_TO_USD}"
+        success = False
+    except (OSError, UnicodeDecodeError, csv.Error) as e:
+        return False, f"Cannot read rates file: {e}"
+    else:
+        if not by_date:
+            return False, f"No usable rates in {path}"
+        message = f"Loaded rates for {len(by_date)} date(s) from {path}"
+        if skipped:
+            message += f" ({skipped} row(s) skipped)"
+        success = True
+
+    snapshot = {RATE_BASE: 1.0}
+    dates, snapshots = [], []
+    for day in sorted(by_date):
+        snapshot = {**snapshot, **by_date[day]}
+        dates.append(day)
+        snapshots.append(snapshot)
+    RATES.update(path=path, loaded_at=time.monotonic(), dates=dates, snapshots=snapshots)
+    CROSS_RATES.clear()
+    _sync_currency_units(snapshots[-1])
+    return success, message
+
+
+def _sync_currency_units(snapshot):
+    """Point the currency units of the registry at the latest rates."""
+    for currency, rate in snapshot.items():
+        UNIT_DEFINITIONS[currency] = ("currency", 1 / Fraction(rate), 0)
+    _rebuild_registry()
+
+
+def refresh_rates(force=False):
+    """Reload the rates file if it was never loaded or the TTL has expired."""
+    loaded_at = RATES["loaded_at"]
+    if force or loaded_at is None or time.monotonic() - loaded_at > RATE_TTL:
+        ok, message = load_rates(RATES["path"])
+        if RATES["loaded_at"] == loaded_at and loaded_at is not None:
+            RATES["loaded_at"] = time.monotonic()  # keep serving the old rates for another TTL
+        return ok, message
+    return True, "Rates are fresh"
+
+
+def get_rate(from_currency, to_currency, on_date=None):
+    """Units of to_currency per from_currency, latest or as of on_date (ISO str or date).
+
+    Raises ValueError for unknown currencies, dates not in YYYY-MM-DD form
+    or dates before the first rate.
+    """
+    _, message = refresh_rates()  # a failed reload keeps serving the previous rates
+    if not RATES["dates"]:
+        raise ValueError(message)
+    index = len(RATES["dates"]) - 1
+    if on_date is not None:
+        if isinstance(on_date, date):
+            on_date = on_date.isoformat()
+        else:
+            try:
+                # 3.11+ also accepts "20240815"; the round trip pins YYYY-MM-DD
+                valid = date.fromisoformat(on_date).isoformat() == on_date
+            except (TypeError, ValueError):
+                valid = False
+            if not valid:
+                raise ValueError(f"Invalid date '{on_date}' (expected YYYY-MM-DD)")
+        index = bisect_right(RATES["dates"], on_date) - 1
+        if index < 0:
+            raise ValueError(f"No rates on or before {on_date}")
+    key = (index, from_currency, to_currency)
+    rate = CROSS_RATES.get(key)
+    if rate is None:
+        snapshot = RATES["snapshots"][index]
+        for currency in (from_currency, to_currency):
+            if currency not in snapshot:
+                raise ValueError(f"No rate for currency '{currency}'")
+        rate = CROSS_RATES[key] = snapshot[to_currency] / snapshot[from_currency]
+    return rate
+
+
+def convert_currency(amount, from_currency, to_currency, on_date=None):
+    return amount * get_rate(from_currency.upper(), to_currency.upper(), on_date)
+
+
+def convert_money(amount, from_unit, to_unit):
+    """Decimal conversion of a decimal amount (str, Decimal or float via its repr).
+
+    The factor enters as its shortest decimal repr, so "0.10" EUR at 1.08
+    is exactly 0.108 USD rather than the nearest binary double.
+    """
+    scale, shift = conversion_factors(from_unit, to_unit)
+    if not isinstance(amount, Decimal):
+        try:
+            amount = Decimal(str(amount).strip())
+        except InvalidOperation:
+            raise ValueError(f"Invalid amount '{amount}'") from None
+    return amount * Decimal(repr(scale)) + Decimal(repr(shift))
+
+
+# ---------- Named conversions (kept for existing callers) ----------
 def km_to_miles(km):
-    return km * MILES_PER_KM
+    return convert(km, "km", "miles")
 
 
 def miles_to_km(miles):
-    return miles / MILES_PER_KM
+    return convert(miles, "miles", "km")
 
 
 def c_to_f(c):
-    return c * 9 / 5 + 32
+    return convert(c, "°C", "°F")
 
 
 def f_to_c(f):
-    return (f - 32) * 5 / 9
+    return convert(f, "°F", "°C")
 
 
 def kg_to_lb(kg):
-    return kg * POUNDS_PER_KG
+    return convert(kg, "kg", "lb")
 
 
 def lb_to_kg(lb):
-    return lb / POUNDS_PER_KG
+    return convert(lb, "lb", "kg")
 
 
 def eur_to_usd(eur):
-    return eur * EUR_TO_USD
+    return convert_currency(eur, "EUR", "USD")
 
 
 def usd_to_eur(usd):
-    return usd / EUR_TO_USD
+    return convert_currency(usd, "USD", "EUR")
 
 
 def mb_to_gb(mb):
-    return mb / MB_PER_GB
+    return convert(mb, "MB", "GB")
 
 
 def gb_to_mb(gb):
-    return gb * MB_PER_GB
+    return convert(gb, "GB", "MB")
 
 
 # ---------- Safe Input Functions (with exception handling) ----------
@@ -86,12 +520,13 @@ def safe_get_number(prompt, min_val=None, max_val=None, unit=""):
 
 def safe_get_menu_choice():
     """Get menu choice with validation and retry loop."""
+    last = len(MENU_ENTRIES) + 2
     while True:
         try:
-            choice = int(input("Choose a conversion option (1-6): "))
-            if 1 <= choice <= 6:
+            choice = int(input(f"Choose a conversion option (1-{last}): "))
+            if 1 <= choice <= last:
                 return choice
-            print("❌ Please choose a number between 1-6")
+            print(f"❌ Please choose a number between 1-{last}")
         except ValueError:
             print("❌ Please enter a valid number")
         except (KeyboardInterrupt, EOFError):
@@ -117,24 +552,280 @@ def safe_get_direction(opt1_label, opt2_label):
 
 
 # ---------- I/O helpers (no business logic) ----------
+# menu entry: (title, first unit, second unit, decimals, quantity noun)
+MENU_ENTRIES = [
+    ("Length", "km", "miles", 3, "distance"),
+    ("Temperature", "°C", "°F", 2, "temperature"),
+    ("Weight", "kg", "lb", 3, "weight"),
+    ("Currency", "EUR", "USD", 2, "amount"),
+    ("Data", "MB", "GB", 3, "size"),
+]
+
+
 def display_menu():
     """Display menu and get user choice safely."""
     print("\n" + "=" * 50)
     print("🧮 Smart Converter v2.1 - Bulletproof Edition")
     print("- Menu -")
-    print("1) Length (km ↔ miles)")
-    print("2) Temperature (°C ↔ °F)")
-    print("3) Weight (kg ↔ lb)")
-    print("4) Currency (EUR ↔ USD)")
-    print("5) Data (MB ↔ GB)")
-    print("6) Quit")
+    for number, (title, unit_a, unit_b, _, _) in enumerate(MENU_ENTRIES, 1):
+        print(f"{number}) {title} ({unit_a} ↔ {unit_b})")
+    print(f"{len(MENU_ENTRIES) + 1}) Other units ({', '.join(UNIT_DEFINITIONS)}; "
+          "or expressions like km/h, MB/s)")
+    print(f"{len(MENU_ENTRIES) + 2}) Quit")
 
     return safe_get_menu_choice()
 
 
-def format_result(value_in, value_out, in_label, out_label, decimals=3):
-    """Format conversion result with consistent decimal places for both input and output."""
-    return f"{value_in:.{decimals}f} {in_label} = {value_out:.{decimals}f} {out_label}"
+def _unit_suffix(unit):
+    return unit if unit.startswith("°") else f" {unit}"
+
+
+def safe_get_unit(prompt, convert_from=None):
+    """Get a unit or unit expression (convertible from convert_from, if given) with retry loop."""
+    while True:
+        try:
+            unit = canonical_unit(input(prompt))
+            if convert_from is not None:
+                conversion_factors(convert_from, unit)
+            return unit
+        except ValueError as e:
+            print(f"❌ {e}")
+        except (KeyboardInterrupt, EOFError):
+            print("\n👋 Goodbye!")
+            raise SystemExit(0)
+
+
+# Output formats: "fixed" (decimals after the point), "sig" (decimals
+# significant figures) and "money" (Decimal, rounded half-up). Each label
+# pair compiles once to a formatter; batches format in one call.
+FORMAT_MODES = ("fixed", "sig", "money")
+
+
+def _significant(value, digits):
+    text = format(value, f"#.{digits}g")  # '#' keeps trailing zeros: 1.00, not 1
+    return text[:-1] if text.endswith(".") else text.replace(".e", "e")
+
+
+def _money(value, quantum):
+    if not isinstance(value, Decimal):
+        value = Decimal(repr(value))
+    try:
+        return str(value.quantize(quantum, rounding=ROUND_HALF_UP))
+    except InvalidOperation:  # inf/nan or too many digits for the context
+        return str(value)
+
+
+@lru_cache(maxsize=256)
+def result_formatter(in_label, out_label, decimals=3, mode="fixed"):
+    """Compile a (value_in, value_out) -> str formatter for one unit pair."""
+    if mode == "fixed":
+        return f"{{:.{decimals}f}} {in_label} = {{:.{decimals}f}} {out_label}".format
+    if mode == "sig":
+        if decimals < 1:
+            raise ValueError("Significant-figure mode needs at least 1 digit")
+        return lambda value_in, value_out: (f"{_significant(value_in, decimals)} {in_label} = "
+                                            f"{_significant(value_out, decimals)} {out_label}")
+    if mode == "money":
+        quantum = Decimal(1).scaleb(-decimals)
+        return lambda value_in, value_out: (f"{_money(value_in, quantum)} {in_label} = "
+                                            f"{_money(value_out, quantum)} {out_label}")
+    raise ValueError(f"Unknown format mode '{mode}' (choose from {', '.join(FORMAT_MODES)})")
+
+
+def format_result(value_in, value_out, in_label, out_label, decimals=3, mode="fixed"):
+    """Format conversion result with consistent precision for both input and output."""
+    return result_formatter(in_label, out_label, decimals, mode)(value_in, value_out)
+
+
+def format_results(values_in, values_out, in_label, out_label, decimals=3, mode="fixed"):
+    """format_result() for whole columns: one newline-terminated string.
+
+    Fixed and sig modes repeat a %-template and fill it with a single %
+    call, which avoids a Python-level call per value.
+    """
+    formatter = result_formatter(in_label, out_label, decimals, mode)
+    if mode in ("fixed", "sig") and "." not in in_label + out_label:
+        spec = f"%.{decimals}f" if mode == "fixed" else f"%#.{decimals}g"
+        line = f"{spec} {in_label.replace('%', '%%')} = {spec} {out_label.replace('%', '%%')}\n"
+        text = (line * len(values_in)) % tuple(chain.from_iterable(zip(values_in, values_out)))
+        if mode == "sig":  # same trim as _significant(): "100." -> "100"
+            text = text.replace(". ", " ").replace(".\n", "\n").replace(".e", "e")
+        return text
+    lines = list(map(formatter, values_in, values_out))
+    lines.append("")
+    return "\n".join(lines)
+
+
+# ---------- Batch column conversion ----------
+# Values stream through in chunks: parsed once into array('d'), converted by
+# one comprehension over a memoryview, then written with one join per chunk.
+
+BATCH_CHUNK = 65536
+BATCH_FORMATS = ("raw", "csv", "ndjson")
+BATCH_INVALID, BATCH_NON_FINITE, BATCH_BELOW_MIN = 1, 2, 3
+BATCH_ERRORS = {
+    BATCH_INVALID: "Invalid number",
+    BATCH_NON_FINITE: "Non-finite number",
+    BATCH_BELOW_MIN: "Below physical minimum",
+}
+
+
+def _batch_format(path, fmt):
+    """Resolve fmt="auto" from the file extension (stdin defaults to raw)."""
+    if fmt != "auto":
+        return fmt
+    extension = os.path.splitext(path)[1].lower()
+    return {".csv": "csv", ".ndjson": "ndjson", ".jsonl": "ndjson"}.get(extension, "raw")
+
+
+def _ndjson_field(line, key):
+    try:
+        record = json.loads(line)
+    except ValueError:
+        return line.strip()
+    if isinstance(record, dict):
+        record = record.get(key, "")
+    return record if type(record) in (int, float) else str(record)
+
+
+def _read_fields(f, fmt, column, chunk_size):
+    """Yield lists of raw fields, one per value, from a raw/CSV/NDJSON stream."""
+    if fmt == "csv":
+        reader = csv.reader(f)
+        header = next(reader, None)
+        if header is None:
+            return
+        if column is None:
+            index = 0
+        elif column in header:
+            index = header.index(column)
+        elif column.isdigit():
+            index = int(column)
+        else:
+            raise ValueError(f"Column '{column}' not found in header")
+        while True:
+            rows = list(islice(reader, chunk_size))
+            if not rows:
+                return
+            yield [row[index] if index < len(row) else "" for row in rows]
+
+    lines = (line for line in f if not line.isspace())
+    while True:
+        chunk = list(islice(lines, chunk_size))
+        if not chunk:
+            return
+        if fmt == "ndjson":
+            key = column or "value"
+            chunk = [_ndjson_field(line, key) for line in chunk]
+        yield chunk
+
+
+def convert_column(fields, from_unit, to_unit):
+    """Convert a chunk of numbers or numeric strings.
+
+    Returns (inputs, results, mask): two array('d') and a bytearray of
+    BATCH_* codes, non-zero where the input was rejected (result is NaN).
+    """
+    scale, shift = conversion_factors(from_unit, to_unit)
+    minimum = unit_minimum(from_unit)
+    if minimum is None:
+        minimum = -math.inf
+    mask = bytearray(len(fields))
+    try:
+        if isinstance(fields, (array, memoryview)) and memoryview(fields).format == "d":
+            values = array("d")
+            values.frombytes(memoryview(fields).cast("B"))  # already doubles: one memcpy
+        else:
+            values = array("d", map(float, fields))
+        # sum() is inf/nan if any value is (or on overflow, which just takes the slow path)
+        clean = math.isfinite(sum(values)) and min(values, default=minimum) >= minimum
+    except (ValueError, TypeError, OverflowError):
+        clean = False
+    if not clean:
+        values = array("d", repeat(math.nan, len(fields)))
+        for i, field in enumerate(fields):
+            try:
+                value = float(field)
+            except (ValueError, TypeError):
+                mask[i] = BATCH_INVALID
+                continue
+            except OverflowError:  # an int (e.g. from NDJSON) beyond float range
+                mask[i] = BATCH_NON_FINITE
+                continue
+            if not math.isfinite(value):
+                mask[i] = BATCH_NON_FINITE
+            elif value < minimum:
+                mask[i] = BATCH_BELOW_MIN
+            else:
+                values[i] = value
+
+    # a comprehension over the memoryview beats map() with bound float methods
+    view = memoryview(values)
+    if shift:
+        results = array("d", [value * scale + shift for value in view])
+    else:
+        results = array("d", [value * scale for value in view])
+    return values, results, mask
+
+
+def _uses_currency(unit):
+    try:
+        return parse_unit_expression(unit.strip())[1][list(DIMENSIONS).index("currency")] != 0
+    except ValueError:
+        return True  # possibly a currency only the rates file knows
+
+
+def batch_convert(input_file, output_file, from_unit, to_unit, fmt="auto", column=None,
+                  decimals=3, chunk_size=BATCH_CHUNK, mode="fixed"):
+    """Stream a column of values through convert_column(), one format_result() line each.
+
+    "-" means stdin/stdout. Rejected values keep their line with an error note.
+    In money mode accepted values are converted again with convert_money().
+    Returns (True, {"values": n, "errors": {message: count}}) or (False, message).
+    """
+    summary = {"values": 0, "errors": {}}
+    try:
+        if _uses_currency(from_unit) or _uses_currency(to_unit):
+            refresh_rates()
+        from_unit, to_unit = canonical_unit(from_unit), canonical_unit(to_unit)
+        conversion_factors(from_unit, to_unit)
+        result_formatter(from_unit, to_unit, decimals, mode)  # validates the mode
+        fmt = _batch_format(input_file, fmt)
+        if fmt not in BATCH_FORMATS:
+            return False, f"Unknown format '{fmt}'"
+        source = nullcontext(sys.stdin) if input_file == "-" else \
+            open(input_file, newline="", encoding="utf-8")
+        with source as fin, (nullcontext(sys.stdout) if output_file == "-" else
+                             open(output_file, "w", encoding="utf-8")) as fout:
+            for fields in _read_fields(fin, fmt, column, chunk_size):
+                values, results, mask = convert_column(fields, from_unit, to_unit)
+                if mode == "money":
+                    values = [Decimal(str(field).strip()) if not code else math.nan
+                              for field, code in zip(fields, mask)]
+                    results = [convert_money(value, from_unit, to_unit) if not code else math.nan
+                               for value, code in zip(values, mask)]
+                text = format_results(values, results, from_unit, to_unit, decimals, mode)
+                if any(mask):
+                    lines = text.split("\n")
+                    for i, code in enumerate(mask):
+                        if code:
+                            lines[i] = f"❌ {BATCH_ERRORS[code]}: {str(fields[i]).strip() or '(empty)'}"
+                    for code, message in BATCH_ERRORS.items():
+                        count = mask.count(code)
+                        if count:
+                            summary["errors"][message] = summary["errors"].get(message, 0) + count
+                    text = "\n".join(lines)
+                fout.write(text)
+                summary["values"] += len(fields)
+        return True, summary
+    except FileNotFoundError:
+        return False, f"Input file {input_file} not found"
+    except BrokenPipeError:
+        raise
+    except (OSError, UnicodeDecodeError, csv.Error) as e:
+        return False, f"Batch I/O error: {e}"
+    except ValueError as e:
+        return False, str(e)
 
 
 # ---------- Orchestrator with Robust Error Handling ----------
@@ -144,6 +835,8 @@ def run_converter():
     print("*********** Welcome to Smart Converter v2.1 ***********")
     print("🛡️ All inputs are now protected with error handling!")
     print("Try entering invalid values - the program won't crash! 🚀")
+    ok, message = load_rates()
+    print(f"{'💱' if ok else '⚠️'} {message}")
 
     conversion_count = 0
 
@@ -151,96 +844,36 @@ def run_converter():
         try:
             choice = display_menu()
 
-            if choice == 6:
+            if choice == len(MENU_ENTRIES) + 2:
                 print("Thank you for using Smart Converter v2.1!")
                 print(f"Total conversions performed: {conversion_count}")
                 break
 
-            converted = False  # track if a valid conversion happened
-            result_msg = ""    # store the final message to print once
-
-            if choice == 1:  # Length conversion
-                direction = safe_get_direction("km → miles", "miles → km")
-                if direction == 1:
-                    km = safe_get_number(
-                        "Enter distance in km: ", min_val=0, unit=" km")
-                    miles = km_to_miles(km)
-                    result_msg = format_result(km, miles, "km", "miles")
-                    converted = True
-                elif direction == 2:
-                    miles = safe_get_number(
-                        "Enter distance in miles: ", min_val=0, unit=" miles")
-                    km = miles_to_km(miles)
-                    result_msg = format_result(miles, km, "miles", "km")
-                    converted = True
-
-            elif choice == 2:  # Temperature conversion
-                direction = safe_get_direction("°C → °F", "°F → °C")
-                if direction == 1:
-                    c = safe_get_number(
-                        "Enter temperature in °C: ", min_val=ABSOLUTE_ZERO_C, unit="°C")
-                    f = c_to_f(c)
-                    result_msg = format_result(c, f, "°C", "°F", decimals=2)
-                    converted = True
-                elif direction == 2:
-                    f = safe_get_number(
-                        "Enter temperature in °F: ", min_val=ABSOLUTE_ZERO_F, unit="°F")
-                    c = f_to_c(f)
-                    result_msg = format_result(f, c, "°F", "°C", decimals=2)
-                    converted = True
-
-            elif choice == 3:  # Weight conversion
-                direction = safe_get_direction("kg → lb", "lb → kg")
-                if direction == 1:
-                    kg = safe_get_number(
-                        "Enter weight in kg: ", min_val=0, unit=" kg")
-                    lb = kg_to_lb(kg)
-                    result_msg = format_result(kg, lb, "kg", "lb")
-                    converted = True
-                elif direction == 2:
-                    lb = safe_get_number(
-                        "Enter weight in lb: ", min_val=0, unit=" lb")
-                    kg = lb_to_kg(lb)
-                    result_msg = format_result(lb, kg, "lb", "kg")
-                    converted = True
-
-            elif choice == 4:  # Currency conversion
-                direction = safe_get_direction("EUR → USD", "USD → EUR")
-                if direction == 1:
-                    eur = safe_get_number(
-                        "Enter amount in EUR: ", min_val=0, unit=" EUR")
-                    usd = eur_to_usd(eur)
-                    result_msg = format_result(
-                        eur, usd, "EUR", "USD", decimals=2)
-                    converted = True
-                elif direction == 2:
-                    usd = safe_get_number(
-                        "Enter amount in USD: ", min_val=0, unit=" USD")
-                    eur = usd_to_eur(usd)
-                    result_msg = format_result(
-                        usd, eur, "USD", "EUR", decimals=2)
-                    converted = True
-
-            elif choice == 5:  # Data conversion
-                direction = safe_get_direction("MB → GB", "GB → MB")
-                if direction == 1:
-                    mb = safe_get_number(
-                        "Enter size in MB: ", min_val=0, unit=" MB")
-                    gb = mb_to_gb(mb)
-                    result_msg = format_result(mb, gb, "MB", "GB")
-                    converted = True
-                elif direction == 2:
-                    gb = safe_get_number(
-                        "Enter size in GB: ", min_val=0, unit=" GB")
-                    mb = gb_to_mb(gb)
-                    result_msg = format_result(gb, mb, "GB", "MB")
-                    converted = True
+            if choice == len(MENU_ENTRIES) + 1:  # Any unit to any unit
+                src = safe_get_unit("Convert from unit: ")
+                dst = safe_get_unit("Convert to unit: ", src)
+                noun, decimals = "value", 3
+            else:
+                _, unit_a, unit_b, decimals, noun = MENU_ENTRIES[choice - 1]
+                direction = safe_get_direction(f"{unit_a} → {unit_b}", f"{unit_b} → {unit_a}")
+                src, dst = (unit_a, unit_b) if direction == 1 else (unit_b, unit_a)
+            money = _uses_currency(src)
+            if money:
+                refresh_rates()  # honour the TTL in long sessions
+
+            value_in = safe_get_number(f"Enter {noun} in {src}: ",
+                                       min_val=unit_minimum(src), unit=_unit_suffix(src))
+            if money:
+                result_msg = format_result(value_in, convert_money(value_in, src, dst), src, dst,
+                                           decimals=2, mode="money")
+            else:
+                value_out = convert(value_in, src, dst)
+                result_msg = format_result(value_in, value_out, src, dst, decimals=decimals)
 
             # Display result and update counter
-            if converted:
-                conversion_count += 1
-                print(f"✅ {result_msg}")
-                print(f"📊 Conversions performed: {conversion_count}")
+            conversion_count += 1
+            print(f"✅ {result_msg}")
+            print(f"📊 Conversions performed: {conversion_count}")
 
         except Exception as e:
             # Catch any unexpected errors (shouldn't happen with proper input validation)
@@ -250,5 +883,246 @@ def run_converter():
             continue
 
 
+# ---------- Command line ----------
+def build_arg_parser():
+    parser = argparse.ArgumentParser(
+        description="Smart Converter v2.1 (interactive menu when run without arguments)")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    convert_parser = commands.add_parser(
+        "convert", help="convert a column of values from a file or stdin")
+    convert_parser.add_argument("from_unit")
+    convert_parser.add_argument("to_unit")
+    convert_parser.add_argument("input", nargs="?", default="-",
+                                help="raw, CSV or NDJSON file (default: stdin)")
+    convert_parser.add_argument("-o", "--output", default="-", help="default: stdout")
+    convert_parser.add_argument("--format", choices=("auto",) + BATCH_FORMATS, default="auto",
+                                help="auto picks by file extension, raw for stdin")
+    convert_parser.add_argument("--column",
+                                help="CSV header/index (default first) or NDJSON key (default 'value')")
+    convert_parser.add_argument("--decimals", type=int, default=3,
+                                help="decimal places (fixed/money) or significant figures (sig)")
+    convert_parser.add_argument("--mode", choices=FORMAT_MODES, default="fixed",
+                                help="money formats exact Decimals, rounded half-up")
+    convert_parser.add_argument("--chunk-size", type=int, default=BATCH_CHUNK)
+
+    rate_parser = commands.add_parser("rate", help="show a currency rate")
+    rate_parser.add_argument("from_currency")
+    rate_parser.add_argument("to_currency")
+    rate_parser.add_argument("--date", help="ISO date for a historical rate (default: latest)")
+    rate_parser.add_argument("--rates-file", help=f"default: {os.path.basename(RATES_FILE)}")
+
+    bench_parser = commands.add_parser("bench", help="run benchmarks (default: all)")
+    bench_parser.add_argument("names", nargs="*", help="batch, rates, units, format")
+    bench_parser.add_argument("--count", type=int, default=10_000_000,
+                              help="values for the batch benchmark")
+    return parser
+
+
+def main(argv=None):
+    """Interactive converter without arguments; convert/bench subcommands otherwise.
+
+    Exit status: 0 success, 1 some values rejected, 2 usage or I/O error.
+    """
+    if argv is None:
+        argv = sys.argv[1:]
+    if not argv:
+        run_converter()
+        return 0
+
+    args = build_arg_parser().parse_args(argv)
+    if args.command == "bench":
+        benchmarks = {"batch": lambda: benchmark_batch(args.count), "rates": benchmark_rates,
+                      "units": benchmark_unit_expressions, "format": benchmark_formatting}
+        unknown = [name for name in args.names if name not in benchmarks]
+        if unknown:
+            print(f"❌ Unknown benchmark(s): {', '.join(unknown)}", file=sys.stderr)
+            return 2
+        for name in args.names or list(benchmarks):
+            benchmarks[name]()
+        return 0
+
+    if args.command == "rate":
+        ok, message = load_rates(args.rates_file)
+        if not ok:
+            print(f"⚠️ {message}", file=sys.stderr)
+        try:
+            rate = get_rate(args.from_currency.upper(), args.to_currency.upper(), args.date)
+        except ValueError as e:
+            print(f"❌ {e}", file=sys.stderr)
+            return 2
+        print(f"1 {args.from_currency.upper()} = {rate:.6f} {args.to_currency.upper()}")
+        return 0
+
+    if args.decimals < 0 or args.chunk_size < 1:
+        print("❌ Need --decimals >= 0 and --chunk-size >= 1", file=sys.stderr)
+        return 2
+    start = time.perf_counter()
+    try:
+        ok, summary = batch_convert(args.input, args.output, args.from_unit, args.to_unit,
+                                    args.format, args.column, args.decimals, args.chunk_size,
+                                    args.mode)
+    except BrokenPipeError:
+        # Downstream closed early (e.g. `| head`); silence the flush at exit
+        devnull = os.open(os.devnull, os.O_WRONLY)
+        os.dup2(devnull, sys.stdout.fileno())
+        return 0
+    if not ok:
+        print(f"❌ {summary}", file=sys.stderr)
+        return 2
+    elapsed = time.perf_counter() - start
+    print(f"✅ {summary['values']:,} values in {elapsed:.2f}s", file=sys.stderr)
+    for message, count in summary["errors"].items():
+        print(f"  ⚠️ {message}: {count:,} value(s)", file=sys.stderr)
+    return 1 if summary["errors"] else 0
+
+
+# ---------- Benchmarks ----------
+def benchmark_batch(count=10_000_000, from_unit="°C", to_unit="°F"):
+    """Per-value convert() against convert_column() chunks, plus end-to-end batch_convert()."""
+    import tempfile
+
+    values = array("d", (float(i % 10000) / 7.0 for i in range(count)))
+    view = memoryview(values)
+
+    # per-value path: what the prompt loop does, float() + convert() each time
+    scalar = 0.0
+    column = 0.0
+    for offset in range(0, count, BATCH_CHUNK):
+        fields = list(map(repr, view[offset:offset + BATCH_CHUNK]))
+        start = time.perf_counter()
+        for field in fields:
+            convert(float(field), from_unit, to_unit)
+        scalar += time.perf_counter() - start
+        start = time.perf_counter()
+        convert_column(fields, from_unit, to_unit)
+        column += time.perf_counter() - start
+
+    start = time.perf_counter()
+    for offset in range(0, count, BATCH_CHUNK):
+        convert_column(view[offset:offset + BATCH_CHUNK], from_unit, to_unit)
+    numeric = time.perf_counter() - start
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "values.txt")
+        with open(path, "w", encoding="utf-8") as f:
+            for offset in range(0, count, BATCH_CHUNK):
+                f.write("\n".join(map(repr, view[offset:offset + BATCH_CHUNK])))
+                f.write("\n")
+        start = time.perf_counter()
+        batch_convert(path, os.devnull, from_unit, to_unit)
+        end_to_end = time.perf_counter() - start
+
+    print(f"⏱️ convert() per value: {count / scalar:,.0f} values/s")
+    print(f"⏱️ convert_column():    {count / column:,.0f} values/s ({scalar / column:.1f}x faster)")
+    print(f"⏱️ ... array('d') in:   {count / numeric:,.0f} values/s (no parsing)")
+    print(f"⏱️ batch_convert():     {count / end_to_end:,.0f} values/s "
+          f"(parse + convert + format_results, {count:,} values)")
+    return {"scalar": scalar, "column": column, "numeric": numeric, "end_to_end": end_to_end}
+
+
+def benchmark_rates(days=3650, currencies=30, lookups=200000):
+    """Historical lookups: bisect over the date index against a linear scan, cold vs cached."""
+    import random
+    import tempfile
+
+    rng = random.Random(7)
+    codes = [f"C{i:02d}" for i in range(currencies)]
+    start_day = date(2015, 1, 1).toordinal()
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "rates.csv")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("date,base,quote,rate\n")
+            for day in range(start_day, start_day + days):
+                iso = date.fromordinal(day).isoformat()
+                f.writelines(f"{iso},{RATE_BASE},{code},{rng.uniform(0.5, 200):.4f}\n"
+                             for code in codes)
+        start = time.perf_counter()
+        load_rates(path)
+        load = time.perf_counter() - start
+
+    queries = [(date.fromordinal(start_day + rng.randrange(days)).isoformat(),
+                rng.choice(codes), rng.choice(codes)) for _ in range(lookups)]
+    dates = RATES["dates"]
+
+    start = time.perf_counter()
+    for day, a, b in queries:
+        index = next(i for i in range(len(dates) - 1, -1, -1) if dates[i] <= day)
+        RATES["snapshots"][index][b] / RATES["snapshots"][index][a]
+    scan = time.perf_counter() - start
+
+    CROSS_RATES.clear()
+    start = time.perf_counter()
+    for day, a, b in queries:
+        get_rate(a, b, day)
+    cold = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for day, a, b in queries:
+        get_rate(a, b, day)
+    cached = time.perf_counter() - start
+
+    load_rates()  # back to the real rates file
+    print(f"⏱️ load {days:,} days x {currencies} currencies: {load:.2f}s")
+    print(f"⏱️ linear scan:      {lookups / scan:,.0f} lookups/s")
+    print(f"⏱️ get_rate() cold:  {lookups / cold:,.0f} lookups/s ({scan / cold:.1f}x faster)")
+    print(f"⏱️ get_rate() cached: {lookups / cached:,.0f} lookups/s")
+    return {"load": load, "scan": scan, "cold": cold, "cached": cached}
+
+
+def benchmark_unit_expressions(count=1_000_000, from_unit="MB/s", to_unit="GB/min"):
+    """Compound conversions: re-parsing every value vs the memoized pair factor."""
+    values = array("d", (float(i % 1000) for i in range(count)))
+    sample = count // 100
+
+    start = time.perf_counter()
+    for value in values[:sample]:
+        parse_unit_expression.cache_clear()
+        compound_factors.cache_clear()
+        conversion_factors.cache_clear()
+        convert(value, from_unit, to_unit)
+    uncached = (time.perf_counter() - start) * count / sample
+
+    start = time.perf_counter()
+    for value in values:
+        convert(value, from_unit, to_unit)
+    memoized = time.perf_counter() - start
+
+    view = memoryview(values)
+    start = time.perf_counter()
+    for offset in range(0, count, BATCH_CHUNK):
+        convert_column(view[offset:offset + BATCH_CHUNK], from_unit, to_unit)
+    column = time.perf_counter() - start
+
+    print(f"⏱️ parse every value: {count / uncached:,.0f} values/s (estimated from {sample:,})")
+    print(f"⏱️ memoized convert(): {count / memoized:,.0f} values/s ({uncached / memoized:.0f}x faster)")
+    print(f"⏱️ convert_column():   {count / column:,.0f} values/s")
+    return {"uncached": uncached, "memoized": memoized, "column": column}
+
+
+def benchmark_formatting(count=1_000_000):
+    """Per-value format_result() calls against format_results() per chunk, for each mode."""
+    values = array("d", (i / 7.0 for i in range(count)))
+    results = array("d", (value * 1.08 for value in values))
+    timings = {}
+
+    start = time.perf_counter()
+    for value_in, value_out in zip(values, results):
+        format_result(value_in, value_out, "EUR", "USD", 2)
+    timings["per value"] = time.perf_counter() - start
+
+    for mode in FORMAT_MODES:
+        start = time.perf_counter()
+        for offset in range(0, count, BATCH_CHUNK):
+            format_results(values[offset:offset + BATCH_CHUNK], results[offset:offset + BATCH_CHUNK],
+                           "EUR", "USD", 2, mode)
+        timings[mode] = time.perf_counter() - start
+
+    baseline = timings["per value"]
+    for name, elapsed in timings.items():
+        print(f"⏱️ {name:<9} {count / elapsed:>12,.0f} lines/s ({baseline / elapsed:.1f}x per-value)")
+    return timings
+
+
 if __name__ == "__main__":
-    run_converter()
+    raise SystemExit(main())
@@ -0,0 +1,151 @@
+# Test Suite for Word Counter v1
+# Tests normalization, counting and the streaming pipeline
+
+print("🧪 Testing Word Counter v1")
+print("=" * 40)
+
+
+def _corpus(seed=3, words=4000):
+    import random
+
+    rng = random.Random(seed)
+    vocabulary = ["Hello", "hello,", "QUICK", "test;", "isn't", "naïve", "ΟΔΟΣ", "straße",
+                  "Punctuation—like", "dashes—and", "#$%", "x1", "٣٤", "日本語", "é"]
+    separators = [" ", "\n", "  ", "\t", ". ", "\r\n"]
+    return "".join(rng.choice(vocabulary) + rng.choice(separators) for _ in range(words))
+
+
+def test_frequencies():
+    """Test the whole-text helpers."""
+    print("\n1. Testing Whole-Text Counting:")
+
+    import io
+    from contextlib import redirect_stderr
+
+    import word_counter_v1 as wc
+
+    words = wc.tokenize(wc.normalize_text("Hello, hello! A quick, QUICK test."))
+    assert words == ["hello", "hello", "a", "quick", "quick", "test"]
+    freqs = wc.frequency_dict(words)
+    assert freqs == {"hello": 2, "a": 1, "quick": 2, "test": 1}
+    assert wc.top_n(freqs, 2) == [("hello", 2), ("quick", 2)]
+    assert wc.update_frequencies(freqs, iter(["a"]))["a"] == 2
+    print("   ✅ PASS: normalize_text, tokenize, frequency_dict and top_n")
+
+    for argv in (["--bench", "x"], ["--bench", "0"], ["--bench", "-5"], ["--bench", "1", "2"]):
+        with redirect_stderr(io.StringIO()) as err:
+            assert wc.main(argv) == 2, argv
+        assert "Usage" in err.getvalue()
+    print("   ✅ PASS: Bad --bench sizes exit 2 with a usage message")
+
+
+def test_streaming_matches_whole_text():
+    """Chunked counting must equal whole-text counting for every chunk size."""
+    print("\n2. Testing Streaming Pipeline:")
+
+    import io
+
+    import word_counter_v1 as wc
+
+    text = _corpus()
+    expected = wc.frequency_dict(wc.tokenize(wc.normalize_text(text)))
+    for chunk_size in (1, 2, 3, 7, 64, 1000, len(text) + 1):
+        got = wc.count_file(io.StringIO(text), chunk_size=chunk_size)
+        assert got == expected, chunk_size
+    print("   ✅ PASS: Chunk sizes 1..whole file give identical counts")
+
+    # A word split across chunks is counted once, and Σ keeps its non-final form
+    chunks = ["stra", "ße ΟΔΟ", "ΣΑ end", "ing"]
+    assert list(wc.iter_words(chunks)) == ["straße", "οδοσα", "ending"]
+
+    freqs = wc.count_file(io.StringIO("one two"), chunk_size=2)
+    wc.count_file(io.StringIO("two three"), chunk_size=2, freq=freqs)
+    assert freqs == {"one": 1, "two": 2, "three": 1}
+    print("   ✅ PASS: Boundary-straddling words and incremental counts")
+
+
+def test_normalization_engines():
+    """Translate-table and regex paths must match the per-character loop exactly."""
+    print("\n3. Testing Normalization Engines (differential):")
+
+    import random
+
+    import word_counter_v1 as wc
+
+    latin1 = "".join(map(chr, range(256)))
+    expected = wc._normalize_text_loop(latin1)
+    assert wc.normalize_text(latin1) == expected
+    assert wc._normalize_unicode(latin1) == expected
+    print("   ✅ PASS: All 256 Latin-1 characters, both paths")
+
+    everything = "".join(map(chr, range(0x110000)))  # includes lone surrogates
+    assert wc.normalize_text(everything) == wc._normalize_text_loop(everything)
+    print("   ✅ PASS: Every Unicode code point")
+
+    # Context-sensitive lowercasing (final sigma), expanding lowercase (İ),
+    # combining marks, digits from other scripts and typographic punctuation
+    alphabet = ("ΣσςΟΔ İIi\u0307 e\u0301 ß ÀÉÿ µ ٣٤ ½ ² 日本 “”—…_'-.,;\t\n\u00a0\u2028"
+                "abcXYZ019")
+    rng = random.Random(11)
+    for _ in range(2000):
+        text = "".join(rng.choice(alphabet) for _ in range(rng.randrange(40)))
+        assert wc.normalize_text(text) == wc._normalize_text_loop(text), repr(text)
+        assert wc.tokenize(wc.normalize_text(text)) == wc._normalize_text_loop(text).split()
+    assert wc.normalize_text(12.5) == "12 5"  # non-strings are str()-ed first
+    print("   ✅ PASS: Random mixed-script strings and tokenization")
+
+
+def test_streaming_without_whitespace():
+    """Input with no whitespace must still stream in bounded memory."""
+    print("\n4. Testing Streaming Without Whitespace:")
+
+    import io
+    import tracemalloc
+
+    import word_counter_v1 as wc
+
+    text = "ab,ΟΔΟΣ;Σx," * 20000  # CSV-like, final sigma next to the cut characters
+    expected = wc.frequency_dict(wc.tokenize(wc.normalize_text(text)))
+    consumed = []
+
+    def chunks():
+        for start in range(0, len(text), 1000):
+            consumed.append(start)
+            yield text[start:start + 1000]
+
+    words = wc.iter_words(chunks())
+    next(words)
+    assert len(consumed) * 1000 <= wc.CARRY_LIMIT + 1000  # words flow before the end
+    assert wc.count_file(io.StringIO(text), chunk_size=1000) == expected
+    print("   ✅ PASS: Cuts at punctuation match whole-text counts")
+
+    # Only case-ignorable separators ("." ":" "'"): no safe cut, words must stay whole
+    for text in ("hello.worlds." * 20000, "ΟΔΟΣ.αβ:isn't." * 10000):
+        expected = wc.frequency_dict(wc.tokenize(wc.normalize_text(text)))
+        for chunk_size in (1000, 4093):
+            assert wc.count_file(io.StringIO(text), chunk_size=chunk_size) == expected
+    # Every separator touches a sigma: a σ/ς may differ, but no word is split
+    freqs = wc.count_file(io.StringIO("Σ.Σ:ab." * 20000), chunk_size=1000)
+    assert freqs["ab"] == 20000 and sum(freqs.values()) == 60000, freqs
+    print("   ✅ PASS: Without safe punctuation the cut still falls between words")
+
+    source = io.StringIO("a," * 2_000_000)
+    tracemalloc.start()
+    freqs = wc.count_file(source, chunk_size=1 << 16)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    assert freqs == {"a": 2_000_000}
+    assert peak < 1 << 20, peak  # a few chunks, not the 4 MB input
+    print("   ✅ PASS: Memory stays bounded on a whitespace-free corpus")
+
+
+def run_all_tests():
+    test_frequencies()
+    test_streaming_matches_whole_text()
+    test_normalization_engines()
+    test_streaming_without_whitespace()
+    print("\n🎯 Try running: python3 word_counter_v1.py some_book.txt")
+
+
+if __name__ == "__main__":
+    run_all_tests()
@@ -1,6 +1,13 @@
+import re
+import sys
+import time
+
+CHUNK_SIZE = 1 << 20  # characters per read when streaming a file
+
+
 # --- Pure logic (no input/print) ---
-def normalize_text(text):
-    """Return lowercase text with punctuation stripped (non-alnum -> space)."""
+def _normalize_text_loop(text):
+    """Reference normalizer: one Python-level step per character (kept for tests/benchmarks)."""
     chars = []
     for ch in str(text).lower():
         if ch.isalnum() or ch.isspace():
@@ -10,6 +17,32 @@ def normalize_text(text):
     return "".join(chars)
 
 
+# The per-character rule (lowercase; keep alnum and whitespace, anything
+# else becomes a space) precomputed for the 256 Latin-1 code points. Lowercase
+# maps Latin-1 onto itself one-to-one, so Latin-1 text is encoded, run through
+# bytes.translate and decoded: three C passes. Wider text is lowercased, its
+# ASCII bytes translated inside the UTF-8 encoding (bytes >= 0x80 pass through),
+# and a regex then blanks the remaining non-ASCII non-word characters; in re,
+# \w is str.isalnum() plus "_" and \s is str.isspace(), so the rule is unchanged.
+LATIN1_TABLE = bytes(ord(_normalize_text_loop(chr(code))) for code in range(256))
+ASCII_TABLE = LATIN1_TABLE[:128] + bytes(range(128, 256))
+WIDE_NON_WORD_RE = re.compile(r"[^\x00-\x7f\w\s]")
+
+
+def _normalize_unicode(text):
+    encoded = text.lower().encode("utf-8", "surrogatepass").translate(ASCII_TABLE)
+    return WIDE_NON_WORD_RE.sub(" ", encoded.decode("utf-8", "surrogatepass"))
+
+
+def normalize_text(text):
+    """Return lowercase text with punctuation stripped (non-alnum -> space)."""
+    text = str(text)
+    try:
+        return text.encode("latin-1").translate(LATIN1_TABLE).decode("latin-1")
+    except UnicodeEncodeError:
+        return _normalize_unicode(text)
+
+
 def tokenize(text):
     """Split normalized text into words (list of strings)."""
     return text.split()
@@ -22,9 +55,13 @@ def unique_words(words):
 
 def frequency_dict(words):
     """Return a dict {word: count}."""
+    return update_frequencies({}, words)
+
+
+def update_frequencies(freq, words):
+    """Add counts for words (any iterable, consumed lazily) into freq and return it."""
     # Hint: loop over words; if key not in dict, initialize to 0 then increment.
     # No collections.Counter yet (saving that for later sections).
-    freq = {}
     for word in words:
         freq[word] = freq.get(word, 0) + 1
     return freq
@@ -36,29 +73,167 @@ def top_n(freqs, n=5):
     return sorted_items[:n]
 
 
+# --- Streaming (memory grows with vocabulary, not corpus) ---
+
+def read_chunks(f, chunk_size=CHUNK_SIZE):
+    """Yield successive text chunks from an open file."""
+    while True:
+        chunk = f.read(chunk_size)
+        if not chunk:
+            return
+        yield chunk
+
+
+# Greedy ".*" backtracks from the end, so each search costs only the length
+# of the tail after the match.
+LAST_SPACE_RE = re.compile(r".*\s", re.DOTALL)
+# Non-word ASCII characters that are neither cased nor case-ignorable, so
+# lower()'s final-sigma rule never looks through them: cutting right after
+# one also normalizes exactly like the whole text.
+LAST_SAFE_CUT_RE = re.compile(r".*[,;!?\"()\[\]{}<>/\\|+=*&%$#@~_-]", re.DOTALL)
+# Fallback cut: the end of the last run of separators (anything normalize_text
+# blanks) with a non-sigma word character on both sides, so neither a word nor
+# a final-sigma decision straddles the cut (case-ignorable letters aside).
+LAST_SEPARATOR_RUN_RE = re.compile(r".*[^\W_Σσ][\W_]+(?=[^\W_Σσ])", re.DOTALL)
+LAST_SEPARATOR_RE = re.compile(r".*[\W_]", re.DOTALL)  # keeps words whole, not sigmas
+CARRY_LIMIT = 1 << 16  # characters held back without a whitespace before forcing a cut
+
+
+def _word_end(text):
+    """Index just past the last whitespace in text, 0 if none.
+
+    Cutting at whitespace rather than at any punctuation keeps lower()'s
+    final-sigma rule seeing the same following characters as on the whole text.
+    """
+    match = LAST_SPACE_RE.match(text)
+    return match.end() if match else 0
+
+
+def iter_words(chunks):
+    """Lazily yield normalized words from raw text chunks.
+
+    The raw tail after a chunk's last whitespace may be the start of a word
+    that continues in the next chunk, so it is carried over and normalized
+    together with that chunk. Text without whitespace (minified, CSV-like)
+    is cut once the carry passes CARRY_LIMIT, so memory stays bounded: at
+    the last safe punctuation, else after the last separator run between
+    two non-sigma word characters, else after any separator, and only with
+    no separator at all as is.
+    """
+    carry = ""
+    for chunk in chunks:
+        end = _word_end(chunk)
+        if not end:  # no whitespace yet: the whole chunk is mid-word
+            carry += chunk
+            if len(carry) > CARRY_LIMIT:
+                match = (LAST_SAFE_CUT_RE.match(carry) or LAST_SEPARATOR_RUN_RE.match(carry)
+                         or LAST_SEPARATOR_RE.match(carry))
+                end = match.end() if match else len(carry)
+                yield from tokenize(normalize_text(carry[:end]))
+                carry = carry[end:]
+            continue
+        text = carry + chunk[:end]
+        carry = chunk[end:]
+        yield from tokenize(normalize_text(text))
+    if carry:
+        yield from tokenize(normalize_text(carry))
+
+
+def count_file(f, chunk_size=CHUNK_SIZE, freq=None):
+    """Stream an open text file into a {word: count} dict (new or updated in place)."""
+    return update_frequencies({} if freq is None else freq,
+                              iter_words(read_chunks(f, chunk_size)))
+
+
 # --- I/O & orchestration (printing only) ---
 
-def print_report(text, n_top=5):
-    """Normalize, count, and print unique count + top N."""
-    normalized = normalize_text(text)
-    words = tokenize(normalized)
-    uniques = unique_words(words)
-    freqs = frequency_dict(words)
+def print_frequencies(freqs, n_top=5):
+    """Print unique count + top N from a {word: count} dict."""
     top = top_n(freqs, n_top)
-    print(f"Unique words: {len(uniques)}")
+    print(f"Unique words: {len(freqs)}")
     print(f"Top {n_top} words:")
     for word, count in top:
         print(f" {word}: {count}")
 
 
-def main():
-    # For v1: hardcode a sample paragraph (no user input yet).
-    sample = (
-        "Hello, hello! This is a test. A quick, QUICK test; isn't it nice?"
-        " Punctuation—like dashes—and symbols #$% should be removed."
-    )
-    print_report(sample, n_top=5)
+def print_report(text, n_top=5):
+    """Normalize, count, and print unique count + top N."""
+    print_frequencies(update_frequencies({}, iter_words([text])), n_top)
+
+
+def benchmark_normalize(size_mb=1024, reference_mb=16):
+    """Normalization throughput over size_mb of generated UTF-8 text per script.
+
+    The text is a ~1 MB block re-processed size_mb times, so a 1 GB run needs
+    no 1 GB buffer. The per-character loop is timed on reference_mb and
+    extrapolated.
+    """
+    words = ["Hello,", "hello", "QUICK", "test;", "isn't", "it", "nice?", "(dashes)", "#$%", "x1"]
+    line = " ".join(words) + "\n"
+    scripts = {
+        "ascii": line,
+        "latin-1": line + "Crème brûlée, Größe: ÀÉÎ µ ÿ!\n",
+        "quotes": line * 20 + "“Curly quotes” — and dashes…\n",  # typical English prose
+        "greek": "Ελληνικά κείμενα, με στίξη; ΟΔΟΣ.\n",
+        "cjk": "日本語のテキスト、句読点。中文文本，标点。\n",
+    }
+    engines = {"loop": _normalize_text_loop, "normalize_text": normalize_text,
+               "+ tokenize": lambda text: tokenize(normalize_text(text))}
+    results = {}
+    for script, sample in scripts.items():
+        block = sample * ((1 << 20) // len(sample.encode("utf-8")))
+        size = len(block.encode("utf-8"))  # rates are in MB of UTF-8 input
+        for name, function in engines.items():
+            repeats = min(size_mb, reference_mb) if name == "loop" else size_mb
+            start = time.perf_counter()
+            for _ in range(repeats):
+                function(block)
+            rate = repeats * size / (time.perf_counter() - start) / 1e6
+            results[(script, name)] = rate
+            print(f"⏱️ {script:<8} {name:<15} {rate:>8.1f} MB/s "
+                  f"(~{size_mb * size / 1e6 / rate:.0f}s for {size_mb} MB)")
+    return results
+
+
+def main(argv=None):
+    """Report on the files named in argv ("-" is stdin), or on a sample paragraph.
+
+    "--bench [MB]" times normalization instead (default 1024 MB per script).
+    """
+    paths = sys.argv[1:] if argv is None else argv
+    if paths and paths[0] == "--bench":
+        size = paths[1] if len(paths) > 1 else "1024"
+        if len(paths) > 2 or not size.isdecimal() or int(size) < 1:
+            print("❌ Usage: word_counter_v1.py --bench [MB] (MB: positive integer)",
+                  file=sys.stderr)
+            return 2
+        benchmark_normalize(int(size))
+        return 0
+    if not paths:
+        # For v1: hardcode a sample paragraph (no user input yet).
+        sample = (
+            "Hello, hello! This is a test. A quick, QUICK test; isn't it nice?"
+            " Punctuation—like dashes—and symbols #$% should be removed."
+        )
+        print_report(sample, n_top=5)
+        return 0
+
+    freqs = {}
+    start = time.perf_counter()
+    for path in paths:
+        try:
+            if path == "-":
+                count_file(sys.stdin, freq=freqs)
+            else:
+                with open(path, encoding="utf-8", errors="replace") as f:
+                    count_file(f, freq=freqs)
+        except OSError as e:
+            print(f"❌ Cannot read {path}: {e}", file=sys.stderr)
+            return 2
+    print(f"Words: {sum(freqs.values()):,} in {time.perf_counter() - start:.2f}s")
+    print_frequencies(freqs, n_top=10)
+    return 0
 
 
 if __name__ == "__main__":
-    main()
+    raise SystemExit(main())